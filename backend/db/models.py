@@ -75,4 +75,6 @@ class HospitalData(Base):
     government: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     scheme_supported: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     contact_number: Mapped[str] = mapped_column(String(30), nullable=False)
+    latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -29,10 +29,25 @@ class WhatsAppLog(Base):
     phone_number: Mapped[str] = mapped_column(String(30), nullable=False, index=True)
     message_summary: Mapped[str] = mapped_column(Text, nullable=False)
     delivery_status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
-    provider_reference: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    provider_reference: Mapped[str | None] = mapped_column(String(80), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class WhatsAppOutbox(Base):
+    __tablename__ = "whatsapp_outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    log_id: Mapped[int] = mapped_column(ForeignKey("whatsapp_logs.id"), nullable=False, unique=True, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued", index=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    claim_token: Mapped[str | None] = mapped_column(String(32), nullable=True, index=True)
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class ERPStatus(Base):
     __tablename__ = "erp_status"
 
@@ -1,3 +1,5 @@
+import asyncio
+import os
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -11,7 +13,8 @@ from db import models as _db_models  # noqa: F401
 from db import models_crm as _db_crm_models  # noqa: F401
 from db import models_logging as _db_logging_models  # noqa: F401
 from db import models_enterprise as _db_enterprise_models  # noqa: F401
-from routers import analytics, auth, callcenter, crm, eligibility, erp, fraud, hospital, sales, status, triage, voice, whatsapp
+from routers import analytics, auth, callcenter, crm, eligibility, erp, fraud, hospital, sales, status, transcription, triage, voice, whatsapp
+from services import hospital_service, http_client, triage_service, whatsapp_service, whatsapp_webhooks
 from services.ai_service import AIService
 from services.stt_service import STTService
 
@@ -70,6 +73,95 @@ async def on_startup() -> None:
     except Exception as exc:
         print(f"[startup] Database initialization skipped: {exc}")
 
+    # Hot reload of the triage rule file; set to 0 to disable polling.
+    rules_watch_seconds = float(os.getenv("TRIAGE_RULES_WATCH_SECONDS", "30"))
+    if rules_watch_seconds > 0:
+        app.state.triage_rules_watcher = asyncio.create_task(triage_service.watch_rule_file(rules_watch_seconds))
+
+    # Outbox workers deliver queued WhatsApp/SMS messages; 0 leaves draining to another process.
+    outbox_workers = int(os.getenv("WHATSAPP_OUTBOX_WORKERS", "4"))
+    if outbox_workers > 0:
+        outbox_pool = whatsapp_service.OutboxWorkerPool(
+            worker_count=outbox_workers,
+            poll_seconds=float(os.getenv("WHATSAPP_OUTBOX_POLL_SECONDS", "2")),
+            max_attempts=int(os.getenv("WHATSAPP_OUTBOX_MAX_ATTEMPTS", "5")),
+            retry_base_seconds=float(os.getenv("WHATSAPP_OUTBOX_RETRY_BASE_SECONDS", "5")),
+            lease_seconds=float(os.getenv("WHATSAPP_OUTBOX_LEASE_SECONDS", "300")),
+            rate_limit_max_wait=float(os.getenv("SEND_RATE_LIMIT_MAX_WAIT_SECONDS", "5")),
+        )
+        try:
+            await outbox_pool.start()
+            app.state.whatsapp_outbox = outbox_pool
+        except Exception as exc:
+            print(f"[startup] WhatsApp outbox workers skipped: {exc}")
+
+    # Provider status callbacks are buffered and written in batches.
+    try:
+        await whatsapp_webhooks.ensure_log_indexes()
+    except Exception as exc:
+        print(f"[startup] WhatsApp log index check skipped: {exc}")
+    app.state.whatsapp_status_flusher = asyncio.create_task(whatsapp_webhooks.STATUS_BUFFER.run())
+
+    # Delivery statuses are also polled in bulk; with webhooks configured this is only a slow safety net.
+    default_reconcile_seconds = "600" if whatsapp_webhooks.webhook_base_url() else "30"
+    reconcile_seconds = float(os.getenv("WHATSAPP_RECONCILE_SECONDS", "").strip() or default_reconcile_seconds)
+    if reconcile_seconds > 0:
+        app.state.whatsapp_reconciler = asyncio.create_task(
+            whatsapp_service.run_delivery_reconciler(
+                reconcile_seconds,
+                concurrency=int(os.getenv("WHATSAPP_RECONCILE_CONCURRENCY", "4")),
+                max_age_hours=float(os.getenv("WHATSAPP_RECONCILE_MAX_AGE_HOURS", "72")),
+            )
+        )
+
+    # Shared keep-alive client for outbound calls (OSM and messaging providers); closed on shutdown.
+    await http_client.open_http_client()
+
+    # Local hospital index: seeded on first run, then refreshed from OSM in the background.
+    extract_path = os.getenv("HOSPITAL_EXTRACT_PATH", "").strip()
+    try:
+        loaded = await hospital_service.initialize_hospital_index(Path(extract_path) if extract_path else None)
+        print(f"[startup] Hospital index loaded with {loaded} hospitals")
+    except Exception as exc:
+        print(f"[startup] Hospital index skipped, using live lookups: {exc}")
+    hospital_refresh_seconds = float(os.getenv("HOSPITAL_INDEX_REFRESH_SECONDS", "86400"))
+    if hospital_refresh_seconds > 0 and hospital_service.HOSPITAL_INDEX.loaded:
+        app.state.hospital_index_refresher = asyncio.create_task(hospital_service.refresh_hospital_index(hospital_refresh_seconds))
+
+    # Warm the hospital cache for top cities in the background; startup does not wait for it.
+    prewarm_concurrency = int(os.getenv("HOSPITAL_PREWARM_CONCURRENCY", "2"))
+    if prewarm_concurrency > 0:
+        app.state.hospital_prewarmer = asyncio.create_task(
+            hospital_service.run_hospital_prewarm(
+                interval_seconds=float(os.getenv("HOSPITAL_PREWARM_INTERVAL_SECONDS", "3600")),
+                top_n=int(os.getenv("HOSPITAL_PREWARM_TOP_CITIES", "20")),
+                concurrency=prewarm_concurrency,
+                min_interval_seconds=float(os.getenv("HOSPITAL_PREWARM_MIN_INTERVAL_SECONDS", "1")),
+            )
+        )
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    for task_name in (
+        "triage_rules_watcher",
+        "hospital_index_refresher",
+        "hospital_prewarmer",
+        "whatsapp_reconciler",
+        "whatsapp_status_flusher",
+    ):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+    try:
+        await whatsapp_webhooks.STATUS_BUFFER.flush()
+    except Exception as exc:
+        print(f"[shutdown] Delivery status flush failed: {exc}")
+    outbox_pool = getattr(app.state, "whatsapp_outbox", None)
+    if outbox_pool is not None:
+        await outbox_pool.stop()
+    await http_client.close_http_client()
+
 BASE_DIR = Path(__file__).resolve().parent
 
 
@@ -109,6 +201,7 @@ async def serve_app():
 
 app.include_router(voice.router)
 app.include_router(triage.router)
+app.include_router(transcription.stream_router)
 app.include_router(eligibility.router)
 app.include_router(hospital.router)
 app.include_router(status.router)
@@ -1,12 +1,16 @@
 from .schemas import (
     EligibilityRequest,
     EligibilityResponse,
+    EligibilitySweepRequest,
+    EligibilitySweepResponse,
     HospitalSuggestionRequest,
     HospitalSuggestionResponse,
     ProtectedResponse,
     SignupRequest,
     StatusResponse,
     TokenResponse,
+    TriageBatchRequest,
+    TriageBatchResponse,
     TriageRequest,
     TriageResponse,
     UserResponse,
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -37,6 +38,35 @@ class TriageResponse(BaseModel):
     detected_symptoms: list[str]
 
 
+class TranscriptionResponse(BaseModel):
+    transcript: str
+    session_id: str
+    disclaimer: str = MEDICAL_DISCLAIMER
+
+
+class StreamingTranscriptionResponse(BaseModel):
+    transcript: str
+    is_final: bool = False
+    running_transcript: str = ""
+    triage: TriageResponse | None = None
+
+
+class EmergencyFlagEvent(BaseModel):
+    event: str = "emergency_flag"
+    emergency_flag: bool = True
+    risk_level: str = "HIGH"
+    red_flags: list[str]
+    running_transcript: str
+
+
+class TriageBatchRequest(BaseModel):
+    items: list[TriageRequest] = Field(..., min_length=1, max_length=5000)
+
+
+class TriageBatchResponse(BaseModel):
+    results: list[TriageResponse]
+
+
 class EligibilityRequest(BaseModel):
     income: float = Field(..., ge=0)
     age: int = Field(..., ge=0)
@@ -72,8 +102,65 @@ class EligibilityResponse(BaseModel):
     disclaimer: str = MEDICAL_DISCLAIMER
 
 
+class SweepRange(BaseModel):
+    start: float = Field(..., ge=0)
+    stop: float = Field(..., ge=0)
+    step: float = Field(..., gt=0)
+
+
+SweepToggle = Literal[
+    "bpl_card",
+    "has_chronic_illness",
+    "has_disability",
+    "is_pregnant",
+    "rural_resident",
+    "has_government_id",
+]
+
+
+class EligibilitySweepRequest(BaseModel):
+    base: EligibilityRequest
+    income: SweepRange | None = None
+    age: SweepRange | None = None
+    toggles: list[SweepToggle] = Field(default_factory=list)
+    include_grid: bool = False
+
+
+class SweepFlip(BaseModel):
+    axis: str
+    from_value: float | int | bool
+    to_value: float | int | bool
+    eligible: bool
+
+
+class SchemeSweepResult(BaseModel):
+    scheme_name: str
+    eligible_at_base: bool
+    eligible_points: int
+    flips: list[SweepFlip]
+
+
+class SweepPoint(BaseModel):
+    values: dict[str, float | int | bool]
+    eligible: bool
+    score: int
+    eligible_schemes: list[str]
+
+
+class EligibilitySweepResponse(BaseModel):
+    grid_size: int
+    axes: dict[str, list[float | int | bool]]
+    eligible_at_base: bool
+    score_at_base: int
+    eligibility_flips: list[SweepFlip]
+    schemes: list[SchemeSweepResult]
+    grid: list[SweepPoint] | None = None
+
+
 class HospitalSuggestionRequest(BaseModel):
     city: str = Field(..., min_length=2)
+    government: bool | None = None
+    scheme_supported: bool | None = None
 
 
 class HospitalItem(BaseModel):
@@ -81,14 +168,30 @@ class HospitalItem(BaseModel):
     government: bool = True
     scheme_supported: bool = True
     contact_number: str
+    latitude: float | None = None
+    longitude: float | None = None
 
 
 class HospitalSuggestionResponse(BaseModel):
     city: str
+    state_code: str | None = None
     hospitals: list[HospitalItem]
     disclaimer: str = MEDICAL_DISCLAIMER
 
 
+class NearbyHospital(HospitalItem):
+    city: str
+    distance_km: float
+
+
+class HospitalNearestResponse(BaseModel):
+    latitude: float
+    longitude: float
+    radius_km: float
+    hospitals: list[NearbyHospital]
+    disclaimer: str = MEDICAL_DISCLAIMER
+
+
 class SignupRequest(BaseModel):
     full_name: str = Field(..., min_length=2)
     email: str = Field(..., min_length=5)
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import EligibilityRecord, User
 from db.session import get_db_session
-from models.schemas import EligibilityRequest, EligibilityResponse
-from services.auth_service import get_current_user
+from models.schemas import EligibilityRequest, EligibilityResponse, EligibilitySweepRequest, EligibilitySweepResponse
+from services.auth_service import get_current_user, require_admin
 from services import eligibility_service, logging_service
 
 router = APIRouter(tags=["eligibility"])
@@ -38,3 +38,21 @@ async def check_eligibility(
     )
 
     return EligibilityResponse(**result)
+
+
+@router.post("/eligibility/sweep", response_model=EligibilitySweepResponse)
+async def sweep_eligibility(
+    data: EligibilitySweepRequest,
+    current_user: User = Depends(get_current_user),
+) -> EligibilitySweepResponse:
+    # What-if exploration only: nothing is recorded or logged.
+    try:
+        result = eligibility_service.sweep_eligibility(data)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return EligibilitySweepResponse(**result)
+
+
+@router.get("/eligibility/cache/stats")
+async def eligibility_cache_stats(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    return eligibility_service.get_eligibility_cache_stats()
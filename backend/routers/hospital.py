@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
 
-from models.schemas import HospitalSuggestionRequest, HospitalSuggestionResponse
+from db.models import User
+from models.schemas import HospitalNearestResponse, HospitalSuggestionRequest, HospitalSuggestionResponse
 from services import hospital_service
+from services.auth_service import require_admin
 
 router = APIRouter(prefix="/hospital", tags=["hospital"])
 
@@ -9,5 +11,52 @@ router = APIRouter(prefix="/hospital", tags=["hospital"])
 @router.post("/suggest", response_model=HospitalSuggestionResponse)
 async def suggest_hospital(data: HospitalSuggestionRequest) -> HospitalSuggestionResponse:
     # Route stays minimal; business logic sits in service layer.
-    result = await hospital_service.suggest_hospitals(city=data.city)
+    result = await hospital_service.suggest_hospitals(
+        city=data.city,
+        government=data.government,
+        scheme_supported=data.scheme_supported,
+    )
     return HospitalSuggestionResponse(**result)
+
+
+@router.get("/nearest", response_model=HospitalNearestResponse)
+async def nearest_hospitals(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10.0, gt=0, le=250),
+    k: int = Query(10, ge=1, le=100),
+    government: bool | None = None,
+    scheme_supported: bool | None = None,
+) -> HospitalNearestResponse:
+    # Answered from the in-memory spatial index; no network or DB access.
+    result = await hospital_service.nearest_hospitals(
+        latitude=lat,
+        longitude=lon,
+        radius_km=radius_km,
+        k=k,
+        government=government,
+        scheme_supported=scheme_supported,
+    )
+    return HospitalNearestResponse(**result)
+
+
+@router.get("/index/stats")
+async def hospital_index_stats(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    return hospital_service.get_hospital_index_stats()
+
+
+@router.get("/cache/stats")
+async def osm_cache_stats(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    return hospital_service.get_osm_cache_stats()
+
+
+@router.get("/prewarm/status")
+async def hospital_prewarm_status(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    return hospital_service.get_prewarm_status()
+
+
+@router.post("/index/reload")
+async def reload_hospital_index(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    # Picks up offline imports written to hospital_data by another process.
+    await hospital_service.load_hospital_index()
+    return hospital_service.get_hospital_index_stats()
@@ -2,10 +2,14 @@ from typing import Protocol
 
 from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, WebSocket
 
-from models.schemas import StreamingTranscriptionResponse, TranscriptionResponse
+from models.schemas import EmergencyFlagEvent, StreamingTranscriptionResponse, TranscriptionResponse, TriageResponse
+from services import triage_service
 from services.stt_service import STTService
 
 router = APIRouter(tags=["transcription"])
+# Mounted on its own: the /transcribe upload endpoint below duplicates /voice/transcribe
+# without authentication and stays unmounted.
+stream_router = APIRouter(tags=["transcription"])
 
 # Database integration note:
 # Add `db: AsyncSession = Depends(get_db_session)` in `/transcribe` when you
@@ -47,12 +51,16 @@ async def transcribe_audio(
     return TranscriptionResponse(transcript=transcript, session_id=session_id)
 
 
-@router.websocket("/ws-transcribe")
+@stream_router.websocket("/ws-transcribe")
 async def ws_transcribe(websocket: WebSocket) -> None:
     await websocket.accept()
     stt_service: STTService = websocket.app.state.stt_service
     db_client: DatabaseClient = websocket.app.state.db_client
-    session_id = "default-session"
+    session_id = websocket.query_params.get("session_id") or "default-session"
+    language = "hi" if websocket.query_params.get("language") == "hi" else "en"
+
+    # One running transcript per connection, triaged as each chunk arrives.
+    triage_session = triage_service.StreamingTriageSession(language=language)
 
     await db_client.log_event(session_id, "WebSocket transcription session started")
 
@@ -61,7 +69,24 @@ async def ws_transcribe(websocket: WebSocket) -> None:
             audio_chunk = await websocket.receive_bytes()
             transcript = await stt_service.transcribe_stream_chunk(audio_chunk)
 
-            payload = StreamingTranscriptionResponse(transcript=transcript, is_final=False)
+            context = triage_session.add_chunk(transcript)
+            triage_result: TriageResponse | None = None
+            if context is not None:
+                # Escalate before building the full advisory so the client can
+                # act on chest-pain/breathing calls as early as possible.
+                red_flags = triage_session.raise_emergency(context)
+                if red_flags:
+                    event = EmergencyFlagEvent(red_flags=red_flags, running_transcript=triage_session.transcript)
+                    await websocket.send_json(event.model_dump())
+                    await db_client.log_event(session_id, f"Emergency flagged during streaming: {', '.join(red_flags)}")
+                triage_result = TriageResponse(**triage_session.result(context))
+
+            payload = StreamingTranscriptionResponse(
+                transcript=transcript,
+                is_final=False,
+                running_transcript=triage_session.transcript,
+                triage=triage_result,
+            )
             await websocket.send_json(payload.model_dump())
     except Exception:
         await db_client.log_event(session_id, "WebSocket transcription session ended")
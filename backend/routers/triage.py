@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import InteractionLog, User
 from db.session import get_db_session
-from models.schemas import TriageRequest, TriageResponse
-from services.auth_service import get_current_user
+from models.schemas import TriageBatchRequest, TriageBatchResponse, TriageRequest, TriageResponse
+from services.auth_service import get_current_user, require_admin
 from services import logging_service, triage_service
 
 router = APIRouter(tags=["triage"])
@@ -38,3 +39,58 @@ async def classify_triage(
     )
 
     return TriageResponse(**result)
+
+
+@router.post("/triage/batch", response_model=TriageBatchResponse)
+async def classify_triage_batch(
+    data: TriageBatchRequest,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+) -> TriageBatchResponse:
+    # One rule-engine pass for the whole batch; per-item output matches /triage.
+    results = await triage_service.analyze_symptoms_batch(
+        [(item.symptom_text, item.language) for item in data.items]
+    )
+
+    # Both log tables are written with bulk INSERTs and committed together.
+    await db.execute(
+        insert(InteractionLog),
+        [
+            {
+                "user_id": current_user.id,
+                "symptom_text": item.symptom_text,
+                "risk_level": str(result["risk_level"]),
+                "emergency_flag": bool(result["emergency_flag"]),
+            }
+            for item, result in zip(data.items, results)
+        ],
+    )
+    await logging_service.log_interactions_bulk(
+        db=db,
+        phone_number=current_user.phone,
+        entries=[(item.symptom_text, str(result["risk_level"])) for item, result in zip(data.items, results)],
+        eligibility_result="pending",
+    )
+
+    return TriageBatchResponse(results=[TriageResponse(**result) for result in results])
+
+
+@router.get("/triage/cache/stats")
+async def triage_cache_stats(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    return triage_service.get_triage_cache_stats()
+
+
+@router.get("/triage/rules")
+async def triage_rules(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    return triage_service.describe_rule_set()
+
+
+@router.post("/triage/rules/reload")
+async def reload_triage_rules(_admin: User = Depends(require_admin)) -> dict[str, object]:
+    # Compiles off the event loop, then swaps atomically; other workers pick
+    # the change up through their rule-file watcher.
+    try:
+        await triage_service.reload_rule_set()
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Rule file not loaded: {exc}") from exc
+    return triage_service.describe_rule_set()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.session import get_db_session
@@ -7,8 +7,8 @@ from models.enterprise_schemas import (
     WhatsAppSummaryRequest,
     WhatsAppSummaryResponse,
 )
-from services import whatsapp_service
-from services.auth_service import get_current_user
+from services import messaging_providers, whatsapp_service, whatsapp_webhooks
+from services.auth_service import get_current_user, require_admin
 
 router = APIRouter(prefix="/whatsapp", tags=["whatsapp"])
 
@@ -84,7 +84,7 @@ async def delivery_status(
     db: AsyncSession = Depends(get_db_session),
     _current_user=Depends(get_current_user),
 ) -> WhatsAppSummaryResponse:
-    row = await whatsapp_service.refresh_delivery_status(db, log_id=log_id)
+    row = await whatsapp_service.get_delivery_status(db, log_id=log_id)
     if row is None:
         raise HTTPException(status_code=404, detail="WhatsApp log not found")
 
@@ -95,3 +95,51 @@ async def delivery_status(
         provider_reference=row.provider_reference,
         created_at=row.created_at,
     )
+
+
+@router.get("/outbox/stats")
+async def outbox_stats(
+    db: AsyncSession = Depends(get_db_session),
+    _admin=Depends(require_admin),
+) -> dict[str, object]:
+    return await whatsapp_service.get_outbox_stats(db)
+
+
+@router.get("/rate-limits")
+async def rate_limits(_admin=Depends(require_admin)) -> dict[str, object]:
+    # Current token levels of the per-provider, per-sender send buckets.
+    return await whatsapp_service.get_rate_limit_levels()
+
+
+@router.get("/providers/stats")
+async def provider_stats(_admin=Depends(require_admin)) -> dict[str, object]:
+    # Requests and connection reuse of each provider's HTTP pool.
+    return messaging_providers.get_provider_stats()
+
+
+@router.post("/webhook/{provider}", status_code=204)
+async def delivery_webhook(provider: str, request: Request) -> Response:
+    # Provider status callbacks: verified, buffered, and written in batches.
+    body = await request.body()
+    try:
+        status_update = whatsapp_webhooks.parse_status_callback(
+            provider,
+            request_url=str(request.url),
+            path=request.url.path,
+            query=request.url.query,
+            headers=dict(request.headers),
+            body=body,
+        )
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    whatsapp_webhooks.STATUS_BUFFER.add(status_update)
+    return Response(status_code=204)
+
+
+@router.get("/webhook/stats")
+async def webhook_stats(_admin=Depends(require_admin)) -> dict[str, object]:
+    return whatsapp_webhooks.STATUS_BUFFER.stats()
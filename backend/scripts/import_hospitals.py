@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from db.database import engine, init_db  # noqa: E402
+from services import hospital_service, http_client  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        await init_db()
+        if args.extract is not None:
+            count = await hospital_service.import_hospital_extract(args.extract)
+            print(f"Imported {count} hospitals from {args.extract}")
+        for city in args.refresh_osm:
+            count = await hospital_service.refresh_city_from_osm(city)
+            print(f"Fetched {count} hospitals for {city} from OSM" if count else f"No OSM results for {city}; kept existing rows")
+            await asyncio.sleep(1)
+    finally:
+        await http_client.close_http_client()
+        await engine.dispose()
+    print("Running servers pick this up on their next index refresh, or via POST /hospital/index/reload.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load hospitals into the local hospital index (hospital_data table).")
+    parser.add_argument("extract", type=Path, nargs="?", help="offline extract (JSON list or CSV) replacing the cities it contains")
+    parser.add_argument("--refresh-osm", nargs="+", default=[], metavar="CITY", help="fetch these cities from OpenStreetMap")
+    args = parser.parse_args()
+    if args.extract is None and not args.refresh_osm:
+        parser.error("give an extract file and/or --refresh-osm CITY ...")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import Table, bindparam, func, select, update
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from db.database import engine  # noqa: E402
+from db.models import InteractionLog  # noqa: E402
+from db.models_logging import InteractionLog as BasicInteractionLog  # noqa: E402
+from services import triage_service  # noqa: E402
+
+
+TABLES: dict[str, Table] = {
+    "interaction_logs": InteractionLog.__table__,
+    "interaction_logs_basic": BasicInteractionLog.__table__,
+}
+
+# Rows written by the eligibility flow are placeholders, not symptom reports.
+SKIPPED_RISK_LEVELS = {"UNKNOWN"}
+
+
+def classify_chunk(rows: list[tuple[int, str]]) -> list[tuple[int, str, bool]]:
+    # Runs inside pool workers; each worker compiles the rule file once on import.
+    results: list[tuple[int, str, bool]] = []
+    for row_id, symptom_text in rows:
+        risk_level, emergency_flag = triage_service.classify_symptom_text(symptom_text)
+        results.append((row_id, risk_level, emergency_flag))
+    return results
+
+
+def load_checkpoint(path: Path) -> dict[str, object]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_checkpoint(path: Path, checkpoint: dict[str, object]) -> None:
+    # Write-then-rename so a crash never leaves a half-written checkpoint.
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    temp_path.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+    temp_path.replace(path)
+
+
+async def read_chunk(table: Table, after_id: int, chunk_size: int) -> list[tuple[int, str, str, bool | None]]:
+    has_emergency = "emergency_flag" in table.c
+    columns = [table.c.id, table.c.symptom_text, table.c.risk_level]
+    if has_emergency:
+        columns.append(table.c.emergency_flag)
+
+    statement = (
+        select(*columns)
+        .where(table.c.id > after_id)
+        .order_by(table.c.id)
+        .limit(chunk_size)
+        .execution_options(yield_per=chunk_size)
+    )
+    rows: list[tuple[int, str, str, bool | None]] = []
+    async with engine.connect() as conn:
+        # Server-side cursor: rows are streamed instead of buffered by the driver.
+        result = await conn.stream(statement)
+        async for row in result:
+            rows.append((row[0], row[1], row[2], row[3] if has_emergency else None))
+    return rows
+
+
+async def write_changes(table: Table, changes: list[dict[str, object]]) -> None:
+    if not changes:
+        return
+    values: dict[str, object] = {"risk_level": bindparam("new_risk_level")}
+    if "emergency_flag" in table.c:
+        values["emergency_flag"] = bindparam("new_emergency_flag")
+    statement = update(table).where(table.c.id == bindparam("row_id")).values(**values)
+    async with engine.begin() as conn:
+        await conn.execute(statement, changes)
+
+
+async def reclassify_table(
+    name: str,
+    pool: ProcessPoolExecutor,
+    *,
+    chunk_size: int,
+    max_in_flight: int,
+    checkpoint: dict[str, object],
+    checkpoint_path: Path,
+    dry_run: bool,
+) -> None:
+    table = TABLES[name]
+    last_ids: dict[str, int] = checkpoint.setdefault("last_ids", {})
+    last_id = int(last_ids.get(name, 0))
+
+    async with engine.connect() as conn:
+        remaining = await conn.scalar(select(func.count()).select_from(table).where(table.c.id > last_id)) or 0
+    print(f"[{name}] resuming after id {last_id}; {remaining} rows to scan")
+
+    loop = asyncio.get_running_loop()
+    in_flight: deque[tuple[asyncio.Future, dict[int, tuple[str, bool | None]], int]] = deque()
+    read_after = last_id
+    exhausted = False
+    scanned = changed = 0
+    started = time.perf_counter()
+
+    while in_flight or not exhausted:
+        # Keep the pool busy while earlier chunks are still being written.
+        while not exhausted and len(in_flight) < max_in_flight:
+            rows = await read_chunk(table, read_after, chunk_size)
+            if not rows:
+                exhausted = True
+                break
+            read_after = rows[-1][0]
+            current = {row_id: (risk_level, emergency_flag) for row_id, _, risk_level, emergency_flag in rows}
+            work = [(row_id, symptom_text) for row_id, symptom_text, risk_level, _ in rows if risk_level not in SKIPPED_RISK_LEVELS]
+            in_flight.append((loop.run_in_executor(pool, classify_chunk, work), current, read_after))
+
+        if not in_flight:
+            break
+
+        # Chunks are finished in order so the checkpoint only ever moves forward.
+        future, current, chunk_last_id = in_flight.popleft()
+        changes: list[dict[str, object]] = []
+        for row_id, risk_level, emergency_flag in await future:
+            old_risk_level, old_emergency_flag = current[row_id]
+            if risk_level == old_risk_level and (old_emergency_flag is None or emergency_flag == old_emergency_flag):
+                continue
+            changes.append({"row_id": row_id, "new_risk_level": risk_level, "new_emergency_flag": emergency_flag})
+
+        if not dry_run:
+            await write_changes(table, changes)
+            last_ids[name] = chunk_last_id
+            save_checkpoint(checkpoint_path, checkpoint)
+
+        scanned += len(current)
+        changed += len(changes)
+        elapsed = time.perf_counter() - started
+        rate = scanned / elapsed if elapsed else 0.0
+        eta = (remaining - scanned) / rate if rate else 0.0
+        print(
+            f"[{name}] {scanned}/{remaining} rows scanned, {changed} changed, "
+            f"up to id {chunk_last_id}, {rate:,.0f} rows/s, eta {eta:,.0f}s"
+        )
+
+    print(f"[{name}] done: {scanned} rows scanned, {changed} {'would change' if dry_run else 'updated'}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    rule_version = triage_service.get_rule_set().version
+    checkpoint = {} if args.restart else load_checkpoint(args.checkpoint)
+    if checkpoint and checkpoint.get("rule_version") != rule_version:
+        print(
+            f"Checkpoint {args.checkpoint} was written with rule version {checkpoint.get('rule_version')}, "
+            f"current version is {rule_version}. Use --restart to rescore from the beginning."
+        )
+        return 1
+    checkpoint["rule_version"] = rule_version
+
+    table_names = list(TABLES) if args.table == "all" else [args.table]
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for name in table_names:
+                await reclassify_table(
+                    name,
+                    pool,
+                    chunk_size=args.chunk_size,
+                    max_in_flight=args.workers * 2,
+                    checkpoint=checkpoint,
+                    checkpoint_path=args.checkpoint,
+                    dry_run=args.dry_run,
+                )
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Re-score historical interaction logs with the current triage rules.",
+    )
+    parser.add_argument("--table", choices=["all", *TABLES], default="all")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per primary-key chunk (default: 5000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="classifier processes (default: CPU count)")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=Path("reclassify_checkpoint.json"),
+        help="progress file used to resume an interrupted run",
+    )
+    parser.add_argument("--restart", action="store_true", help="ignore any existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,258 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, TextIO
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from models.schemas import EligibilityRequest  # noqa: E402
+from services import eligibility_service  # noqa: E402
+
+
+# Column types and lower bounds mirror the EligibilityRequest schema.
+NUMERIC_COLUMNS: dict[str, tuple[type, int]] = {
+    "income": (float, 0),
+    "age": (int, 0),
+    "family_size": (int, 1),
+    "annual_hospital_visits": (int, 0),
+}
+BOOLEAN_COLUMNS = [
+    "bpl_card",
+    "has_chronic_illness",
+    "has_disability",
+    "is_pregnant",
+    "rural_resident",
+    "has_government_id",
+]
+BOOLEAN_TEXT = {
+    **dict.fromkeys(["true", "t", "yes", "y", "1"], True),
+    **dict.fromkeys(["false", "f", "no", "n", "0"], False),
+}
+NUMBER_LABELS = {float: "a number", int: "an integer"}
+
+CSV_FIELDS = ["row", "id", "eligible", "score", "estimated_priority", "top_scheme", "eligible_schemes", "matched_rules", "error"]
+
+
+def _default(name: str) -> Any:
+    field = EligibilityRequest.model_fields[name]
+    return None if field.is_required() else field.default
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _coerce_number(value: Any, kind: type) -> float | int:
+    if isinstance(value, bool):
+        raise ValueError
+    if kind is float:
+        return float(value)
+    if isinstance(value, int):
+        return value
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError
+    return int(number)
+
+
+def _coerce_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    parsed = BOOLEAN_TEXT.get(value) if isinstance(value, str) else None
+    if parsed is None:
+        parsed = BOOLEAN_TEXT.get(str(value).strip().lower())
+    if parsed is None:
+        raise ValueError
+    return parsed
+
+
+def coerce_columns(raw: dict[str, list[Any]], rows: int) -> tuple[dict[str, list[Any]], dict[int, str]]:
+    """Validate raw columns against the request schema; invalid rows are reported, not raised."""
+    columns: dict[str, list[Any]] = {}
+    errors: dict[int, str] = {}
+
+    def column_values(name: str) -> list[Any]:
+        values = raw.get(name)
+        default = _default(name)
+        if values is None:
+            return [default] * rows
+        return [default if _is_blank(value) else value for value in values]
+
+    for name, (kind, minimum) in NUMERIC_COLUMNS.items():
+        coerced: list[Any] = []
+        for row, value in enumerate(column_values(name)):
+            if value is None:
+                errors.setdefault(row, f"{name} is required")
+                coerced.append(minimum)
+                continue
+            try:
+                number = _coerce_number(value, kind)
+            except (TypeError, ValueError):
+                errors.setdefault(row, f"{name} must be {NUMBER_LABELS[kind]}: {value!r}")
+                coerced.append(minimum)
+                continue
+            if number < minimum:
+                errors.setdefault(row, f"{name} must be >= {minimum}: {value!r}")
+            coerced.append(number)
+        columns[name] = coerced
+
+    for name in BOOLEAN_COLUMNS:
+        coerced = []
+        for row, value in enumerate(column_values(name)):
+            try:
+                coerced.append(_coerce_bool(value))
+            except ValueError:
+                errors.setdefault(row, f"{name} must be a boolean: {value!r}")
+                coerced.append(False)
+        columns[name] = coerced
+
+    states: list[str] = []
+    for row, value in enumerate(column_values("state")):
+        state = "" if value is None else str(value)
+        if len(state) < 2:
+            errors.setdefault(row, "state must be at least 2 characters")
+        states.append(state)
+    columns["state"] = states
+    return columns, errors
+
+
+def read_csv_chunks(path: Path, chunk_size: int) -> Iterator[dict[str, list[Any]]]:
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = [name.strip() for name in next(reader, [])]
+        chunk: list[list[str]] = []
+        for record in reader:
+            if not any(cell.strip() for cell in record):
+                continue
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield _transpose(header, chunk)
+                chunk = []
+        if chunk:
+            yield _transpose(header, chunk)
+
+
+def _transpose(header: list[str], records: list[list[str]]) -> dict[str, list[Any]]:
+    columns: dict[str, list[Any]] = {}
+    for index, name in enumerate(header):
+        columns[name] = [record[index] if index < len(record) else "" for record in records]
+    return columns
+
+
+def read_parquet_chunks(path: Path, chunk_size: int) -> Iterator[dict[str, list[Any]]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise SystemExit("Reading Parquet files requires pyarrow (pip install pyarrow).") from exc
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield batch.to_pydict()
+
+
+def summarize(result: dict[str, object]) -> dict[str, object]:
+    return {
+        "eligible": result["eligible"],
+        "score": result["score"],
+        "estimated_priority": result["benefits"]["estimated_priority"],
+        "top_scheme": result["benefits"]["scheme_name"] if result["eligible"] else None,
+        "eligible_schemes": [decision["scheme_name"] for decision in result["scheme_decisions"] if decision["eligible"]],
+        "matched_rules": result["matched_rules"],
+    }
+
+
+def screen_file(
+    path: Path,
+    output: TextIO,
+    *,
+    output_format: str,
+    full: bool,
+    chunk_size: int,
+    id_column: str | None,
+) -> tuple[int, int, int]:
+    reader = read_parquet_chunks if path.suffix.lower() in {".parquet", ".pq"} else read_csv_chunks
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+    total = eligible = invalid = 0
+    for raw in reader(path, chunk_size):
+        rows = len(next(iter(raw.values()), []))
+        columns, errors = coerce_columns(raw, rows)
+        ids = raw.get(id_column) if id_column else None
+
+        # Invalid rows are reported in place and left out of the rule evaluation.
+        valid_rows = [row for row in range(rows) if row not in errors]
+        if errors:
+            columns = {name: [values[row] for row in valid_rows] for name, values in columns.items()}
+        results = iter(eligibility_service.screen_household_columns(columns))
+
+        for row in range(rows):
+            record: dict[str, object] = {"row": total + row + 1}
+            if ids is not None:
+                record["id"] = ids[row]
+            if row in errors:
+                invalid += 1
+                record["error"] = errors[row]
+            else:
+                result = next(results)
+                eligible += bool(result["eligible"])
+                record.update(result if full else summarize(result))
+
+            if writer is not None:
+                record["eligible_schemes"] = "; ".join(record.get("eligible_schemes") or [])
+                record["matched_rules"] = "; ".join(record.get("matched_rules") or [])
+                writer.writerow(record)
+            else:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        total += rows
+    return total, eligible, invalid
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Pre-screen a household survey file (CSV or Parquet) against the scheme eligibility rules.",
+    )
+    parser.add_argument("input", type=Path, help="CSV or Parquet file with EligibilityRequest columns")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="output format (default: ndjson)")
+    parser.add_argument("--output", type=Path, help="write results to this file instead of stdout")
+    parser.add_argument("--full", action="store_true", help="emit the full eligibility payload per row (ndjson only)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows evaluated per batch (default: 50000)")
+    parser.add_argument("--id-column", help="input column copied to each output row as 'id'")
+    args = parser.parse_args()
+
+    if args.full and args.format != "ndjson":
+        parser.error("--full is only supported with --format ndjson")
+
+    started = time.perf_counter()
+    output = args.output.open("w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        total, eligible, invalid = screen_file(
+            args.input,
+            output,
+            output_format=args.format,
+            full=args.full,
+            chunk_size=args.chunk_size,
+            id_column=args.id_column,
+        )
+    finally:
+        if args.output:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Screened {total} rows in {elapsed:.2f}s: {eligible} eligible, {invalid} invalid",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,8 @@
 import os
 import importlib
+import statistics
+from collections import OrderedDict, deque
+from collections.abc import Hashable
 from typing import Any
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -54,3 +57,58 @@ async def close_redis() -> None:
         if close_method is not None:
             await close_method()
         _redis_client = None
+
+
+class PayloadCache:
+    """
+    In-process bounded LRU of finished response payloads, with hit/miss
+    counters and latency samples for hits and misses so the effect of the
+    cache can be compared directly. Callers choose keys that fully determine
+    the payload.
+    """
+
+    def __init__(self, max_size: int, latency_samples: int = 1024) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, dict[str, object]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hit_latency_ms: deque[float] = deque(maxlen=latency_samples)
+        self._miss_latency_ms: deque[float] = deque(maxlen=latency_samples)
+
+    def get(self, key: Hashable) -> dict[str, object] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, payload: dict[str, object]) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_latency(self, hit: bool, elapsed_ms: float) -> None:
+        (self._hit_latency_ms if hit else self._miss_latency_ms).append(elapsed_ms)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "p50_hit_latency_ms": round(statistics.median(self._hit_latency_ms), 4) if self._hit_latency_ms else None,
+            "p50_miss_latency_ms": round(statistics.median(self._miss_latency_ms), 4) if self._miss_latency_ms else None,
+        }
@@ -1,324 +1,497 @@
-from models.schemas import EligibilityRequest, MEDICAL_DISCLAIMER
+import os
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from itertools import product
+from math import prod
+from typing import Any
 
+from models.schemas import EligibilityRequest, EligibilitySweepRequest, MEDICAL_DISCLAIMER, SweepRange
+from services.cache import PayloadCache
+from services.state_index import resolve_state_code
 
-async def check_scheme_eligibility(data: EligibilityRequest) -> dict[str, object]:
-    """
-    Rule-based eligibility (deterministic, no AI):
-    Core qualifiers:
-    - income <= 500000 OR bpl_card OR age >= 70
-    Extended support qualifier:
-    - (income <= 800000) AND (disability OR chronic illness OR pregnancy)
-    """
-    reasons: list[str] = []
-    matched_rules: list[str] = []
 
-    income_ok = data.income <= 500000
-    bpl_ok = bool(data.bpl_card)
-    senior_ok = data.age >= 70
-    support_vulnerability_ok = bool(data.has_disability or data.has_chronic_illness or data.is_pregnant)
-    extended_income_ok = data.income <= 800000
-    extended_support_ok = extended_income_ok and support_vulnerability_ok
-    family_large = data.family_size >= 5
-    high_utilization = data.annual_hospital_visits >= 3
-
-    if income_ok:
-        reasons.append("Eligible by income rule: income is within 500000 threshold.")
-        matched_rules.append("Income <= 500000")
-    else:
-        reasons.append("Income rule not met: income is above 500000 threshold.")
+# Household feature bits. Every scheme rule below is a predicate over this
+# bitmask, so evaluating a household is a few integer operations per scheme.
+FEATURE_INCOME_OK = 1 << 0  # income <= 500000
+FEATURE_BPL = 1 << 1
+FEATURE_SENIOR = 1 << 2  # age >= 70
+FEATURE_EXTENDED_INCOME_OK = 1 << 3  # income <= 800000
+FEATURE_VULNERABLE = 1 << 4  # disability, chronic illness or pregnancy
+FEATURE_FAMILY_LARGE = 1 << 5  # family size >= 5
+FEATURE_HIGH_UTILIZATION = 1 << 6  # 3+ hospital visits a year
+FEATURE_GOVERNMENT_ID = 1 << 7
+FEATURE_CHRONIC = 1 << 8
+FEATURE_DISABILITY = 1 << 9
+FEATURE_PREGNANT = 1 << 10
+FEATURE_RURAL = 1 << 11
+FEATURE_RURAL_FAMILY_4 = 1 << 12  # rural resident with family size >= 4
+FEATURE_AGE_UNDER_6 = 1 << 13
+FEATURE_AGE_UNDER_19 = 1 << 14
+FEATURE_AGE_ADOLESCENT = 1 << 15  # 10-19
+FEATURE_AGE_60_PLUS = 1 << 16
 
-    if bpl_ok:
-        reasons.append("Eligible by BPL rule: BPL card is available.")
-        matched_rules.append("BPL Card available")
-    else:
-        reasons.append("BPL rule not met: BPL card is not available.")
+STATE_FEATURES: dict[str, int] = {
+    code: 1 << (17 + index)
+    for index, code in enumerate(["MH", "GJ", "TG", "AP", "KL", "TN", "OD", "RJ", "KA", "UP"])
+}
 
-    if senior_ok:
-        reasons.append("Eligible by age rule: age is 70 or above.")
-        matched_rules.append("Age >= 70")
-    else:
-        reasons.append("Age rule not met: age is below 70.")
+@dataclass(frozen=True)
+class SchemeRule:
+    """Eligible when every `all_of` bit is set and, if given, at least one `any_of` bit."""
 
-    if extended_support_ok:
-        reasons.append(
-            "Eligible by extended support rule: vulnerability condition present with income within 800000 threshold."
-        )
-        matched_rules.append("Extended support rule")
-    elif support_vulnerability_ok:
-        reasons.append(
-            "Support vulnerability noted (disability/chronic illness/pregnancy), but income is above 800000 threshold."
-        )
-    else:
-        reasons.append("No additional vulnerability-based support rule matched.")
+    name: str
+    application_link: str
+    all_of: int
+    any_of: int
+    ok_reason: str
+    fail_reason: str
 
-    if family_large:
-        reasons.append("Family-size note: larger household (5+) may increase financial strain.")
-    if high_utilization:
-        reasons.append("Healthcare utilization note: frequent hospital usage suggests higher support need.")
 
-    scheme_decisions: list[dict[str, object]] = []
-    state_normalized = data.state.strip().lower()
-    scheme_application_links: dict[str, str] = {
-        "Ayushman Bharat - PM-JAY": "https://beneficiary.nha.gov.in/",
-        "ABHA Health ID (Ayushman Bharat Digital Mission)": "https://abha.abdm.gov.in/abha/v3/",
-        "National Dialysis Programme (under NHM)": "https://nhm.gov.in/",
-        "Pradhan Mantri Matru Vandana Yojana (PMMVY)": "https://pmmvy.wcd.gov.in/",
-        "Janani Suraksha Yojana (JSY)": "https://nhm.gov.in/",
-        "Janani Shishu Suraksha Karyakram (JSSK)": "https://nhm.gov.in/",
-        "Rashtriya Bal Swasthya Karyakram (RBSK)": "https://nhm.gov.in/",
-        "Rashtriya Kishor Swasthya Karyakram (RKSK)": "https://nhm.gov.in/",
-        "National Programme for Health Care of Elderly (NPHCE)": "https://nhm.gov.in/",
-        "Rashtriya Vayoshri Yojana (assistive support for senior citizens)": "https://www.alimco.in/",
-        "Disability Health Support (state/central disability-linked benefits)": "https://www.swavlambancard.gov.in/",
-        "Chronic Disease Support Programmes (state/NHM clinics)": "https://nhm.gov.in/",
-        "National TB Elimination Programme (NTEP)": "https://tbcindia.gov.in/",
-        "National AIDS Control Programme (NACP) - free HIV services": "https://naco.gov.in/",
-        "Mahatma Jyotiba Phule Jan Arogya Yojana (Maharashtra)": "https://www.jeevandayee.gov.in/",
-        "Mukhyamantri Amrutam / MA Vatsalya (Gujarat)": "https://maa.gujarat.gov.in/",
-        "Aarogyasri (Telangana)": "https://www.aarogyasri.telangana.gov.in/",
-        "Dr. YSR Aarogyasri (Andhra Pradesh)": "https://www.ysraarogyasri.ap.gov.in/",
-        "Karunya Arogya Suraksha Padhathi (Kerala)": "https://sha.kerala.gov.in/karunya-arogya-suraksha-padhathi-kasp/",
-        "Chief Minister's Comprehensive Health Insurance Scheme (Tamil Nadu)": "https://www.cmchistn.com/",
-        "Biju Swasthya Kalyan Yojana (Odisha)": "https://bsky.odisha.gov.in/",
-        "Mukhyamantri Chiranjeevi Health Insurance (Rajasthan)": "https://chiranjeevi.rajasthan.gov.in/",
-        "Ayushman Bharat - Mukhyamantri Jan Arogya Yojana (Karnataka)": "https://arogya.karnataka.gov.in/",
-        "Ayushman Bharat / State Health Assurance (Uttar Pradesh family schemes)": "https://pmjay.gov.in/",
-    }
+SCHEME_CATALOGUE: list[SchemeRule] = [
+    # --- National umbrella / insurance schemes ---
+    SchemeRule(
+        name="Ayushman Bharat - PM-JAY",
+        application_link="https://beneficiary.nha.gov.in/",
+        all_of=0,
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL | FEATURE_FAMILY_LARGE,
+        ok_reason="Household meets low-income/BPL or family-risk profile often mapped to PM-JAY verification.",
+        fail_reason="Usually requires low-income/BPL or similar deprivation indicators during official verification.",
+    ),
+    SchemeRule(
+        name="ABHA Health ID (Ayushman Bharat Digital Mission)",
+        application_link="https://abha.abdm.gov.in/abha/v3/",
+        all_of=FEATURE_GOVERNMENT_ID,
+        any_of=0,
+        ok_reason="Government ID available; digital health ID enrollment is typically feasible.",
+        fail_reason="Government ID usually required for ABHA registration.",
+    ),
+    SchemeRule(
+        name="National Dialysis Programme (under NHM)",
+        application_link="https://nhm.gov.in/",
+        all_of=FEATURE_CHRONIC | FEATURE_HIGH_UTILIZATION,
+        any_of=0,
+        ok_reason="Chronic condition with repeated hospital utilization may qualify for subsidized dialysis pathway.",
+        fail_reason="Typically considered when chronic renal/related high-burden clinical need is documented.",
+    ),
+    # --- Maternal / child health schemes ---
+    SchemeRule(
+        name="Pradhan Mantri Matru Vandana Yojana (PMMVY)",
+        application_link="https://pmmvy.wcd.gov.in/",
+        all_of=FEATURE_PREGNANT | FEATURE_GOVERNMENT_ID,
+        any_of=0,
+        ok_reason="Pregnancy and ID status indicate potential PMMVY entitlement.",
+        fail_reason="Generally requires pregnancy-linked registration and identity documentation.",
+    ),
+    SchemeRule(
+        name="Janani Suraksha Yojana (JSY)",
+        application_link="https://nhm.gov.in/",
+        all_of=FEATURE_PREGNANT,
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL | FEATURE_RURAL_FAMILY_4,
+        ok_reason="Maternal profile with socio-economic vulnerability matches common JSY screening factors.",
+        fail_reason="Usually prioritized for pregnant beneficiaries with socioeconomic vulnerability and institutional delivery linkage.",
+    ),
+    SchemeRule(
+        name="Janani Shishu Suraksha Karyakram (JSSK)",
+        application_link="https://nhm.gov.in/",
+        all_of=0,
+        any_of=FEATURE_PREGNANT | FEATURE_AGE_UNDER_6,
+        ok_reason="Maternal/newborn-child care profile aligns with JSSK support pathway.",
+        fail_reason="Primarily applicable for pregnancy, childbirth, newborn, and young child care episodes.",
+    ),
+    SchemeRule(
+        name="Rashtriya Bal Swasthya Karyakram (RBSK)",
+        application_link="https://nhm.gov.in/",
+        all_of=FEATURE_AGE_UNDER_19,
+        any_of=0,
+        ok_reason="Child/adolescent age group fits RBSK screening age bands.",
+        fail_reason="RBSK is generally targeted to newborn/child/adolescent age groups.",
+    ),
+    SchemeRule(
+        name="Rashtriya Kishor Swasthya Karyakram (RKSK)",
+        application_link="https://nhm.gov.in/",
+        all_of=FEATURE_AGE_ADOLESCENT,
+        any_of=0,
+        ok_reason="Age falls in adolescent bracket commonly covered under RKSK.",
+        fail_reason="RKSK is mainly designed for adolescent age group.",
+    ),
+    # --- Senior, disability, chronic care ---
+    SchemeRule(
+        name="National Programme for Health Care of Elderly (NPHCE)",
+        application_link="https://nhm.gov.in/",
+        all_of=FEATURE_AGE_60_PLUS,
+        any_of=0,
+        ok_reason="Senior age profile maps to geriatric care programme pathways.",
+        fail_reason="Generally oriented toward elderly beneficiaries (typically 60+).",
+    ),
+    SchemeRule(
+        name="Rashtriya Vayoshri Yojana (assistive support for senior citizens)",
+        application_link="https://www.alimco.in/",
+        all_of=FEATURE_AGE_60_PLUS | FEATURE_INCOME_OK,
+        any_of=0,
+        ok_reason="Senior low-income profile may fit assistive-care screening.",
+        fail_reason="Usually requires both senior age and socioeconomic need criteria.",
+    ),
+    SchemeRule(
+        name="Disability Health Support (state/central disability-linked benefits)",
+        application_link="https://www.swavlambancard.gov.in/",
+        all_of=FEATURE_DISABILITY,
+        any_of=0,
+        ok_reason="Declared disability indicates potential eligibility for disability-linked health benefits.",
+        fail_reason="Disability-linked health support generally requires certified disability status.",
+    ),
+    SchemeRule(
+        name="Chronic Disease Support Programmes (state/NHM clinics)",
+        application_link="https://nhm.gov.in/",
+        all_of=FEATURE_CHRONIC,
+        any_of=0,
+        ok_reason="Chronic illness profile aligns with long-term disease support pathways.",
+        fail_reason="Usually triggered when chronic disease documentation is available.",
+    ),
+    # --- Disease specific public programmes ---
+    SchemeRule(
+        name="National TB Elimination Programme (NTEP)",
+        application_link="https://tbcindia.gov.in/",
+        all_of=FEATURE_CHRONIC | FEATURE_HIGH_UTILIZATION,
+        any_of=0,
+        ok_reason="Frequent clinical burden may warrant TB-program screening/referral workflow.",
+        fail_reason="Programme linkage generally depends on disease-specific diagnosis workflow.",
+    ),
+    SchemeRule(
+        name="National AIDS Control Programme (NACP) - free HIV services",
+        application_link="https://naco.gov.in/",
+        all_of=FEATURE_CHRONIC,
+        any_of=0,
+        ok_reason="Chronic-care pathway can include referral for free HIV-related public services when indicated.",
+        fail_reason="Service access is disease-indication based and confirmed by medical evaluation.",
+    ),
+    # --- Major state health protection schemes (broad screening by state + vulnerability) ---
+    SchemeRule(
+        name="Mahatma Jyotiba Phule Jan Arogya Yojana (Maharashtra)",
+        application_link="https://www.jeevandayee.gov.in/",
+        all_of=STATE_FEATURES["MH"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL | FEATURE_RURAL,
+        ok_reason="State and vulnerability profile broadly align with MJPJAY screening factors.",
+        fail_reason="Primarily for Maharashtra residents meeting socioeconomic criteria.",
+    ),
+    SchemeRule(
+        name="Mukhyamantri Amrutam / MA Vatsalya (Gujarat)",
+        application_link="https://maa.gujarat.gov.in/",
+        all_of=STATE_FEATURES["GJ"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL,
+        ok_reason="Gujarat residence with low-income/BPL indicators matches common MA scheme filters.",
+        fail_reason="Requires Gujarat residence plus eligible income/deprivation criteria.",
+    ),
+    SchemeRule(
+        name="Aarogyasri (Telangana)",
+        application_link="https://www.aarogyasri.telangana.gov.in/",
+        all_of=STATE_FEATURES["TG"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL,
+        ok_reason="Telangana household with vulnerable economic profile may fit Aarogyasri pathway.",
+        fail_reason="Usually mapped for Telangana residents with qualifying socioeconomic category.",
+    ),
+    SchemeRule(
+        name="Dr. YSR Aarogyasri (Andhra Pradesh)",
+        application_link="https://www.ysraarogyasri.ap.gov.in/",
+        all_of=STATE_FEATURES["AP"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL,
+        ok_reason="Andhra Pradesh and low-income/BPL profile align with YSR Aarogyasri screening.",
+        fail_reason="Generally requires AP residence and qualifying socioeconomic status.",
+    ),
+    SchemeRule(
+        name="Karunya Arogya Suraksha Padhathi (Kerala)",
+        application_link="https://sha.kerala.gov.in/karunya-arogya-suraksha-padhathi-kasp/",
+        all_of=STATE_FEATURES["KL"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL | FEATURE_CHRONIC,
+        ok_reason="Kerala residence with financial/clinical vulnerability fits Karunya-style support checks.",
+        fail_reason="Typically requires Kerala residence and approved vulnerability/clinical criteria.",
+    ),
+    SchemeRule(
+        name="Chief Minister's Comprehensive Health Insurance Scheme (Tamil Nadu)",
+        application_link="https://www.cmchistn.com/",
+        all_of=STATE_FEATURES["TN"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL,
+        ok_reason="Tamil Nadu residence with income vulnerability aligns with CMCHIS screening.",
+        fail_reason="Requires Tamil Nadu residence and approved family income/category criteria.",
+    ),
+    SchemeRule(
+        name="Biju Swasthya Kalyan Yojana (Odisha)",
+        application_link="https://bsky.odisha.gov.in/",
+        all_of=STATE_FEATURES["OD"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL | FEATURE_RURAL,
+        ok_reason="Odisha residence and vulnerability indicators align with BSKY-style public support.",
+        fail_reason="Usually requires Odisha residence with approved beneficiary category.",
+    ),
+    SchemeRule(
+        name="Mukhyamantri Chiranjeevi Health Insurance (Rajasthan)",
+        application_link="https://chiranjeevi.rajasthan.gov.in/",
+        all_of=STATE_FEATURES["RJ"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL,
+        ok_reason="Rajasthan household with vulnerable income profile matches common Chiranjeevi checks.",
+        fail_reason="Requires Rajasthan residence and qualifying enrollment category.",
+    ),
+    SchemeRule(
+        name="Ayushman Bharat - Mukhyamantri Jan Arogya Yojana (Karnataka)",
+        application_link="https://arogya.karnataka.gov.in/",
+        all_of=STATE_FEATURES["KA"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL | FEATURE_FAMILY_LARGE,
+        ok_reason="Karnataka residence with socioeconomic vulnerability aligns with state AB-PMJAY linkage.",
+        fail_reason="Usually needs Karnataka residence plus eligible deprivation/income category.",
+    ),
+    SchemeRule(
+        name="Ayushman Bharat / State Health Assurance (Uttar Pradesh family schemes)",
+        application_link="https://pmjay.gov.in/",
+        all_of=STATE_FEATURES["UP"],
+        any_of=FEATURE_INCOME_OK | FEATURE_BPL,
+        ok_reason="UP residence and vulnerable income profile fit common public health assurance filters.",
+        fail_reason="Primarily requires UP residence and qualifying socioeconomic status.",
+    ),
+]
 
-    def add_scheme(name: str, eligible_flag: bool, ok_reason: str, fail_reason: str) -> None:
-        scheme_decisions.append(
-            {
-                "scheme_name": name,
-                "eligible": bool(eligible_flag),
-                "reason": ok_reason if eligible_flag else fail_reason,
-                "application_link": scheme_application_links.get(name),
-            }
-        )
+# Core rule explanations: (feature, matched rule label, met reason, not met reason).
+CORE_RULES: list[tuple[int, str, str, str]] = [
+    (
+        FEATURE_INCOME_OK,
+        "Income <= 500000",
+        "Eligible by income rule: income is within 500000 threshold.",
+        "Income rule not met: income is above 500000 threshold.",
+    ),
+    (
+        FEATURE_BPL,
+        "BPL Card available",
+        "Eligible by BPL rule: BPL card is available.",
+        "BPL rule not met: BPL card is not available.",
+    ),
+    (
+        FEATURE_SENIOR,
+        "Age >= 70",
+        "Eligible by age rule: age is 70 or above.",
+        "Age rule not met: age is below 70.",
+    ),
+]
 
-    # --- National umbrella / insurance schemes ---
-    add_scheme(
-        "Ayushman Bharat - PM-JAY",
-        income_ok or bpl_ok or family_large,
-        "Household meets low-income/BPL or family-risk profile often mapped to PM-JAY verification.",
-        "Usually requires low-income/BPL or similar deprivation indicators during official verification.",
-    )
-    add_scheme(
-        "ABHA Health ID (Ayushman Bharat Digital Mission)",
-        data.has_government_id,
-        "Government ID available; digital health ID enrollment is typically feasible.",
-        "Government ID usually required for ABHA registration.",
-    )
-    add_scheme(
-        "National Dialysis Programme (under NHM)",
-        data.has_chronic_illness and high_utilization,
-        "Chronic condition with repeated hospital utilization may qualify for subsidized dialysis pathway.",
-        "Typically considered when chronic renal/related high-burden clinical need is documented.",
-    )
+SCORE_FEATURES = (
+    FEATURE_INCOME_OK
+    | FEATURE_EXTENDED_INCOME_OK
+    | FEATURE_BPL
+    | FEATURE_SENIOR
+    | FEATURE_VULNERABLE
+    | FEATURE_FAMILY_LARGE
+    | FEATURE_HIGH_UTILIZATION
+)
 
-    # --- Maternal / child health schemes ---
-    add_scheme(
-        "Pradhan Mantri Matru Vandana Yojana (PMMVY)",
-        data.is_pregnant and data.has_government_id,
-        "Pregnancy and ID status indicate potential PMMVY entitlement.",
-        "Generally requires pregnancy-linked registration and identity documentation.",
-    )
-    add_scheme(
-        "Janani Suraksha Yojana (JSY)",
-        data.is_pregnant and (income_ok or bpl_ok or (data.rural_resident and data.family_size >= 4)),
-        "Maternal profile with socio-economic vulnerability matches common JSY screening factors.",
-        "Usually prioritized for pregnant beneficiaries with socioeconomic vulnerability and institutional delivery linkage.",
-    )
-    add_scheme(
-        "Janani Shishu Suraksha Karyakram (JSSK)",
-        data.is_pregnant or data.age <= 5,
-        "Maternal/newborn-child care profile aligns with JSSK support pathway.",
-        "Primarily applicable for pregnancy, childbirth, newborn, and young child care episodes.",
-    )
-    add_scheme(
-        "Rashtriya Bal Swasthya Karyakram (RBSK)",
-        data.age <= 18,
-        "Child/adolescent age group fits RBSK screening age bands.",
-        "RBSK is generally targeted to newborn/child/adolescent age groups.",
-    )
-    add_scheme(
-        "Rashtriya Kishor Swasthya Karyakram (RKSK)",
-        10 <= data.age <= 19,
-        "Age falls in adolescent bracket commonly covered under RKSK.",
-        "RKSK is mainly designed for adolescent age group.",
-    )
+BASE_REQUIRED_DOCUMENTS = [
+    "Government photo ID (Aadhaar/Voter ID/Driving License)",
+    "Address proof",
+    "Income proof or income certificate",
+    "BPL/ration card (if applicable)",
+    "Age proof (for senior eligibility)",
+]
 
-    # --- Senior, disability, chronic care ---
-    add_scheme(
-        "National Programme for Health Care of Elderly (NPHCE)",
-        data.age >= 60,
-        "Senior age profile maps to geriatric care programme pathways.",
-        "Generally oriented toward elderly beneficiaries (typically 60+).",
-    )
-    add_scheme(
-        "Rashtriya Vayoshri Yojana (assistive support for senior citizens)",
-        data.age >= 60 and income_ok,
-        "Senior low-income profile may fit assistive-care screening.",
-        "Usually requires both senior age and socioeconomic need criteria.",
-    )
-    add_scheme(
-        "Disability Health Support (state/central disability-linked benefits)",
-        data.has_disability,
-        "Declared disability indicates potential eligibility for disability-linked health benefits.",
-        "Disability-linked health support generally requires certified disability status.",
-    )
-    add_scheme(
-        "Chronic Disease Support Programmes (state/NHM clinics)",
-        data.has_chronic_illness,
-        "Chronic illness profile aligns with long-term disease support pathways.",
-        "Usually triggered when chronic disease documentation is available.",
-    )
+CONDITIONAL_DOCUMENTS: list[tuple[int, str]] = [
+    (FEATURE_CHRONIC, "Recent clinical records/prescriptions for chronic condition"),
+    (FEATURE_DISABILITY, "Disability certificate (if available)"),
+    (FEATURE_PREGNANT, "Pregnancy/maternal health record from registered facility"),
+]
 
-    # --- Disease specific public programmes ---
-    add_scheme(
-        "National TB Elimination Programme (NTEP)",
-        data.has_chronic_illness and high_utilization,
-        "Frequent clinical burden may warrant TB-program screening/referral workflow.",
-        "Programme linkage generally depends on disease-specific diagnosis workflow.",
-    )
-    add_scheme(
-        "National AIDS Control Programme (NACP) - free HIV services",
-        data.has_chronic_illness,
-        "Chronic-care pathway can include referral for free HIV-related public services when indicated.",
-        "Service access is disease-indication based and confirmed by medical evaluation.",
-    )
+BASE_NEXT_STEPS = [
+    "Review required documents list and keep originals + photocopies ready.",
+    "Visit nearest empanelled government hospital/helpdesk for PM-JAY verification.",
+    "Request official beneficiary check using ID details and household data.",
+    "If declined, ask for written reason and re-apply with missing documents corrected.",
+]
 
-    # --- Major state health protection schemes (broad screening by state + vulnerability) ---
-    add_scheme(
-        "Mahatma Jyotiba Phule Jan Arogya Yojana (Maharashtra)",
-        "maharashtra" in state_normalized and (income_ok or bpl_ok or data.rural_resident),
-        "State and vulnerability profile broadly align with MJPJAY screening factors.",
-        "Primarily for Maharashtra residents meeting socioeconomic criteria.",
-    )
-    add_scheme(
-        "Mukhyamantri Amrutam / MA Vatsalya (Gujarat)",
-        "gujarat" in state_normalized and (income_ok or bpl_ok),
-        "Gujarat residence with low-income/BPL indicators matches common MA scheme filters.",
-        "Requires Gujarat residence plus eligible income/deprivation criteria.",
-    )
-    add_scheme(
-        "Aarogyasri (Telangana)",
-        "telangana" in state_normalized and (income_ok or bpl_ok),
-        "Telangana household with vulnerable economic profile may fit Aarogyasri pathway.",
-        "Usually mapped for Telangana residents with qualifying socioeconomic category.",
-    )
-    add_scheme(
-        "Dr. YSR Aarogyasri (Andhra Pradesh)",
-        ("andhra" in state_normalized or "ap" == state_normalized) and (income_ok or bpl_ok),
-        "Andhra Pradesh and low-income/BPL profile align with YSR Aarogyasri screening.",
-        "Generally requires AP residence and qualifying socioeconomic status.",
-    )
-    add_scheme(
-        "Karunya Arogya Suraksha Padhathi (Kerala)",
-        "kerala" in state_normalized and (income_ok or bpl_ok or data.has_chronic_illness),
-        "Kerala residence with financial/clinical vulnerability fits Karunya-style support checks.",
-        "Typically requires Kerala residence and approved vulnerability/clinical criteria.",
-    )
-    add_scheme(
-        "Chief Minister's Comprehensive Health Insurance Scheme (Tamil Nadu)",
-        ("tamil" in state_normalized or "tn" == state_normalized) and (income_ok or bpl_ok),
-        "Tamil Nadu residence with income vulnerability aligns with CMCHIS screening.",
-        "Requires Tamil Nadu residence and approved family income/category criteria.",
-    )
-    add_scheme(
-        "Biju Swasthya Kalyan Yojana (Odisha)",
-        "odisha" in state_normalized and (income_ok or bpl_ok or data.rural_resident),
-        "Odisha residence and vulnerability indicators align with BSKY-style public support.",
-        "Usually requires Odisha residence with approved beneficiary category.",
-    )
-    add_scheme(
-        "Mukhyamantri Chiranjeevi Health Insurance (Rajasthan)",
-        "rajasthan" in state_normalized and (income_ok or bpl_ok),
-        "Rajasthan household with vulnerable income profile matches common Chiranjeevi checks.",
-        "Requires Rajasthan residence and qualifying enrollment category.",
-    )
-    add_scheme(
-        "Ayushman Bharat - Mukhyamantri Jan Arogya Yojana (Karnataka)",
-        "karnataka" in state_normalized and (income_ok or bpl_ok or family_large),
-        "Karnataka residence with socioeconomic vulnerability aligns with state AB-PMJAY linkage.",
-        "Usually needs Karnataka residence plus eligible deprivation/income category.",
-    )
-    add_scheme(
-        "Ayushman Bharat / State Health Assurance (Uttar Pradesh family schemes)",
-        ("uttar pradesh" in state_normalized or state_normalized == "up") and (income_ok or bpl_ok),
-        "UP residence and vulnerable income profile fit common public health assurance filters.",
-        "Primarily requires UP residence and qualifying socioeconomic status.",
-    )
+POSITIVE_SUMMARY = "Preliminary eligibility appears positive based on provided socioeconomic and medical-support indicators."
+NEGATIVE_SUMMARY = (
+    "Preliminary eligibility appears negative on current inputs; document verification and local scheme mapping are recommended."
+)
+NO_SCHEME_MATCHED = "No strongly matched scheme from current rule set"
 
-    eligible = any(bool(item["eligible"]) for item in scheme_decisions)
 
+def _score_for(features: int) -> int:
     score = 0
-    if income_ok:
+    if features & FEATURE_INCOME_OK:
         score += 40
-    elif extended_income_ok:
+    elif features & FEATURE_EXTENDED_INCOME_OK:
         score += 20
-    if bpl_ok:
+    if features & FEATURE_BPL:
         score += 35
-    if senior_ok:
+    if features & FEATURE_SENIOR:
         score += 20
-    if support_vulnerability_ok:
+    if features & FEATURE_VULNERABLE:
         score += 20
-    if family_large:
+    if features & FEATURE_FAMILY_LARGE:
         score += 10
-    if high_utilization:
+    if features & FEATURE_HIGH_UTILIZATION:
         score += 10
+    return min(score, 100)
+
+
+def _compile_scheme(rule: SchemeRule) -> tuple[int, int, dict[str, object], dict[str, object]]:
+    def decision(eligible: bool) -> dict[str, object]:
+        return {
+            "scheme_name": rule.name,
+            "eligible": eligible,
+            "reason": rule.ok_reason if eligible else rule.fail_reason,
+            "application_link": rule.application_link,
+        }
+
+    return rule.all_of, rule.any_of, decision(True), decision(False)
+
+
+# Compiled once at import: predicate masks plus pre-rendered decision dicts.
+COMPILED_SCHEMES = [_compile_scheme(rule) for rule in SCHEME_CATALOGUE]
+
+# Score depends only on SCORE_FEATURES, so it is looked up rather than summed.
+SCORE_TABLE: dict[int, int] = {}
+for _mask in range(1 << SCORE_FEATURES.bit_length()):
+    if _mask & ~SCORE_FEATURES == 0:
+        SCORE_TABLE[_mask] = _score_for(_mask)
+
+
+def _state_features(state: str) -> int:
+    return STATE_FEATURES.get(resolve_state_code(state), 0)
+
+
+def household_features(data: EligibilityRequest) -> int:
+    """Encode the inputs that the eligibility rules depend on as a feature bitmask."""
+    features = _state_features(data.state)
+    if data.income <= 500000:
+        features |= FEATURE_INCOME_OK
+    if data.income <= 800000:
+        features |= FEATURE_EXTENDED_INCOME_OK
+    if data.bpl_card:
+        features |= FEATURE_BPL
+    if data.age >= 70:
+        features |= FEATURE_SENIOR
+    if data.age >= 60:
+        features |= FEATURE_AGE_60_PLUS
+    if data.age <= 5:
+        features |= FEATURE_AGE_UNDER_6
+    if data.age <= 18:
+        features |= FEATURE_AGE_UNDER_19
+    if 10 <= data.age <= 19:
+        features |= FEATURE_AGE_ADOLESCENT
+    if data.has_disability:
+        features |= FEATURE_DISABILITY | FEATURE_VULNERABLE
+    if data.has_chronic_illness:
+        features |= FEATURE_CHRONIC | FEATURE_VULNERABLE
+    if data.is_pregnant:
+        features |= FEATURE_PREGNANT | FEATURE_VULNERABLE
+    if data.family_size >= 5:
+        features |= FEATURE_FAMILY_LARGE
+    if data.rural_resident:
+        features |= FEATURE_RURAL
+        if data.family_size >= 4:
+            features |= FEATURE_RURAL_FAMILY_4
+    if data.annual_hospital_visits >= 3:
+        features |= FEATURE_HIGH_UTILIZATION
+    if data.has_government_id:
+        features |= FEATURE_GOVERNMENT_ID
+    return features
+
+
+def _or_column(features: list[int], bit: int, flags: Iterable[bool]) -> list[int]:
+    return [value | bit if flag else value for value, flag in zip(features, flags)]
+
+
+def household_feature_column(columns: Mapping[str, Sequence[Any]]) -> list[int]:
+    """
+    Column-wise `household_features` for bulk screening.
 
-    score = min(score, 100)
+    `columns` maps each EligibilityRequest field to an equally long sequence of
+    already validated values. Every feature is one pass over whole columns, so
+    the cost per row is a handful of list-comprehension steps.
+    """
+    income = columns["income"]
+    age = columns["age"]
+    family_size = columns["family_size"]
+
+    features = [_state_features(state) for state in columns["state"]]
+    features = _or_column(features, FEATURE_INCOME_OK, (value <= 500000 for value in income))
+    features = _or_column(features, FEATURE_EXTENDED_INCOME_OK, (value <= 800000 for value in income))
+    features = _or_column(features, FEATURE_BPL, columns["bpl_card"])
+    features = _or_column(features, FEATURE_SENIOR, (value >= 70 for value in age))
+    features = _or_column(features, FEATURE_AGE_60_PLUS, (value >= 60 for value in age))
+    features = _or_column(features, FEATURE_AGE_UNDER_6, (value <= 5 for value in age))
+    features = _or_column(features, FEATURE_AGE_UNDER_19, (value <= 18 for value in age))
+    features = _or_column(features, FEATURE_AGE_ADOLESCENT, (10 <= value <= 19 for value in age))
+    features = _or_column(features, FEATURE_DISABILITY | FEATURE_VULNERABLE, columns["has_disability"])
+    features = _or_column(features, FEATURE_CHRONIC | FEATURE_VULNERABLE, columns["has_chronic_illness"])
+    features = _or_column(features, FEATURE_PREGNANT | FEATURE_VULNERABLE, columns["is_pregnant"])
+    features = _or_column(features, FEATURE_FAMILY_LARGE, (value >= 5 for value in family_size))
+    features = _or_column(features, FEATURE_RURAL, columns["rural_resident"])
+    features = _or_column(
+        features,
+        FEATURE_RURAL_FAMILY_4,
+        (rural and size >= 4 for rural, size in zip(columns["rural_resident"], family_size)),
+    )
+    features = _or_column(features, FEATURE_HIGH_UTILIZATION, (value >= 3 for value in columns["annual_hospital_visits"]))
+    features = _or_column(features, FEATURE_GOVERNMENT_ID, columns["has_government_id"])
+    return features
 
-    if eligible:
-        assessment_summary = (
-            "Preliminary eligibility appears positive based on provided socioeconomic and medical-support indicators."
+
+def evaluate_features(features: int, state: str, family_size: int) -> dict[str, object]:
+    """Build the eligibility payload for an encoded household."""
+    reasons: list[str] = []
+    matched_rules: list[str] = []
+    for feature, rule_label, met_reason, unmet_reason in CORE_RULES:
+        if features & feature:
+            reasons.append(met_reason)
+            matched_rules.append(rule_label)
+        else:
+            reasons.append(unmet_reason)
+
+    if features & FEATURE_VULNERABLE and features & FEATURE_EXTENDED_INCOME_OK:
+        reasons.append(
+            "Eligible by extended support rule: vulnerability condition present with income within 800000 threshold."
         )
-    else:
-        assessment_summary = (
-            "Preliminary eligibility appears negative on current inputs; document verification and local scheme mapping are recommended."
+        matched_rules.append("Extended support rule")
+    elif features & FEATURE_VULNERABLE:
+        reasons.append(
+            "Support vulnerability noted (disability/chronic illness/pregnancy), but income is above 800000 threshold."
         )
+    else:
+        reasons.append("No additional vulnerability-based support rule matched.")
 
-    top_eligible_scheme = next(
-        (item["scheme_name"] for item in scheme_decisions if bool(item["eligible"])),
-        "No strongly matched scheme from current rule set",
-    )
+    if features & FEATURE_FAMILY_LARGE:
+        reasons.append("Family-size note: larger household (5+) may increase financial strain.")
+    if features & FEATURE_HIGH_UTILIZATION:
+        reasons.append("Healthcare utilization note: frequent hospital usage suggests higher support need.")
+
+    scheme_decisions: list[dict[str, object]] = []
+    top_eligible_scheme: str | None = None
+    for all_of, any_of, eligible_decision, ineligible_decision in COMPILED_SCHEMES:
+        if features & all_of == all_of and (not any_of or features & any_of):
+            scheme_decisions.append(dict(eligible_decision))
+            if top_eligible_scheme is None:
+                top_eligible_scheme = str(eligible_decision["scheme_name"])
+        else:
+            scheme_decisions.append(dict(ineligible_decision))
+
+    eligible = top_eligible_scheme is not None
+    score = SCORE_TABLE[features & SCORE_FEATURES]
 
     benefits = {
-        "scheme_name": str(top_eligible_scheme),
+        "scheme_name": top_eligible_scheme or NO_SCHEME_MATCHED,
         "coverage": "Scheme-dependent (often hospitalization support under public entitlement norms)",
-        "state": data.state,
+        "state": state,
         "estimated_priority": "High" if score >= 70 else "Medium" if score >= 40 else "Low",
-        "household_context": f"Family size: {data.family_size}",
+        "household_context": f"Family size: {family_size}",
     }
 
-    required_documents = [
-        "Government photo ID (Aadhaar/Voter ID/Driving License)",
-        "Address proof",
-        "Income proof or income certificate",
-        "BPL/ration card (if applicable)",
-        "Age proof (for senior eligibility)",
-    ]
-
-    if data.has_chronic_illness:
-        required_documents.append("Recent clinical records/prescriptions for chronic condition")
-    if data.has_disability:
-        required_documents.append("Disability certificate (if available)")
-    if data.is_pregnant:
-        required_documents.append("Pregnancy/maternal health record from registered facility")
+    required_documents = list(BASE_REQUIRED_DOCUMENTS)
+    for feature, document in CONDITIONAL_DOCUMENTS:
+        if features & feature:
+            required_documents.append(document)
 
-    next_steps = [
-        "Review required documents list and keep originals + photocopies ready.",
-        "Visit nearest empanelled government hospital/helpdesk for PM-JAY verification.",
-        "Request official beneficiary check using ID details and household data.",
-        "If declined, ask for written reason and re-apply with missing documents corrected.",
-    ]
-
-    if not data.has_government_id:
+    next_steps = list(BASE_NEXT_STEPS)
+    if not features & FEATURE_GOVERNMENT_ID:
         next_steps.insert(0, "Obtain/restore at least one valid government ID before verification.")
 
     return {
         "eligible": eligible,
-        "assessment_summary": assessment_summary,
+        "assessment_summary": POSITIVE_SUMMARY if eligible else NEGATIVE_SUMMARY,
         "score": score,
         "matched_rules": matched_rules,
         "scheme_decisions": scheme_decisions,
@@ -328,3 +501,193 @@ async def check_scheme_eligibility(data: EligibilityRequest) -> dict[str, object
         "next_steps": next_steps,
         "disclaimer": MEDICAL_DISCLAIMER,
     }
+
+
+# Finished eligibility payloads keyed by (feature mask, state, family size).
+# The feature mask already buckets income and age at every rule threshold, and
+# state text and family size are the only raw inputs echoed back in the
+# payload, so two requests with the same key always get the same payload.
+ELIGIBILITY_CACHE = PayloadCache(max_size=int(os.getenv("ELIGIBILITY_CACHE_SIZE", "4096")))
+
+
+def get_eligibility_cache_stats() -> dict[str, object]:
+    return ELIGIBILITY_CACHE.stats()
+
+
+async def check_scheme_eligibility(data: EligibilityRequest) -> dict[str, object]:
+    """
+    Rule-based eligibility (deterministic, no AI):
+    Core qualifiers:
+    - income <= 500000 OR bpl_card OR age >= 70
+    Extended support qualifier:
+    - (income <= 800000) AND (disability OR chronic illness OR pregnancy)
+    """
+    started = time.perf_counter()
+    cache_key = (household_features(data), data.state, data.family_size)
+
+    cached = ELIGIBILITY_CACHE.get(cache_key)
+    hit = cached is not None
+    if cached is None:
+        cached = evaluate_features(*cache_key)
+        ELIGIBILITY_CACHE.put(cache_key, cached)
+
+    # Callers own the returned payload, so never hand out the cached lists and
+    # dicts themselves.
+    result = {
+        **cached,
+        "matched_rules": list(cached["matched_rules"]),
+        "scheme_decisions": [dict(decision) for decision in cached["scheme_decisions"]],
+        "reasons": list(cached["reasons"]),
+        "benefits": dict(cached["benefits"]),
+        "required_documents": list(cached["required_documents"]),
+        "next_steps": list(cached["next_steps"]),
+    }
+    ELIGIBILITY_CACHE.record_latency(hit, (time.perf_counter() - started) * 1000)
+    return result
+
+
+def screen_household_columns(columns: Mapping[str, Sequence[Any]]) -> list[dict[str, object]]:
+    """
+    Bulk counterpart of `check_scheme_eligibility` over columnar household data.
+
+    Rows are encoded column-wise, then every distinct feature mask is
+    evaluated once and shared by all rows that have it. Each row gets the
+    same payload the scalar function returns; nested lists are shared between
+    rows with the same mask, so treat the results as read-only.
+    """
+    features_column = household_feature_column(columns)
+    templates: dict[int, dict[str, object]] = {}
+    results: list[dict[str, object]] = []
+    for features, state, family_size in zip(features_column, columns["state"], columns["family_size"]):
+        template = templates.get(features)
+        if template is None:
+            template = templates[features] = evaluate_features(features, "", 0)
+        result = dict(template)
+        result["benefits"] = {
+            **template["benefits"],
+            "state": state,
+            "household_context": f"Family size: {family_size}",
+        }
+        results.append(result)
+    return results
+
+
+# What-if sweeps are read-only but still bounded per request.
+MAX_SWEEP_AXIS_VALUES = 200
+MAX_SWEEP_GRID_POINTS = 20000
+
+
+def _sweep_axis_values(name: str, sweep: SweepRange, base_value: float, integer: bool) -> list[float | int]:
+    if sweep.stop < sweep.start:
+        raise ValueError(f"{name} sweep stop must not be below start")
+    count = int((sweep.stop - sweep.start) / sweep.step + 1e-9) + 1
+    if count > MAX_SWEEP_AXIS_VALUES:
+        raise ValueError(f"{name} sweep has {count} values; the limit is {MAX_SWEEP_AXIS_VALUES}")
+    values = {round(sweep.start + index * sweep.step, 6) for index in range(count)}
+    if integer:
+        values = {int(value) for value in values}
+    # The base value is always on the axis so every flip is measured from it.
+    values.add(base_value)
+    return sorted(values)
+
+
+def _line_flips(axis: str, values: list[object], outcomes: list[bool]) -> list[dict[str, object]]:
+    return [
+        {"axis": axis, "from_value": values[index - 1], "to_value": values[index], "eligible": outcomes[index]}
+        for index in range(1, len(values))
+        if outcomes[index] != outcomes[index - 1]
+    ]
+
+
+def sweep_eligibility(request: EligibilitySweepRequest) -> dict[str, object]:
+    """
+    Evaluate a what-if grid around a base profile without persisting anything.
+
+    The grid is encoded column-wise into feature masks, each distinct mask is
+    run through the compiled scheme predicates once, and flips are reported
+    along each swept axis with the other inputs held at the base profile.
+    """
+    base = request.base
+    axes: dict[str, list[object]] = {}
+    if request.income is not None:
+        axes["income"] = _sweep_axis_values("income", request.income, base.income, integer=False)
+    if request.age is not None:
+        axes["age"] = _sweep_axis_values("age", request.age, base.age, integer=True)
+    for toggle in dict.fromkeys(request.toggles):
+        axes[toggle] = [False, True]
+
+    grid_size = prod(len(values) for values in axes.values())
+    if grid_size > MAX_SWEEP_GRID_POINTS:
+        raise ValueError(f"Sweep grid has {grid_size} points; the limit is {MAX_SWEEP_GRID_POINTS}")
+
+    axis_names = list(axes)
+    points = list(product(*axes.values()))
+    columns: dict[str, list[object]] = {name: [value] * grid_size for name, value in base.model_dump().items()}
+    for position, name in enumerate(axis_names):
+        columns[name] = [point[position] for point in points]
+    features_column = household_feature_column(columns)
+
+    scheme_outcomes_by_mask: dict[int, tuple[bool, ...]] = {
+        features: tuple(
+            bool(features & all_of == all_of and (not any_of or features & any_of))
+            for all_of, any_of, _, _ in COMPILED_SCHEMES
+        )
+        for features in set(features_column)
+    }
+    outcomes = [scheme_outcomes_by_mask[features] for features in features_column]
+    eligible_column = [any(point_outcomes) for point_outcomes in outcomes]
+
+    # Row-major strides into the product() ordering, and the base point's index.
+    strides: dict[str, int] = {}
+    stride = 1
+    for name in reversed(axis_names):
+        strides[name] = stride
+        stride *= len(axes[name])
+    base_positions = {name: axes[name].index(getattr(base, name)) for name in axis_names}
+    base_index = sum(base_positions[name] * strides[name] for name in axis_names)
+
+    def line(name: str) -> list[int]:
+        start = base_index - base_positions[name] * strides[name]
+        return [start + offset * strides[name] for offset in range(len(axes[name]))]
+
+    lines = {name: line(name) for name in axis_names}
+
+    eligibility_flips: list[dict[str, object]] = []
+    for name in axis_names:
+        eligibility_flips.extend(_line_flips(name, axes[name], [eligible_column[index] for index in lines[name]]))
+
+    schemes: list[dict[str, object]] = []
+    for scheme_index, rule in enumerate(SCHEME_CATALOGUE):
+        flips: list[dict[str, object]] = []
+        for name in axis_names:
+            flips.extend(_line_flips(name, axes[name], [outcomes[index][scheme_index] for index in lines[name]]))
+        schemes.append(
+            {
+                "scheme_name": rule.name,
+                "eligible_at_base": outcomes[base_index][scheme_index],
+                "eligible_points": sum(1 for point_outcomes in outcomes if point_outcomes[scheme_index]),
+                "flips": flips,
+            }
+        )
+
+    grid: list[dict[str, object]] | None = None
+    if request.include_grid:
+        grid = [
+            {
+                "values": dict(zip(axis_names, point)),
+                "eligible": eligible,
+                "score": SCORE_TABLE[features & SCORE_FEATURES],
+                "eligible_schemes": [rule.name for rule, ok in zip(SCHEME_CATALOGUE, point_outcomes) if ok],
+            }
+            for point, features, eligible, point_outcomes in zip(points, features_column, eligible_column, outcomes)
+        ]
+
+    return {
+        "grid_size": grid_size,
+        "axes": axes,
+        "eligible_at_base": eligible_column[base_index],
+        "score_at_base": SCORE_TABLE[features_column[base_index] & SCORE_FEATURES],
+        "eligibility_flips": eligibility_flips,
+        "schemes": schemes,
+        "grid": grid,
+    }
@@ -1,9 +1,22 @@
 import asyncio
+import csv
 import json
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+import os
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
 
+from sqlalchemy import delete, func, inspect, select, text
+
+from db.database import AsyncSessionLocal
+from db.models import HospitalData
 from models.schemas import MEDICAL_DISCLAIMER
+from services import http_client
+from services.spatial_index import GeoGrid
+from services.state_index import is_known_city, state_for_city
 
 
 HOSPITALS_BY_CITY: dict[str, list[dict[str, object]]] = {
@@ -212,21 +225,32 @@ def _dynamic_city_fallback(city: str) -> list[dict[str, object]]:
     ]
 
 
-def _fetch_hospitals_from_osm(query_text: str, government: bool, scheme_supported: bool) -> list[dict[str, object]]:
-    query = urlencode(
-        {
+def _parse_coordinate(value: object, limit: float) -> float | None:
+    try:
+        coordinate = float(value)
+    except (TypeError, ValueError):
+        return None
+    return coordinate if -limit <= coordinate <= limit else None
+
+
+NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
+
+
+async def _fetch_hospitals_from_osm(query_text: str, government: bool, scheme_supported: bool) -> list[dict[str, object]]:
+    response = await http_client.request(
+        "GET",
+        NOMINATIM_SEARCH_URL,
+        params={
             "q": query_text,
             "format": "jsonv2",
             "limit": 12,
             "addressdetails": 1,
-        }
+        },
+        headers={"User-Agent": "ArogyaAI/1.0 (hospital-suggestions)"},
+        timeout=8,
     )
-    url = f"https://nominatim.openstreetmap.org/search?{query}"
-    request = Request(url, headers={"User-Agent": "ArogyaAI/1.0 (hospital-suggestions)"})
-
-    with urlopen(request, timeout=8) as response:
-        raw = response.read().decode("utf-8")
-    payload = json.loads(raw)
+    response.raise_for_status()
+    payload = response.json()
 
     if not isinstance(payload, list):
         return []
@@ -260,14 +284,648 @@ def _fetch_hospitals_from_osm(query_text: str, government: bool, scheme_supporte
                 "government": government,
                 "scheme_supported": scheme_supported,
                 "contact_number": "Not listed",
+                "latitude": _parse_coordinate(row.get("lat"), 90.0),
+                "longitude": _parse_coordinate(row.get("lon"), 180.0),
             }
         )
 
     return hospitals
 
 
-async def suggest_hospitals(city: str) -> dict[str, object]:
+def _city_key(city: str) -> str:
+    return " ".join(city.strip().lower().split())
+
+
+@dataclass
+class _OSMCacheEntry:
+    hospitals: list[dict[str, object]] | None  # None marks a cached failure
+    fetched_at: float
+    error: str | None = None
+    retry_at: float = 0.0
+
+
+class OSMCityCache:
+    """
+    Per-city stale-while-revalidate cache of merged OSM lookups.
+
+    Fresh entries are returned as-is. Stale entries are still returned
+    immediately while one background task per city refetches them; a failed
+    refetch keeps the stale data and is not retried before `failure_ttl`.
+    A city whose first lookup failed is cached as a failure for
+    `failure_ttl`, so a dead upstream costs one timeout, not one per request.
+
+    Fetches are single-flight: concurrent misses, forced lookups and the
+    background refresh for a city all await the same task, so there is at
+    most one upstream fetch (two Nominatim queries) per city at any time.
+    """
+
+    def __init__(self, ttl_seconds: float, failure_ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _OSMCacheEntry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.fetch_failures = 0
+        self.coalesced = 0
+
+    def _store(self, key: str, entry: _OSMCacheEntry) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[list[dict[str, object]]]]) -> _OSMCacheEntry:
+        try:
+            hospitals = await fetch()
+        except Exception as exc:
+            self.fetch_failures += 1
+            now = time.monotonic()
+            previous = self._entries.get(key)
+            if previous is not None and previous.hospitals is not None:
+                # Keep serving what we had; just hold off the next attempt.
+                previous.retry_at = now + self.failure_ttl_seconds
+                previous.error = str(exc)
+                return previous
+            entry = _OSMCacheEntry(None, now, error=str(exc), retry_at=now + self.failure_ttl_seconds)
+        else:
+            entry = _OSMCacheEntry(hospitals, time.monotonic())
+        self._store(key, entry)
+        return entry
+
+    def _start_fetch(self, key: str, fetch: Callable[[], Awaitable[list[dict[str, object]]]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.create_task(self._fetch(key, fetch))
+        self._inflight[key] = task
+
+        def finished(done: asyncio.Task) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task.add_done_callback(finished)
+        return task
+
+    def _refresh_finished(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is None and task.result().error is not None:
+            self.refresh_failures += 1
+
+    async def _join(self, key: str, fetch: Callable[[], Awaitable[list[dict[str, object]]]]) -> _OSMCacheEntry:
+        # Shielded so one caller timing out or disconnecting does not cancel
+        # the fetch every other waiter is sharing.
+        return await asyncio.shield(self._start_fetch(key, fetch))
+
+    async def get(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[list[dict[str, object]]]],
+        force: bool = False,
+    ) -> _OSMCacheEntry:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if not force and entry is not None:
+            self._entries.move_to_end(key)
+            if entry.hospitals is None:
+                if now < entry.retry_at:
+                    self.negative_hits += 1
+                    return entry
+            elif now - entry.fetched_at < self.ttl_seconds:
+                self.hits += 1
+                return entry
+            else:
+                self.stale_hits += 1
+                if key not in self._inflight and now >= entry.retry_at:
+                    self.refreshes += 1
+                    self._start_fetch(key, fetch).add_done_callback(self._refresh_finished)
+                return entry
+        self.misses += 1
+        return await self._join(key, fetch)
+
+    def last_error(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        return entry.error if entry is not None else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, object]:
+        lookups = self.hits + self.stale_hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "failure_ttl_seconds": self.failure_ttl_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "fetches_in_flight": len(self._inflight),
+            "coalesced": self.coalesced,
+            "refresh_failures": self.refresh_failures,
+            "fetch_failures": self.fetch_failures,
+        }
+
+
+OSM_CITY_CACHE = OSMCityCache(
+    ttl_seconds=float(os.getenv("HOSPITAL_OSM_CACHE_TTL_SECONDS", "21600")),
+    failure_ttl_seconds=float(os.getenv("HOSPITAL_OSM_FAILURE_TTL_SECONDS", "60")),
+    max_entries=int(os.getenv("HOSPITAL_OSM_CACHE_SIZE", "1024")),
+)
+
+
+async def _fetch_city_from_osm(display_name: str) -> list[dict[str, object]]:
+    gov_live, private_live = await asyncio.gather(
+        _fetch_hospitals_from_osm(f"government hospital in {display_name}", True, True),
+        _fetch_hospitals_from_osm(f"private hospital in {display_name}", False, False),
+    )
+    return _merge_hospitals([*gov_live, *private_live], [])
+
+
+async def osm_city_hospitals(display_name: str, force: bool = False) -> list[dict[str, object]] | None:
+    """Live OSM hospitals for a city through OSM_CITY_CACHE; None while the lookup is failing."""
+    entry = await OSM_CITY_CACHE.get(_city_key(display_name), lambda: _fetch_city_from_osm(display_name), force=force)
+    return entry.hospitals
+
+
+def get_osm_cache_stats() -> dict[str, object]:
+    return OSM_CITY_CACHE.stats()
+
+
+class HospitalIndex:
+    """
+    In-memory copy of the hospital_data table, grouped by normalized city.
+
+    Readers only ever see a complete mapping: loads build a new dict and swap
+    the reference, and single-city refreshes replace one tuple.
+    """
+
+    def __init__(self) -> None:
+        self._by_city: dict[str, tuple[dict[str, object], ...]] = {}
+        # Geolocated entries only, grouped by city key; payloads are (city key, entry).
+        self._grid = GeoGrid()
+        self.loaded = False
+        self.loaded_at: datetime | None = None
+
+    @staticmethod
+    def _grid_points(city: str, entries: Iterable[dict[str, object]]) -> list[tuple[float, float, str, object]]:
+        return [
+            (entry["latitude"], entry["longitude"], city, (city, entry))
+            for entry in entries
+            if entry.get("latitude") is not None and entry.get("longitude") is not None
+        ]
+
+    def replace(self, rows: Iterable[tuple[str, dict[str, object]]]) -> None:
+        grouped: dict[str, list[dict[str, object]]] = {}
+        for city, entry in rows:
+            grouped.setdefault(_city_key(city), []).append(entry)
+        grid = GeoGrid(point for city, entries in grouped.items() for point in self._grid_points(city, entries))
+        self._by_city, self._grid = {city: tuple(entries) for city, entries in grouped.items()}, grid
+        self.loaded = True
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def replace_city(self, city: str, entries: list[dict[str, object]]) -> None:
+        key = _city_key(city)
+        grid = self._grid.replace_group(key, self._grid_points(key, entries))
+        self._by_city, self._grid = {**self._by_city, key: tuple(entries)}, grid
+
+    def lookup(
+        self,
+        city: str,
+        government: bool | None = None,
+        scheme_supported: bool | None = None,
+    ) -> list[dict[str, object]]:
+        entries = self._by_city.get(_city_key(city), ())
+        return [
+            entry
+            for entry in entries
+            if (government is None or entry["government"] == government)
+            and (scheme_supported is None or entry["scheme_supported"] == scheme_supported)
+        ]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius_km: float,
+        government: bool | None = None,
+        scheme_supported: bool | None = None,
+    ) -> list[tuple[float, str, dict[str, object]]]:
+        def accept(payload: object) -> bool:
+            entry = payload[1]
+            return (government is None or entry["government"] == government) and (
+                scheme_supported is None or entry["scheme_supported"] == scheme_supported
+            )
+
+        matches = self._grid.nearest(latitude, longitude, k, radius_km, accept)
+        return [(distance, city, entry) for distance, (city, entry) in matches]
+
+    def cities(self) -> list[str]:
+        return sorted(self._by_city)
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "loaded": self.loaded,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "cities": len(self._by_city),
+            "hospitals": sum(len(entries) for entries in self._by_city.values()),
+            "geolocated": len(self._grid),
+        }
+
+
+HOSPITAL_INDEX = HospitalIndex()
+
+# Cities with a background OSM refresh already scheduled (kept so tasks are not collected).
+_pending_city_refreshes: dict[str, asyncio.Task] = {}
+
+
+def _index_entry(
+    hospital_name: str,
+    government: bool,
+    scheme_supported: bool,
+    contact_number: str,
+    latitude: float | None = None,
+    longitude: float | None = None,
+) -> dict[str, object]:
+    return {
+        "hospital_name": hospital_name[:180],
+        "government": government,
+        "scheme_supported": scheme_supported,
+        "contact_number": (contact_number or "Not listed")[:30],
+        "latitude": latitude,
+        "longitude": longitude,
+    }
+
+
+def _builtin_hospitals() -> dict[str, list[dict[str, object]]]:
+    by_city: dict[str, list[dict[str, object]]] = {city: list(entries) for city, entries in HOSPITALS_BY_CITY.items()}
+    for city, config in REALTIME_CITY_CONFIG.items():
+        by_city.setdefault(city, []).extend([*config["gov_fallback"], *config["private_fallback"]])
+    return {
+        city: [
+            _index_entry(str(entry["hospital_name"]), bool(entry["government"]), bool(entry["scheme_supported"]), str(entry["contact_number"]))
+            for entry in entries
+        ]
+        for city, entries in by_city.items()
+    }
+
+
+def _parse_flag(value: object, default: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value or "").strip().lower()
+    if not text:
+        return default
+    return text in {"true", "t", "yes", "y", "1"}
+
+
+def read_hospital_extract(path: Path) -> dict[str, list[dict[str, object]]]:
+    """
+    Read an offline extract: a JSON list or a CSV file with city, hospital_name,
+    government, scheme_supported and contact_number columns, plus optional
+    latitude/longitude (or lat/lon).
+    """
+    if path.suffix.lower() == ".json":
+        records = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(records, list):
+            raise ValueError("Hospital extract JSON must be a list of objects")
+    else:
+        with path.open(newline="", encoding="utf-8-sig") as handle:
+            records = list(csv.DictReader(handle))
+
+    by_city: dict[str, list[dict[str, object]]] = {}
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        city = _city_key(str(record.get("city") or ""))
+        hospital_name = str(record.get("hospital_name") or "").strip()
+        if not city or not hospital_name:
+            continue
+        by_city.setdefault(city, []).append(
+            _index_entry(
+                hospital_name,
+                _parse_flag(record.get("government"), True),
+                _parse_flag(record.get("scheme_supported"), True),
+                str(record.get("contact_number") or "").strip(),
+                _parse_coordinate(record.get("latitude", record.get("lat")), 90.0),
+                _parse_coordinate(record.get("longitude", record.get("lon")), 180.0),
+            )
+        )
+    return by_city
+
+
+async def load_hospital_index() -> int:
+    """Load every hospital_data row into HOSPITAL_INDEX and return the row count."""
+    async with AsyncSessionLocal() as session:
+        rows = (await session.scalars(select(HospitalData).order_by(HospitalData.id))).all()
+    HOSPITAL_INDEX.replace(
+        (
+            row.city,
+            _index_entry(row.hospital_name, row.government, row.scheme_supported, row.contact_number, row.latitude, row.longitude),
+        )
+        for row in rows
+    )
+    return len(rows)
+
+
+async def store_city_hospitals(city: str, entries: list[dict[str, object]]) -> None:
+    """Replace one city's rows in hospital_data and in the in-memory index."""
+    key = _city_key(city)
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(delete(HospitalData).where(HospitalData.city == key))
+            session.add_all([HospitalData(city=key, **entry) for entry in entries])
+    if HOSPITAL_INDEX.loaded:
+        HOSPITAL_INDEX.replace_city(key, entries)
+
+
+async def import_hospital_extract(path: Path) -> int:
+    by_city = await asyncio.to_thread(read_hospital_extract, path)
+    for city, entries in by_city.items():
+        await store_city_hospitals(city, entries)
+    return sum(len(entries) for entries in by_city.values())
+
+
+def _add_missing_location_columns(sync_conn) -> None:
+    # create_all() does not alter existing tables; databases created before
+    # coordinates were stored get the nullable columns added in place.
+    existing = {column["name"] for column in inspect(sync_conn).get_columns(HospitalData.__tablename__)}
+    for column_name in ("latitude", "longitude"):
+        if column_name not in existing:
+            sync_conn.execute(text(f"ALTER TABLE {HospitalData.__tablename__} ADD COLUMN {column_name} FLOAT"))
+
+
+async def initialize_hospital_index(extract_path: Path | None = None) -> int:
+    """
+    Load the index at startup. An empty table is seeded first, from the
+    offline extract when one is configured, otherwise from the built-in lists.
+    """
+    async with AsyncSessionLocal() as session:
+        connection = await session.connection()
+        await connection.run_sync(_add_missing_location_columns)
+        await session.commit()
+    async with AsyncSessionLocal() as session:
+        existing = await session.scalar(select(func.count()).select_from(HospitalData)) or 0
+    if not existing:
+        if extract_path is not None and extract_path.exists():
+            await import_hospital_extract(extract_path)
+        else:
+            for city, entries in _builtin_hospitals().items():
+                await store_city_hospitals(city, entries)
+    return await load_hospital_index()
+
+
+async def refresh_city_from_osm(city: str, force: bool = True) -> int:
+    """
+    Fetch one city from OSM and store it; an empty or failed fetch keeps the
+    current rows. Without `force` a cached lookup (or cached failure) is reused.
+    """
+    key = _city_key(city)
+    display_name = str(REALTIME_CITY_CONFIG.get(key, {}).get("display_name") or _title_city(key))
+    live = await osm_city_hospitals(display_name, force=force)
+    if live is None:
+        raise RuntimeError(f"OSM lookup for {display_name} failed: {OSM_CITY_CACHE.last_error(_city_key(display_name))}")
+    entries = [
+        _index_entry(
+            str(entry["hospital_name"]),
+            bool(entry["government"]),
+            bool(entry["scheme_supported"]),
+            str(entry["contact_number"]),
+            entry.get("latitude"),
+            entry.get("longitude"),
+        )
+        for entry in live
+    ]
+    if entries:
+        await store_city_hospitals(key, entries)
+    return len(entries)
+
+
+async def _refresh_city_in_background(city: str, force: bool = False) -> None:
+    try:
+        count = await refresh_city_from_osm(city, force=force)
+        print(f"[hospital] Indexed {count} hospitals for {city}")
+    except Exception as exc:
+        print(f"[hospital] OSM refresh for {city} skipped: {exc}")
+    finally:
+        _pending_city_refreshes.pop(city, None)
+
+
+def _indexable_city(city_key: str) -> bool:
+    # Only built-in and known cities are stored in hospital_data (and so
+    # refreshed daily); free text from requests must not grow the table.
+    return city_key in HOSPITALS_BY_CITY or city_key in REALTIME_CITY_CONFIG or is_known_city(city_key)
+
+
+def _schedule_city_refresh(city: str) -> None:
+    # Runs whenever the index is loaded, whether or not the periodic
+    # refresher is enabled, so a known city is never left without rows.
+    if not _indexable_city(city) or city in _pending_city_refreshes:
+        return
+    _pending_city_refreshes[city] = asyncio.create_task(_refresh_city_in_background(city))
+
+
+async def refresh_hospital_index(interval_seconds: float) -> None:
+    """
+    Background refresher: re-reads hospital_data (picking up offline imports
+    made by other processes) and refreshes every indexed city from OSM, one
+    city at a time to stay within Nominatim's usage policy.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await load_hospital_index()
+        except Exception as exc:
+            print(f"[hospital] Index reload skipped: {exc}")
+            continue
+        for city in HOSPITAL_INDEX.cities():
+            await _refresh_city_in_background(city, force=True)
+            await asyncio.sleep(1)
+
+
+def get_hospital_index_stats() -> dict[str, object]:
+    return {**HOSPITAL_INDEX.stats(), "pending_refreshes": sorted(_pending_city_refreshes)}
+
+
+# Suggestion requests per city key since the last prewarm (halved after each
+# run, so old traffic fades out). Bounded so free-text cities cannot grow it.
+_city_requests: Counter[str] = Counter()
+CITY_TRAFFIC_MAX_CITIES = 2000
+
+_prewarm_status: dict[str, object] = {
+    "running": False,
+    "runs": 0,
+    "started_at": None,
+    "finished_at": None,
+    "total": 0,
+    "done": 0,
+    "warmed": 0,
+    "skipped": 0,
+    "failed": [],
+}
+
+
+def _record_city_request(city_key: str) -> None:
+    if not city_key:
+        return
+    _city_requests[city_key] += 1
+    if len(_city_requests) > 2 * CITY_TRAFFIC_MAX_CITIES:
+        kept = dict(_city_requests.most_common(CITY_TRAFFIC_MAX_CITIES))
+        _city_requests.clear()
+        _city_requests.update(kept)
+
+
+def prewarm_cities(top_n: int) -> list[str]:
+    """Built-in cities first, then the `top_n` most requested cities from recent traffic."""
+    cities = list(dict.fromkeys([*HOSPITALS_BY_CITY, *REALTIME_CITY_CONFIG]))
+    known = set(cities)
+    for city, _ in _city_requests.most_common():
+        if len(cities) >= len(known) + top_n:
+            break
+        if city not in known:
+            cities.append(city)
+    return cities
+
+
+def _has_live_rows(city: str) -> bool:
+    """True when the index holds OSM or extract rows for `city`, not just the built-in fallback."""
+    builtin_names = {entry["hospital_name"] for entry in _builtin_hospitals().get(city, ())}
+    return any(entry["hospital_name"] not in builtin_names for entry in HOSPITAL_INDEX.lookup(city))
+
+
+async def _prewarm_city(city: str) -> bool:
+    """Warm one city; False when the index already holds live data for it."""
+    if HOSPITAL_INDEX.loaded and _indexable_city(city):
+        if _has_live_rows(city):
+            return False
+        await refresh_city_from_osm(city, force=False)
+        return True
+    display_name = str(REALTIME_CITY_CONFIG.get(city, {}).get("display_name") or _title_city(city))
+    if await osm_city_hospitals(display_name) is None:
+        raise RuntimeError(OSM_CITY_CACHE.last_error(_city_key(display_name)) or "lookup failed")
+    return True
+
+
+async def prewarm_hospital_cache(top_n: int, concurrency: int, min_interval_seconds: float) -> dict[str, object]:
+    """
+    Fill the hospital cache for the built-in and most requested cities.
+
+    Up to `concurrency` cities are fetched at once and fetches start at least
+    `min_interval_seconds` apart, to stay within Nominatim's usage policy.
+    Cities whose index rows already come from OSM or an offline extract are
+    skipped; built-in fallback rows are replaced. Progress is kept in
+    `get_prewarm_status()` and printed as each city finishes.
+    """
+    cities = prewarm_cities(top_n)
+    _prewarm_status.update(
+        running=True,
+        started_at=datetime.now(timezone.utc).isoformat(),
+        finished_at=None,
+        total=len(cities),
+        done=0,
+        warmed=0,
+        skipped=0,
+        failed=[],
+    )
+    slots = asyncio.Semaphore(max(1, concurrency))
+    pacing = asyncio.Lock()
+    next_start = 0.0
+
+    async def warm(city: str) -> None:
+        nonlocal next_start
+        async with slots:
+            async with pacing:
+                delay = next_start - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_start = time.monotonic() + min_interval_seconds
+            try:
+                warmed = await _prewarm_city(city)
+            except Exception as exc:
+                _prewarm_status["failed"].append(city)
+                outcome = f"failed: {exc}"
+            else:
+                _prewarm_status["warmed" if warmed else "skipped"] += 1
+                outcome = "warmed" if warmed else "already indexed"
+            _prewarm_status["done"] += 1
+            print(f"[hospital] Prewarm {_prewarm_status['done']}/{len(cities)} {city}: {outcome}")
+
+    try:
+        await asyncio.gather(*(warm(city) for city in cities))
+    finally:
+        for city, count in list(_city_requests.items()):
+            if count > 1:
+                _city_requests[city] = count // 2
+            else:
+                del _city_requests[city]
+        _prewarm_status.update(running=False, finished_at=datetime.now(timezone.utc).isoformat())
+        _prewarm_status["runs"] += 1
+    return get_prewarm_status()
+
+
+async def run_hospital_prewarm(interval_seconds: float, top_n: int, concurrency: int, min_interval_seconds: float) -> None:
+    """Prewarm once at startup, then every `interval_seconds` (0 runs it only once)."""
+    while True:
+        try:
+            status = await prewarm_hospital_cache(top_n, concurrency, min_interval_seconds)
+            print(
+                f"[hospital] Prewarm finished: {status['warmed']} warmed, "
+                f"{status['skipped']} already indexed, {len(status['failed'])} failed"
+            )
+        except Exception as exc:
+            print(f"[hospital] Prewarm skipped: {exc}")
+        if interval_seconds <= 0:
+            return
+        await asyncio.sleep(interval_seconds)
+
+
+def get_prewarm_status() -> dict[str, object]:
+    return {
+        **_prewarm_status,
+        "failed": list(_prewarm_status["failed"]),
+        "top_requested": [{"city": city, "requests": count} for city, count in _city_requests.most_common(10)],
+    }
+
+
+def _merge_hospitals(primary: list[dict[str, object]], fallbacks: list[dict[str, object]]) -> list[dict[str, object]]:
+    hospitals: list[dict[str, object]] = []
+    seen_names: set[str] = set()
+
+    for entry in primary:
+        hospital_name = str(entry.get("hospital_name", "")).strip().lower()
+        if not hospital_name or hospital_name in seen_names:
+            continue
+        seen_names.add(hospital_name)
+        hospitals.append(entry)
+
+    for fallback in fallbacks:
+        fallback_name = str(fallback.get("hospital_name", "")).strip().lower()
+        if fallback_name and fallback_name not in seen_names:
+            hospitals.append(fallback)
+            seen_names.add(fallback_name)
+        if len(hospitals) >= 10:
+            break
+    return hospitals
+
+
+async def suggest_hospitals(
+    city: str,
+    government: bool | None = None,
+    scheme_supported: bool | None = None,
+) -> dict[str, object]:
     normalized_city = city.strip().lower()
+    _record_city_request(_city_key(normalized_city))
     display_name = str(REALTIME_CITY_CONFIG.get(normalized_city, {}).get("display_name") or _title_city(normalized_city) or city)
 
     city_specific = HOSPITALS_BY_CITY.get(normalized_city, [])
@@ -275,38 +933,55 @@ async def suggest_hospitals(city: str) -> dict[str, object]:
     gov_fallback = list(city_config["gov_fallback"]) if city_config is not None else []
     private_fallback = list(city_config["private_fallback"]) if city_config is not None else []
     generic_fallback = _dynamic_city_fallback(display_name)
+    fallbacks = [*city_specific, *gov_fallback, *private_fallback, *generic_fallback]
 
-    try:
-        gov_live, private_live = await asyncio.gather(
-            asyncio.to_thread(_fetch_hospitals_from_osm, f"government hospital in {display_name}", True, True),
-            asyncio.to_thread(_fetch_hospitals_from_osm, f"private hospital in {display_name}", False, False),
-        )
-
-        hospitals: list[dict[str, object]] = []
-        seen_names: set[str] = set()
-
-        for entry in [*gov_live, *private_live]:
-            hospital_name = str(entry.get("hospital_name", "")).strip().lower()
-            if not hospital_name or hospital_name in seen_names:
-                continue
-            seen_names.add(hospital_name)
-            hospitals.append(entry)
-
-        for fallback in [*city_specific, *gov_fallback, *private_fallback, *generic_fallback]:
-            fallback_name = str(fallback.get("hospital_name", "")).strip().lower()
-            if fallback_name and fallback_name not in seen_names:
-                hospitals.append(fallback)
-                seen_names.add(fallback_name)
-            if len(hospitals) >= 10:
-                break
-    except Exception:
-        hospitals = [*city_specific, *gov_fallback, *private_fallback, *generic_fallback]
+    city_key = _city_key(normalized_city)
+    indexed = HOSPITAL_INDEX.lookup(city_key)
+    if indexed:
+        # Served from memory.
+        hospitals = _merge_hospitals(indexed, fallbacks)
+    elif HOSPITAL_INDEX.loaded and _indexable_city(city_key):
+        # A known city the index has not seen yet is fetched in the background
+        # so the next request for it is answered locally.
+        _schedule_city_refresh(city_key)
+        hospitals = _merge_hospitals([], fallbacks)
+    else:
+        # Other cities go through the bounded OSM cache and are never stored.
+        live = await osm_city_hospitals(display_name)
+        hospitals = fallbacks if live is None else _merge_hospitals(live, fallbacks)
 
     if not hospitals:
         hospitals = generic_fallback
 
+    if government is not None or scheme_supported is not None:
+        hospitals = [
+            entry
+            for entry in hospitals
+            if (government is None or entry.get("government") == government)
+            and (scheme_supported is None or entry.get("scheme_supported") == scheme_supported)
+        ]
+
     return {
         "city": city,
+        "state_code": state_for_city(city),
         "hospitals": hospitals,
         "disclaimer": MEDICAL_DISCLAIMER,
     }
+
+
+async def nearest_hospitals(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    k: int,
+    government: bool | None = None,
+    scheme_supported: bool | None = None,
+) -> dict[str, object]:
+    matches = HOSPITAL_INDEX.nearest(latitude, longitude, k, radius_km, government, scheme_supported)
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius_km": radius_km,
+        "hospitals": [{**entry, "city": city, "distance_km": round(distance, 3)} for distance, city, entry in matches],
+        "disclaimer": MEDICAL_DISCLAIMER,
+    }
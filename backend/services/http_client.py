@@ -0,0 +1,151 @@
+import asyncio
+import importlib.util
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import httpx
+
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+# Concurrent requests allowed to any single host; queued callers wait their turn.
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "4"))
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]").
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_POOL = "default"
+
+
+class PoolStats:
+    """Request and connection counters for one pool, fed by httpcore trace events."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.errors = 0
+
+    async def trace(self, event_name: str, info: dict[str, object]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def snapshot(self) -> dict[str, object]:
+        # Every request that did not open a connection rode on a pooled one.
+        reused = max(0, self.requests - self.errors - self.connections_opened)
+        completed = self.requests - self.errors
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / completed, 4) if completed > 0 else 0.0,
+        }
+
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_client_loop: asyncio.AbstractEventLoop | None = None
+_host_slots: dict[tuple[str, str], asyncio.Semaphore] = {}
+_pool_stats: dict[str, PoolStats] = {}
+
+
+def _new_client(min_keepalive: int = 0) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            # Fewer idle slots than requests in flight would close and reopen
+            # connections on every burst; 0 still disables keep-alive.
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+            and max(HTTP_MAX_KEEPALIVE_CONNECTIONS, min(min_keepalive, HTTP_MAX_CONNECTIONS)),
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(10.0),
+        follow_redirects=True,
+    )
+
+
+def get_http_client(pool: str = DEFAULT_POOL, min_keepalive: int = 0) -> httpx.AsyncClient:
+    """
+    Shared keep-alive client for outbound calls.
+
+    Each named pool (e.g. one per messaging provider) has its own client and
+    connections, so one slow upstream cannot starve another's pool. The app
+    opens the default pool on startup and closes every pool on shutdown;
+    scripts get them lazily. Pooled connections belong to one event loop, so
+    a new loop gets new clients.
+    """
+    global _client_loop
+    loop = asyncio.get_running_loop()
+    if _client_loop is not loop:
+        _clients.clear()
+        _host_slots.clear()
+        _client_loop = loop
+    client = _clients.get(pool)
+    if client is None or client.is_closed:
+        client = _clients[pool] = _new_client(min_keepalive)
+    return client
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    client = get_http_client()
+    print(f"[startup] Outbound HTTP client ready (http2={'on' if HTTP2_AVAILABLE else 'off'}, per-host limit {HTTP_PER_HOST_LIMIT})")
+    return client
+
+
+async def close_http_client() -> None:
+    global _client_loop
+    clients = list(_clients.values())
+    _clients.clear()
+    _client_loop = None
+    _host_slots.clear()
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
+
+
+@asynccontextmanager
+async def host_slot(url: str, pool: str = DEFAULT_POOL, limit: int = HTTP_PER_HOST_LIMIT) -> AsyncIterator[None]:
+    key = (pool, urlsplit(url).netloc.lower())
+    slot = _host_slots.get(key)
+    if slot is None:
+        slot = _host_slots[key] = asyncio.Semaphore(max(1, limit))
+    async with slot:
+        yield
+
+
+def pool_stats(pool: str) -> PoolStats:
+    stats = _pool_stats.get(pool)
+    if stats is None:
+        stats = _pool_stats[pool] = PoolStats()
+    return stats
+
+
+def get_pool_stats() -> dict[str, dict[str, object]]:
+    return {pool: stats.snapshot() for pool, stats in sorted(_pool_stats.items())}
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    pool: str = DEFAULT_POOL,
+    per_host_limit: int = HTTP_PER_HOST_LIMIT,
+    **kwargs: object,
+) -> httpx.Response:
+    """Send one request on a shared pool, within that pool's per-host concurrency limit."""
+    client = get_http_client(pool, min_keepalive=per_host_limit)
+    stats = pool_stats(pool)
+    stats.requests += 1
+    async with host_slot(url, pool, per_host_limit):
+        try:
+            return await client.request(method, url, extensions={"trace": stats.trace}, **kwargs)
+        except httpx.HTTPError:
+            stats.errors += 1
+            raise
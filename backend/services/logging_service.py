@@ -1,4 +1,4 @@
-from sqlalchemy import desc, select
+from sqlalchemy import desc, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models_logging import InteractionLog
@@ -24,6 +24,28 @@ async def log_interaction(
     return row
 
 
+async def log_interactions_bulk(
+    db: AsyncSession,
+    phone_number: str | None,
+    entries: list[tuple[str, str]],
+    eligibility_result: str,
+) -> None:
+    # Save many (symptom_text, risk_level) rows with one multi-row INSERT.
+    await db.execute(
+        insert(InteractionLog),
+        [
+            {
+                "phone_number": phone_number,
+                "symptom_text": symptom_text,
+                "risk_level": risk_level,
+                "eligibility_result": eligibility_result,
+            }
+            for symptom_text, risk_level in entries
+        ],
+    )
+    await db.commit()
+
+
 async def update_or_log_eligibility_result(
     db: AsyncSession,
     phone_number: str | None,
@@ -0,0 +1,76 @@
+import base64
+import os
+
+import httpx
+
+from services import http_client
+
+
+# Concurrent requests per provider pool. Send volume is already bounded by the
+# outbox workers and the send rate limiter; this only caps the socket count.
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("MESSAGING_PROVIDER_MAX_CONCURRENCY", "16"))
+
+
+class ProviderClient:
+    """
+    One messaging provider's API: a dedicated keep-alive pool plus auth
+    headers that are built once per credential pair instead of per request.
+
+    The base URL can be pointed at a local fake server (see
+    testing/fake_provider_server.py) with <PROVIDER>_API_BASE.
+    """
+
+    def __init__(self, name: str, default_base_url: str, user_env: str | None, secret_env: str | None) -> None:
+        self.name = name
+        self.default_base_url = default_base_url
+        self.user_env = user_env
+        self.secret_env = secret_env
+        self._credentials: tuple[str, str] | None = None
+        self._headers: dict[str, str] = {}
+
+    @property
+    def base_url(self) -> str:
+        return (os.getenv(f"{self.name.upper()}_API_BASE", "").strip() or self.default_base_url).rstrip("/")
+
+    def credentials(self) -> tuple[str, str]:
+        user = os.getenv(self.user_env, "").strip() if self.user_env else ""
+        secret = os.getenv(self.secret_env, "").strip() if self.secret_env else ""
+        return user, secret
+
+    def auth_headers(self) -> dict[str, str]:
+        credentials = self.credentials()
+        if credentials != self._credentials:
+            # Rebuilt only when the configured credentials change.
+            self._headers = {}
+            if self.user_env and self.secret_env:
+                token = base64.b64encode(f"{credentials[0]}:{credentials[1]}".encode("utf-8")).decode("ascii")
+                self._headers["Authorization"] = f"Basic {token}"
+            self._credentials = credentials
+        return self._headers
+
+    async def request(self, method: str, path: str, *, headers: dict[str, str] | None = None, **kwargs: object) -> httpx.Response:
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        return await http_client.request(
+            method,
+            url,
+            pool=self.name,
+            per_host_limit=PROVIDER_MAX_CONCURRENCY,
+            headers={**self.auth_headers(), **(headers or {})},
+            **kwargs,
+        )
+
+    def stats(self) -> dict[str, object]:
+        return {"base_url": self.base_url, **http_client.pool_stats(self.name).snapshot()}
+
+
+TWILIO = ProviderClient("twilio", "https://api.twilio.com", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN")
+PLIVO = ProviderClient("plivo", "https://api.plivo.com", "PLIVO_AUTH_ID", "PLIVO_AUTH_TOKEN")
+# Textbelt authenticates with the key in the form body.
+TEXTBELT = ProviderClient("textbelt", "https://textbelt.com", None, None)
+
+PROVIDER_CLIENTS = {client.name: client for client in (TWILIO, PLIVO, TEXTBELT)}
+
+
+def get_provider_stats() -> dict[str, dict[str, object]]:
+    """Per-provider request counts and connection reuse since startup."""
+    return {name: client.stats() for name, client in PROVIDER_CLIENTS.items()}
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from services.cache import get_redis_client
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """One token bucket: `capacity` tokens, refilled at `rate_per_second`."""
+
+    window: str
+    rate_per_second: float
+    capacity: float
+
+
+# Every bucket of a key is checked and debited in one step, so a send is only
+# counted when all of its limits (e.g. per-second and per-day) allow it.
+# Redis TIME keeps the clock consistent across app servers.
+_TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local capacity = tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local stamp = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+end
+local result = {tostring(wait)}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i])
+    local capacity = tonumber(ARGV[2 * i + 1])
+    if wait == 0 then
+        levels[i] = levels[i] - cost
+    end
+    redis.call('HSET', key, 'tokens', tostring(levels[i]), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+    result[i + 1] = tostring(levels[i])
+end
+return result
+"""
+
+# How long to stay on the local buckets after Redis fails before trying it again.
+REDIS_RETRY_SECONDS = 30.0
+
+
+class TokenBucketLimiter:
+    """
+    Token-bucket rate limiter with a shared Redis store and a local fallback.
+
+    With Redis every app process draws from the same buckets. When Redis is
+    not installed or not reachable the limiter switches to in-process buckets
+    (retrying Redis every REDIS_RETRY_SECONDS). Those buckets get 1/N of each
+    rate and capacity, N being WEB_CONCURRENCY, so the processes together
+    still stay under the limit.
+    """
+
+    def __init__(self, prefix: str, store: str = "redis", local_share: int = 1) -> None:
+        self.prefix = prefix
+        self.use_redis = store == "redis"
+        self.local_share = max(1, local_share)
+        self._script: Any | None = None
+        self._redis_down_until = 0.0
+        self._local: dict[str, tuple[float, float]] = {}
+        self._specs: dict[str, tuple[BucketSpec, ...]] = {}
+        self.redis_errors = 0
+
+    def _bucket_keys(self, key: str, specs: tuple[BucketSpec, ...]) -> list[str]:
+        # Hash tag keeps all buckets of a key on one Redis Cluster slot.
+        return [f"{self.prefix}:{{{key}}}:{spec.window}" for spec in specs]
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self.use_redis and time.monotonic() >= self._redis_down_until else "local"
+
+    async def _take_redis(self, key: str, specs: tuple[BucketSpec, ...], cost: float) -> tuple[float, list[float]]:
+        if self._script is None:
+            redis = await get_redis_client()
+            self._script = redis.register_script(_TOKEN_BUCKET_SCRIPT)
+        args: list[float] = [cost]
+        for spec in specs:
+            args.extend([spec.rate_per_second, spec.capacity])
+        result = await self._script(keys=self._bucket_keys(key, specs), args=args)
+        wait, *levels = (float(value) for value in result)
+        return wait, levels
+
+    def _take_local(self, key: str, specs: tuple[BucketSpec, ...], cost: float) -> tuple[float, list[float]]:
+        now = time.monotonic()
+        bucket_keys = self._bucket_keys(key, specs)
+        wait = 0.0
+        levels: list[float] = []
+        for bucket_key, spec in zip(bucket_keys, specs):
+            rate = spec.rate_per_second / self.local_share
+            capacity = max(1.0, spec.capacity / self.local_share)
+            tokens, stamp = self._local.get(bucket_key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - stamp) * rate)
+            levels.append(tokens)
+            if tokens < cost:
+                wait = max(wait, (cost - tokens) / rate)
+        if wait == 0:
+            levels = [tokens - cost for tokens in levels]
+        for bucket_key, tokens in zip(bucket_keys, levels):
+            self._local[bucket_key] = (tokens, now)
+        return wait, levels
+
+    async def _take(self, key: str, specs: tuple[BucketSpec, ...], cost: float) -> tuple[float, list[float]]:
+        self._specs[key] = specs
+        if self.backend == "redis":
+            try:
+                return await self._take_redis(key, specs, cost)
+            except Exception as exc:
+                self.redis_errors += 1
+                self._script = None
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+                print(f"[ratelimit] Redis unavailable, using local buckets for {REDIS_RETRY_SECONDS:.0f}s: {exc}")
+        return self._take_local(key, specs, cost)
+
+    async def try_acquire(self, key: str, specs: tuple[BucketSpec, ...], cost: float = 1.0) -> float:
+        """Take `cost` tokens from every bucket of `key`; 0.0 on success, else seconds until they would be available."""
+        if not specs:
+            return 0.0
+        wait, _ = await self._take(key, specs, cost)
+        return wait
+
+    async def acquire(self, key: str, specs: tuple[BucketSpec, ...], max_wait_seconds: float) -> float:
+        """
+        Wait up to `max_wait_seconds` for a token. Returns 0.0 once acquired,
+        otherwise the remaining wait so the caller can defer the work.
+        """
+        deadline = time.monotonic() + max_wait_seconds
+        while True:
+            wait = await self.try_acquire(key, specs)
+            if wait <= 0:
+                return 0.0
+            if time.monotonic() + wait > deadline:
+                return wait
+            await asyncio.sleep(wait)
+
+    async def levels(self) -> list[dict[str, object]]:
+        """Current level of every bucket used so far (read without taking tokens)."""
+        buckets: list[dict[str, object]] = []
+        for key, specs in list(self._specs.items()):
+            _, levels = await self._take(key, specs, 0.0)
+            share = 1 if self.backend == "redis" else self.local_share
+            for spec, tokens in zip(specs, levels):
+                buckets.append(
+                    {
+                        "key": key,
+                        "window": spec.window,
+                        "tokens": round(tokens, 3),
+                        "capacity": max(1.0, spec.capacity / share),
+                        "rate_per_second": spec.rate_per_second / share,
+                    }
+                )
+        return buckets
+
+    def stats(self) -> dict[str, object]:
+        return {"backend": self.backend, "local_share": self.local_share, "redis_errors": self.redis_errors}
@@ -0,0 +1,190 @@
+import heapq
+from collections.abc import Callable, Hashable, Iterable
+from math import asin, cos, floor, radians, sin, sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.195
+
+# ~2.2 km cells: dense city centres stay at a few hundred points per 3x3 block.
+DEFAULT_CELL_DEGREES = 0.02
+
+# (latitude, longitude, group, payload); groups (e.g. a city) can be replaced as a unit.
+GridPoint = tuple[float, float, Hashable, object]
+# Stored form: (latitude, longitude, latitude in radians, cos(latitude), group, payload).
+_StoredPoint = tuple[float, float, float, float, Hashable, object]
+Cell = tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = radians(lat1)
+    phi2 = radians(lat2)
+    half_dlat = (phi2 - phi1) / 2
+    half_dlon = radians(lon2 - lon1) / 2
+    a = sin(half_dlat) ** 2 + cos(phi1) * cos(phi2) * sin(half_dlon) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+class GeoGrid:
+    """
+    Fixed-size lat/lon buckets for nearest-neighbour queries.
+
+    Queries scan rings of cells outward from the query cell and stop as soon
+    as no unscanned cell can hold anything closer than the current k-th best
+    (or anything inside the radius), so cost tracks local density rather than
+    the total number of points. The grid is immutable: `replace_group`
+    returns a new grid, so readers never see a half-applied update.
+    """
+
+    def __init__(self, points: Iterable[GridPoint] = (), cell_degrees: float = DEFAULT_CELL_DEGREES) -> None:
+        self.cell_degrees = cell_degrees
+        cells: dict[Cell, list[_StoredPoint]] = {}
+        group_cells: dict[Hashable, set[Cell]] = {}
+        for point in points:
+            cell = self._cell(point[0], point[1])
+            cells.setdefault(cell, []).append(self._stored(point))
+            group_cells.setdefault(point[2], set()).add(cell)
+        self._cells: dict[Cell, tuple[_StoredPoint, ...]] = {cell: tuple(bucket) for cell, bucket in cells.items()}
+        self._group_cells = group_cells
+        self._size = sum(len(bucket) for bucket in self._cells.values())
+        self._extent = self._occupied_extent(self._cells)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return floor(latitude / self.cell_degrees), floor(longitude / self.cell_degrees)
+
+    @staticmethod
+    def _occupied_extent(cells: dict[Cell, object]) -> tuple[int, int, int, int] | None:
+        # (min row, max row, min col, max col) of non-empty cells; queries never look outside it.
+        if not cells:
+            return None
+        rows = [cell[0] for cell in cells]
+        cols = [cell[1] for cell in cells]
+        return min(rows), max(rows), min(cols), max(cols)
+
+    @staticmethod
+    def _stored(point: GridPoint) -> _StoredPoint:
+        latitude, longitude, group, payload = point
+        latitude_radians = radians(latitude)
+        return latitude, longitude, latitude_radians, cos(latitude_radians), group, payload
+
+    def replace_group(self, group: Hashable, points: Iterable[GridPoint]) -> "GeoGrid":
+        """New grid with every point of `group` swapped for `points`; only touched cells are rebuilt."""
+        cells = dict(self._cells)
+        size = self._size
+        for cell in self._group_cells.get(group, ()):
+            bucket = cells[cell]
+            kept = tuple(point for point in bucket if point[4] != group)
+            size -= len(bucket) - len(kept)
+            if kept:
+                cells[cell] = kept
+            else:
+                del cells[cell]
+
+        new_cells: set[Cell] = set()
+        for point in points:
+            cell = self._cell(point[0], point[1])
+            cells[cell] = (*cells.get(cell, ()), self._stored((point[0], point[1], group, point[3])))
+            new_cells.add(cell)
+            size += 1
+
+        grid = GeoGrid(cell_degrees=self.cell_degrees)
+        grid._cells = cells
+        grid._group_cells = {**self._group_cells, group: new_cells}
+        grid._size = size
+        grid._extent = self._occupied_extent(cells)
+        return grid
+
+    @staticmethod
+    def _ring(center: Cell, ring: int, rows: tuple[int, int], cols: tuple[int, int]) -> Iterable[Cell]:
+        # Cells of the square ring `ring` around `center`, clipped to the row and column ranges.
+        row, col = center
+        row_lo, row_hi = rows
+        col_lo, col_hi = cols
+        first_col, last_col = max(col - ring, col_lo), min(col + ring, col_hi)
+        for edge_row in (row - ring, row + ring) if ring else (row,):
+            if row_lo <= edge_row <= row_hi:
+                for edge_col in range(first_col, last_col + 1):
+                    yield edge_row, edge_col
+        if ring == 0:
+            return
+        first_row, last_row = max(row - ring + 1, row_lo), min(row + ring - 1, row_hi)
+        for edge_col in (col - ring, col + ring):
+            if col_lo <= edge_col <= col_hi:
+                for edge_row in range(first_row, last_row + 1):
+                    yield edge_row, edge_col
+
+    def _ring_min_distance_km(self, latitude: float, ring: int, limit_km: float) -> float:
+        # Lower bound for any point in ring `ring`: the cells in between must be
+        # crossed. Longitude cells narrow towards the poles, so use the width at
+        # the most poleward latitude the ring can reach; points further than
+        # `limit_km` in latitude alone are never candidates, so the reach is
+        # capped there.
+        if ring <= 1:
+            return 0.0
+        reach_degrees = min((ring + 1) * self.cell_degrees, limit_km / KM_PER_DEGREE_LAT + self.cell_degrees)
+        reach = min(89.0, abs(latitude) + reach_degrees)
+        cell_km = self.cell_degrees * KM_PER_DEGREE_LAT * min(1.0, cos(radians(reach)))
+        return (ring - 1) * cell_km
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius_km: float,
+        accept: Callable[[object], bool] | None = None,
+    ) -> list[tuple[float, object]]:
+        """Up to `k` (distance_km, payload) pairs within `radius_km`, closest first."""
+        if k <= 0 or self._extent is None:
+            return []
+        min_row, max_row, min_col, max_col = self._extent
+        center = self._cell(latitude, longitude)
+        center_row, center_col = center
+        query_radians = radians(latitude)
+        query_cos = cos(query_radians)
+        # Max-heap of the best k so far: (-distance, tiebreak, payload).
+        best: list[tuple[float, int, object]] = []
+        limit_km = radius_km
+        counter = 0
+        ring = 0
+        while True:
+            if self._ring_min_distance_km(latitude, ring, limit_km) > limit_km:
+                break
+            # Only rows within `limit_km` of the query latitude, and only
+            # occupied rows and columns, can hold a candidate. Once the ring is
+            # past all of them nothing is left to scan, however slowly the
+            # longitude bound grows near the poles.
+            limit_degrees = limit_km / KM_PER_DEGREE_LAT
+            rows = (
+                max(min_row, floor((latitude - limit_degrees) / self.cell_degrees)),
+                min(max_row, floor((latitude + limit_degrees) / self.cell_degrees)),
+            )
+            if rows[0] > rows[1] or ring > max(
+                center_row - rows[0], rows[1] - center_row, center_col - min_col, max_col - center_col
+            ):
+                break
+            for cell in self._ring(center, ring, rows, (min_col, max_col)):
+                for point_latitude, point_longitude, point_radians, point_cos, _, payload in self._cells.get(cell, ()):
+                    # Latitude difference alone is a cheap lower bound on distance.
+                    if abs(point_latitude - latitude) * KM_PER_DEGREE_LAT > limit_km:
+                        continue
+                    half_dlat = (point_radians - query_radians) / 2
+                    half_dlon = radians(point_longitude - longitude) / 2
+                    a = sin(half_dlat) ** 2 + query_cos * point_cos * sin(half_dlon) ** 2
+                    distance = 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+                    if distance > limit_km or (len(best) >= k and distance >= -best[0][0]):
+                        continue
+                    if accept is not None and not accept(payload):
+                        continue
+                    counter += 1
+                    if len(best) >= k:
+                        heapq.heapreplace(best, (-distance, counter, payload))
+                    else:
+                        heapq.heappush(best, (-distance, counter, payload))
+                    if len(best) >= k:
+                        limit_km = -best[0][0]
+            ring += 1
+        return [(-negative_distance, payload) for negative_distance, _, payload in sorted(best, reverse=True)]
@@ -0,0 +1,217 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+
+# code -> (display name, aliases). Aliases cover common spellings and Hindi names;
+# the display name and code are always indexed as well.
+STATES: dict[str, tuple[str, list[str]]] = {
+    "AN": ("Andaman and Nicobar Islands", ["andaman", "andaman nicobar", "अंडमान और निकोबार द्वीपसमूह", "अंडमान निकोबार"]),
+    "AP": ("Andhra Pradesh", ["andhra", "andhrapradesh", "आंध्र प्रदेश", "आंध्रप्रदेश"]),
+    "AR": ("Arunachal Pradesh", ["arunachal", "अरुणाचल प्रदेश"]),
+    "AS": ("Assam", ["असम"]),
+    "BR": ("Bihar", ["बिहार"]),
+    "CH": ("Chandigarh", ["चंडीगढ़"]),
+    "CG": ("Chhattisgarh", ["chattisgarh", "chhatisgarh", "छत्तीसगढ़"]),
+    "DH": (
+        "Dadra and Nagar Haveli and Daman and Diu",
+        ["dadra and nagar haveli", "daman and diu", "dnhdd", "दादरा और नगर हवेली और दमन और दीव"],
+    ),
+    "DL": ("Delhi", ["new delhi", "nct of delhi", "nct delhi", "दिल्ली", "नई दिल्ली"]),
+    "GA": ("Goa", ["गोवा"]),
+    "GJ": ("Gujarat", ["gujrat", "गुजरात"]),
+    "HR": ("Haryana", ["हरियाणा"]),
+    "HP": ("Himachal Pradesh", ["himachal", "हिमाचल प्रदेश"]),
+    "JK": ("Jammu and Kashmir", ["jammu kashmir", "jammu & kashmir", "j&k", "जम्मू और कश्मीर", "जम्मू कश्मीर"]),
+    "JH": ("Jharkhand", ["झारखंड", "झारखण्ड"]),
+    "KA": ("Karnataka", ["ಕರ್ನಾಟಕ", "कर्नाटक"]),
+    "KL": ("Kerala", ["keralam", "കേരളം", "केरल"]),
+    "LA": ("Ladakh", ["लद्दाख"]),
+    "LD": ("Lakshadweep", ["लक्षद्वीप"]),
+    "MP": ("Madhya Pradesh", ["मध्य प्रदेश", "मध्यप्रदेश"]),
+    "MH": ("Maharashtra", ["maharastra", "महाराष्ट्र"]),
+    "MN": ("Manipur", ["मणिपुर"]),
+    "ML": ("Meghalaya", ["मेघालय"]),
+    "MZ": ("Mizoram", ["मिज़ोरम", "मिजोरम"]),
+    "NL": ("Nagaland", ["नागालैंड"]),
+    "OD": ("Odisha", ["orissa", "or", "ओडिशा", "ओड़िशा", "उड़ीसा"]),
+    "PY": ("Puducherry", ["pondicherry", "पुडुचेरी"]),
+    "PB": ("Punjab", ["पंजाब"]),
+    "RJ": ("Rajasthan", ["राजस्थान"]),
+    "SK": ("Sikkim", ["सिक्किम"]),
+    "TN": ("Tamil Nadu", ["tamil", "tamilnadu", "தமிழ்நாடு", "तमिलनाडु", "तमिल नाडु"]),
+    "TG": ("Telangana", ["ts", "तेलंगाना"]),
+    "TR": ("Tripura", ["त्रिपुरा"]),
+    "UP": ("Uttar Pradesh", ["uttarpradesh", "उत्तर प्रदेश", "उत्तरप्रदेश"]),
+    "UK": ("Uttarakhand", ["uttaranchal", "ua", "उत्तराखंड", "उत्तराखण्ड"]),
+    "WB": ("West Bengal", ["bengal", "पश्चिम बंगाल"]),
+}
+
+# Major cities and common alternate spellings -> state code.
+CITY_STATE_CODES: dict[str, str] = {
+    "agra": "UP",
+    "ahmedabad": "GJ",
+    "amritsar": "PB",
+    "aurangabad": "MH",
+    "bangalore": "KA",
+    "bengaluru": "KA",
+    "bhopal": "MP",
+    "bhubaneswar": "OD",
+    "bombay": "MH",
+    "calcutta": "WB",
+    "chandigarh": "CH",
+    "chennai": "TN",
+    "coimbatore": "TN",
+    "cuttack": "OD",
+    "dehradun": "UK",
+    "delhi": "DL",
+    "gurgaon": "HR",
+    "gurugram": "HR",
+    "guwahati": "AS",
+    "hyderabad": "TG",
+    "indore": "MP",
+    "jaipur": "RJ",
+    "jodhpur": "RJ",
+    "kanpur": "UP",
+    "kochi": "KL",
+    "kolkata": "WB",
+    "kozhikode": "KL",
+    "lucknow": "UP",
+    "madras": "TN",
+    "madurai": "TN",
+    "mangaluru": "KA",
+    "mumbai": "MH",
+    "mysuru": "KA",
+    "nagpur": "MH",
+    "nashik": "MH",
+    "new delhi": "DL",
+    "noida": "UP",
+    "patna": "BR",
+    "pune": "MH",
+    "raipur": "CG",
+    "ranchi": "JH",
+    "secunderabad": "TG",
+    "surat": "GJ",
+    "thane": "MH",
+    "thiruvananthapuram": "KL",
+    "trivandrum": "KL",
+    "vadodara": "GJ",
+    "varanasi": "UP",
+    "vijayawada": "AP",
+    "visakhapatnam": "AP",
+    "warangal": "TG",
+    "बेंगलुरु": "KA",
+    "चेन्नई": "TN",
+    "दिल्ली": "DL",
+    "नागपुर": "MH",
+    "पटना": "BR",
+    "पुणे": "MH",
+    "मुंबई": "MH",
+    "लखनऊ": "UP",
+    "हैदराबाद": "TG",
+}
+
+# \w does not match Indic vowel signs, so keep the Devanagari..Sinhala blocks whole.
+_SEPARATOR_PATTERN = re.compile(r"[^\w\u0900-\u0DFF]+")
+# Longest multi-word alias ("dadra and nagar haveli and daman and diu").
+_MAX_ALIAS_WORDS = 8
+
+
+def normalize_place(text: str) -> str:
+    """Case-fold, NFC-normalize and collapse punctuation/whitespace in a place name."""
+    folded = unicodedata.normalize("NFC", text).casefold()
+    return " ".join(_SEPARATOR_PATTERN.sub(" ", folded).split())
+
+
+def _build_indexes() -> tuple[dict[str, str], dict[str, str]]:
+    name_index: dict[str, str] = {}
+    code_index: dict[str, str] = {}
+    for code, (display_name, aliases) in STATES.items():
+        code_index[normalize_place(code)] = code
+        for alias in [display_name, *aliases]:
+            normalized = normalize_place(alias)
+            # Short abbreviations ("up", "or", "ts") are also English words, so
+            # they only count when they are the whole input.
+            if len(normalized) <= 3 and " " not in normalized:
+                code_index[normalized] = code
+            else:
+                name_index[normalized] = code
+    return name_index, code_index
+
+
+STATE_NAME_INDEX, STATE_CODE_INDEX = _build_indexes()
+CITY_STATE_INDEX: dict[str, str] = {normalize_place(city): code for city, code in CITY_STATE_CODES.items()}
+# Run-together spellings ("telanganastate", "tamilnadu") for the substring
+# fallback, longest first; short names would match inside unrelated words.
+_SUBSTRING_ALIASES: list[tuple[str, str]] = sorted(
+    ((name.replace(" ", ""), code) for name, code in STATE_NAME_INDEX.items() if len(name.replace(" ", "")) >= 5),
+    key=lambda alias: len(alias[0]),
+    reverse=True,
+)
+_RUN_TOGETHER_CITIES: frozenset[str] = frozenset(city.replace(" ", "") for city in CITY_STATE_INDEX)
+
+
+def _edge_alias_code(token: str) -> str | None:
+    """
+    State code for a run-together token that starts or ends with a state name
+    ("telanganastate", "statekerala"). A longer city name on the same edge
+    wins, so "bengalurucity" is Bengaluru, not Bengal.
+    """
+    for alias, code in _SUBSTRING_ALIASES:
+        if token.startswith(alias) and not any(
+            len(city) > len(alias) and token.startswith(city) for city in _RUN_TOGETHER_CITIES
+        ):
+            return code
+        if token.endswith(alias) and not any(
+            len(city) > len(alias) and token.endswith(city) for city in _RUN_TOGETHER_CITIES
+        ):
+            return code
+    return None
+
+
+@lru_cache(maxsize=1024)
+def resolve_state_code(text: str) -> str | None:
+    """
+    Map free-text state input to a state code.
+
+    Exact names, abbreviations and Hindi names resolve with a single lookup.
+    Otherwise the longest state name found as a whole-word phrase wins, so
+    "Pune, Maharashtra" and "Tamil Nadu, India" still resolve. Failing that,
+    each word that is not a known city is checked for a state name run
+    together with other text at its start or end ("telanganastate").
+    """
+    normalized = normalize_place(text)
+    if not normalized:
+        return None
+    code = STATE_NAME_INDEX.get(normalized) or STATE_CODE_INDEX.get(normalized)
+    if code is not None:
+        return code
+
+    words = normalized.split()
+    for size in range(min(len(words), _MAX_ALIAS_WORDS), 0, -1):
+        for start in range(len(words) - size + 1):
+            code = STATE_NAME_INDEX.get(" ".join(words[start : start + size]))
+            if code is not None:
+                return code
+
+    for word in words:
+        if word not in CITY_STATE_INDEX:
+            code = _edge_alias_code(word)
+            if code is not None:
+                return code
+    return None
+
+
+def is_known_city(city: str) -> bool:
+    return normalize_place(city) in CITY_STATE_INDEX
+
+
+def state_for_city(city: str) -> str | None:
+    """State code for a known city, falling back to a state named in the text."""
+    return CITY_STATE_INDEX.get(normalize_place(city)) or resolve_state_code(city)
+
+
+def state_name(code: str | None) -> str | None:
+    if code is None or code not in STATES:
+        return None
+    return STATES[code][0]
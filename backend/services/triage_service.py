@@ -1,63 +1,319 @@
+import asyncio
+import json
+import os
 import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
 
 from models.schemas import MEDICAL_DISCLAIMER
+from services.cache import PayloadCache
 
 HINDI_MEDICAL_DISCLAIMER = "यह चिकित्सीय निदान नहीं है। कृपया लाइसेंसधारी चिकित्सा विशेषज्ञ से परामर्श करें।"
 
+# Keyword tables live in a versioned JSON rule file so they can be edited and
+# hot reloaded without a deploy.
+TRIAGE_RULES_PATH = Path(os.getenv("TRIAGE_RULES_PATH", "").strip() or Path(__file__).resolve().parent / "triage_rules.json")
 
-HIGH_RISK_KEYWORDS = ["chest pain", "difficulty breathing", "breathing difficulty", "unconscious", "oxygen drop"]
-MEDIUM_RISK_KEYWORDS = ["high fever", "fever 3 days", "fever for 3 days", "severe headache", "vomiting"]
-LOW_RISK_KEYWORDS = ["mild cold", "mild fever", "sore throat", "runny nose"]
-
-SYMPTOM_SIGNAL_MAP: list[tuple[str, list[str]]] = [
-    ("chest pain", ["chest pain", "chest tightness", "सीने में दर्द", "सीने में जकड़न"]),
-    ("difficulty breathing", ["difficulty breathing", "breathing difficulty", "shortness of breath", "सांस लेने में तकलीफ", "सांस फूलना", "दम घुटना"]),
-    ("unconscious", ["unconscious", "fainted", "passed out", "बेहोश", "होश नहीं", "बेहोशी"]),
-    ("high fever", ["high fever", "104 fever", "103 fever", "तेज बुखार", "ज्यादा बुखार", "बुखार"]),
-    ("severe headache", ["severe headache", "bad headache", "migraine", "तेज सिरदर्द", "भारी सिरदर्द", "सिरदर्द"]),
-    ("vomiting", ["vomiting", "vomit", "nausea", "उल्टी", "मतली"]),
-    ("cough", ["cough", "persistent cough", "खांसी", "लगातार खांसी"]),
-    ("sore throat", ["sore throat", "throat pain", "गले में दर्द", "गला खराब"]),
-    ("runny nose", ["runny nose", "cold", "नक बहना", "जुकाम"]),
-    ("fatigue", ["fatigue", "weakness", "tired", "थकान", "कमजोरी"]),
-    ("oxygen drop", ["oxygen", "spo2", "low oxygen", "ऑक्सीजन", "सैचुरेशन", "ऑक्सीजन कम"]),
-]
-
-HINDI_SYMPTOM_LABELS = {
-    "chest pain": "सीने में दर्द",
-    "difficulty breathing": "सांस लेने में तकलीफ",
-    "unconscious": "बेहोशी",
-    "high fever": "तेज बुखार",
-    "severe headache": "तेज सिरदर्द",
-    "vomiting": "उल्टी/मतली",
-    "cough": "खांसी",
-    "sore throat": "गले में दर्द",
-    "runny nose": "जुकाम",
-    "fatigue": "थकान/कमजोरी",
-    "oxygen drop": "ऑक्सीजन कम होना",
+EMERGENCY_GROUPS = ("chest_pain", "sweating", "breathing", "unconscious", "low_oxygen")
+EMERGENCY_BITS = {group: 1 << index for index, group in enumerate(EMERGENCY_GROUPS)}
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over a fixed phrase set.
+
+    `find` walks the text once and returns every phrase that occurs in it as a
+    substring, which is exactly what `phrase in text` would report per phrase.
+    """
+
+    def __init__(self, phrases: list[str]) -> None:
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[set[str]] = [set()]
+        for phrase in dict.fromkeys(phrases):
+            if not phrase:
+                continue
+            state = 0
+            for char in phrase:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(phrase)
+
+        # Breadth-first pass: resolve failure links and fold every state into a
+        # full transition table so `find` never has to backtrack.
+        fail = [0] * len(goto)
+        delta: list[dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(char, 0) if state else 0
+                queue.append(next_state)
+
+        self._delta = delta
+        self._outputs: list[frozenset[str]] = [frozenset(items) for items in outputs]
+
+    def find(self, text: str) -> frozenset[str]:
+        return self.feed(text)[1]
+
+    def feed(self, text: str, state: int = 0) -> tuple[int, frozenset[str]]:
+        """
+        Continue a scan from `state` (0 starts fresh). Returns the end state and
+        the phrases completed inside `text`, so a stream can be matched chunk
+        by chunk with the same result as one scan over the concatenation.
+        """
+        delta = self._delta
+        outputs = self._outputs
+        hits: set[str] = set()
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                hits |= outputs[state]
+        return state, frozenset(hits)
+
+
+ADVISORY_FRAMES: dict[tuple[str, str], str] = {
+    ("hi", "HIGH"): (
+        "स्थिति: आपके लक्षण इस समय उच्च जोखिम (HIGH risk) दिखाते हैं और यह गंभीर अवस्था हो सकती है। "
+        "जोखिम का कारण: {why_note}. पहचाने गए लक्षण: {symptom_note}. "
+        "अभी क्या करें (अगले 0-2 घंटे): तुरंत नजदीकी आपातकालीन विभाग जाएं। "
+        "यदि सुरक्षित रूप से जाना संभव न हो तो तुरंत इमरजेंसी सेवा को कॉल करें। "
+        "तुरंत देखभाल के कदम: {action_note} "
+        "यदि भ्रम, सांस लेने में अधिक तकलीफ, लगातार उल्टी, छाती में दर्द, पेशाब कम होना, या अत्यधिक सुस्ती हो तो तुरंत आपातकालीन सहायता लें।"
+    ),
+    ("hi", "MEDIUM"): (
+        "स्थिति: आपके लक्षण मध्यम जोखिम (MODERATE risk) दिखाते हैं और समय पर डॉक्टर की सलाह जरूरी है। "
+        "जोखिम का कारण: {why_note}. पहचाने गए लक्षण: {symptom_note}. "
+        "अभी क्या करें (अगले 12-24 घंटे): डॉक्टर से परामर्श की व्यवस्था करें और तब तक घर पर निगरानी रखें। "
+        "घर पर देखभाल के कदम: {action_note} "
+        "यदि बुखार और बढ़े, सांस खराब हो, छाती में दर्द शुरू हो, भ्रम हो, या उल्टी जारी रहे तो तुरंत आपातकालीन देखभाल लें।"
+    ),
+    ("hi", "LOW"): (
+        "स्थिति: इस समय उपलब्ध जानकारी के आधार पर तुरंत जोखिम अपेक्षाकृत कम (LOW risk) दिख रहा है। "
+        "जोखिम का कारण: {why_note}. पहचाने गए लक्षण: {symptom_note}. "
+        "अभी क्या करें (अगले 24-48 घंटे): आराम करें, पानी पर्याप्त लें, और लक्षणों की निगरानी जारी रखें। "
+        "घर पर देखभाल के कदम: {action_note} "
+        "यदि 48 घंटे से अधिक लक्षण बने रहें या कोई गंभीर चेतावनी लक्षण पहले दिखे तो डॉक्टर से तुरंत मिलें।"
+    ),
+    ("en", "HIGH"): (
+        "What is happening: your symptom pattern is currently classified as HIGH risk and may represent an acute condition. "
+        "Why this risk: {why_note}. Detected symptoms: {symptom_note}. "
+        "What to do now (next 0-2 hours): go to the nearest emergency department immediately. "
+        "If safe transport is not possible, call emergency services right away. "
+        "Immediate care steps: {action_note} "
+        "Escalate immediately if there is confusion, breathing distress, persistent vomiting, chest pain, reduced urine output, or drowsiness."
+    ),
+    ("en", "MEDIUM"): (
+        "What is happening: your symptoms suggest a MODERATE risk condition that needs timely medical review. "
+        "Why this risk: {why_note}. Detected symptoms: {symptom_note}. "
+        "What to do now (next 12-24 hours): arrange a doctor consultation and continue monitoring at home meanwhile. "
+        "Home-care steps: {action_note} "
+        "Escalate to emergency care immediately if fever rises further, breathing worsens, chest pain appears, confusion starts, or vomiting persists."
+    ),
+    ("en", "LOW"): (
+        "What is happening: current inputs indicate a LOWER immediate risk pattern at this moment. "
+        "Why this risk: {why_note}. Detected symptoms: {symptom_note}. "
+        "What to do now (next 24-48 hours): continue rest, hydration, and symptom tracking. "
+        "Home-care steps: {action_note} "
+        "Seek in-person care if symptoms persist beyond 48 hours or any red-flag symptom appears earlier."
+    ),
 }
 
+# Reason bits 0-2 and action bit 0 describe the temperature; the phrase-driven
+# reasons and actions follow in rule-file order.
+REASON_TEMPERATURE = 1 << 0
+REASON_FEVER_104 = 1 << 1
+REASON_FEVER_102 = 1 << 2
+ACTION_TEMPERATURE = 1 << 0
+_REASON_PHRASE_SHIFT = 3
+_ACTION_PHRASE_SHIFT = 1
+
+
+def _phrase_list(value: object, field: str) -> list[str]:
+    if not isinstance(value, list) or not all(isinstance(item, str) and item for item in value):
+        raise ValueError(f"'{field}' must be a list of non-empty strings")
+    return list(value)
+
+
+class TriageRuleSet:
+    """
+    One version of the triage rule file, compiled for the request path.
+
+    Besides the keyword tables it holds a single phrase matcher over every
+    phrase and a decision table mapping each phrase to the symptom-label,
+    emergency-group, general-risk, reason and action bits it sets. Instances
+    are treated as immutable; hot reload swaps in a new one.
+    """
+
+    __slots__ = (
+        "version",
+        "source",
+        "loaded_at",
+        "high_risk_keywords",
+        "medium_risk_keywords",
+        "low_risk_keywords",
+        "symptom_signals",
+        "hindi_symptom_labels",
+        "emergency_phrases",
+        "general_risk_phrases",
+        "advisory_reasons",
+        "advisory_actions",
+        "matcher",
+        "phrase_flags",
+        "advisory_templates",
+    )
+
+    def __init__(self, rules: dict[str, object], source: str = "<memory>") -> None:
+        try:
+            self.version = str(rules["version"])
+            risk_keywords = rules["risk_keywords"]
+            self.high_risk_keywords = _phrase_list(risk_keywords["high"], "risk_keywords.high")
+            self.medium_risk_keywords = _phrase_list(risk_keywords["medium"], "risk_keywords.medium")
+            self.low_risk_keywords = _phrase_list(risk_keywords["low"], "risk_keywords.low")
+            self.symptom_signals: list[tuple[str, list[str]]] = [
+                (str(entry["label"]), _phrase_list(entry["phrases"], f"symptom_signals.{entry['label']}"))
+                for entry in rules["symptom_signals"]
+            ]
+            self.hindi_symptom_labels: dict[str, str] = {
+                str(entry["label"]): str(entry.get("hindi_label") or entry["label"])
+                for entry in rules["symptom_signals"]
+            }
+            self.emergency_phrases: dict[str, list[str]] = {
+                group: _phrase_list(rules["emergency_phrases"][group], f"emergency_phrases.{group}")
+                for group in EMERGENCY_GROUPS
+            }
+            self.general_risk_phrases = _phrase_list(rules["general_risk_phrases"], "general_risk_phrases")
+            self.advisory_reasons: list[tuple[str, list[str]]] = [
+                (str(entry["text"]), _phrase_list(entry["phrases"], "advisory_reasons.phrases"))
+                for entry in rules["advisory_reasons"]
+            ]
+            self.advisory_actions: list[tuple[str, list[str]]] = [
+                (str(entry["text"]), _phrase_list(entry["phrases"], "advisory_actions.phrases"))
+                for entry in rules["advisory_actions"]
+            ]
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"Invalid triage rule file {source}: {error}") from error
+
+        self.source = source
+        self.loaded_at = datetime.now(timezone.utc)
+
+        # Decision table: phrase -> [label, emergency, general, reason, action] bits.
+        flags: dict[str, list[int]] = {}
+
+        def mark(phrases: list[str], field: int, bit: int) -> None:
+            for phrase in phrases:
+                flags.setdefault(phrase, [0, 0, 0, 0, 0])[field] |= bit
+
+        for index, (_, phrases) in enumerate(self.symptom_signals):
+            mark(phrases, 0, 1 << index)
+        for group, phrases in self.emergency_phrases.items():
+            mark(phrases, 1, EMERGENCY_BITS[group])
+        mark(self.general_risk_phrases, 2, 1)
+        for index, (_, phrases) in enumerate(self.advisory_reasons):
+            mark(phrases, 3, 1 << (index + _REASON_PHRASE_SHIFT))
+        for index, (_, phrases) in enumerate(self.advisory_actions):
+            mark(phrases, 4, 1 << (index + _ACTION_PHRASE_SHIFT))
+
+        self.phrase_flags: dict[str, tuple[int, int, int, int, int]] = {
+            phrase: (labels, emergency, general, reasons, actions)
+            for phrase, (labels, emergency, general, reasons, actions) in flags.items()
+        }
+        self.matcher = PhraseMatcher(list(self.phrase_flags))
+
+        # (language, risk tier, reason mask, action mask) -> template whose only
+        # remaining fields are the temperature and the symptom note.
+        self.advisory_templates: dict[tuple[str, str, int, int], str] = {}
+        # Compile every template a phrase-only input can reach up front;
+        # temperature combinations are compiled on first use.
+        for language, tier in ADVISORY_FRAMES:
+            for _, _, _, reasons, actions in [*self.phrase_flags.values(), (0, 0, 0, 0, 0)]:
+                self.advisory_template(language, tier, reasons, actions)
+
+    def advisory_template(self, language: str, tier: str, reason_mask: int, action_mask: int) -> str:
+        key = (language, tier, reason_mask, action_mask)
+        template = self.advisory_templates.get(key)
+        if template is None:
+            template = self._compile_advisory_template(language, tier, reason_mask, action_mask)
+            self.advisory_templates[key] = template
+        return template
+
+    def _compile_advisory_template(self, language: str, tier: str, reason_mask: int, action_mask: int) -> str:
+        why_risk_points: list[str] = []
+        if reason_mask & REASON_TEMPERATURE:
+            why_risk_points.append("reported temperature ≈ {temperature_f:.1f}°F")
+        if reason_mask & REASON_FEVER_104:
+            why_risk_points.append("very high fever threshold reached (≥104°F)")
+        if reason_mask & REASON_FEVER_102:
+            why_risk_points.append("high fever range present (≥102°F)")
+        for index, (reason, _) in enumerate(self.advisory_reasons):
+            if reason_mask & 1 << (index + _REASON_PHRASE_SHIFT):
+                why_risk_points.append(reason.replace("{", "{{").replace("}", "}}"))
+        if not why_risk_points:
+            why_risk_points.append("risk estimated from current symptom pattern")
+
+        specific_actions: list[str] = []
+        if action_mask & ACTION_TEMPERATURE:
+            specific_actions.append("Recheck temperature every 4 hours and maintain hydration.")
+        for index, (action, _) in enumerate(self.advisory_actions):
+            if action_mask & 1 << (index + _ACTION_PHRASE_SHIFT):
+                specific_actions.append(action.replace("{", "{{").replace("}", "}}"))
+        if not specific_actions:
+            specific_actions.append("Continue symptom tracking and avoid delayed consultation if symptoms worsen.")
+
+        return (
+            ADVISORY_FRAMES[(language, tier)]
+            .replace("{why_note}", "; ".join(why_risk_points))
+            .replace("{action_note}", " ".join(specific_actions))
+        )
+
+
+def load_rule_set(path: Path | None = None) -> TriageRuleSet:
+    """
+    Read and compile a rule file. This is the expensive step (automaton and
+    template compilation), so run it off the request path.
+    """
+    rule_path = path or TRIAGE_RULES_PATH
+    with open(rule_path, encoding="utf-8") as handle:
+        rules = json.load(handle)
+    return TriageRuleSet(rules, source=str(rule_path))
+
+
+_active_rules = load_rule_set()
+_seen_rules_mtime: float | None = TRIAGE_RULES_PATH.stat().st_mtime
+
+
+def get_rule_set() -> TriageRuleSet:
+    return _active_rules
+
 
 def _normalize(text: str) -> str:
     return " ".join(text.lower().strip().split())
 
 
-def _contains_any(text: str, phrases: list[str]) -> bool:
-    return any(phrase in text for phrase in phrases)
-
+EXPLICIT_TEMPERATURE_PATTERN = re.compile(r"(\d{2,3}(?:\.\d+)?)\s*°?\s*([fc])\b")
+DEGREE_TEMPERATURE_PATTERN = re.compile(r"(\d{2,3}(?:\.\d+)?)\s*(?:degrees?|degree|deg)")
+FEVER_NUMBER_PATTERN = re.compile(r"(?:fever|बुखार)[^0-9]{0,12}(\d{2,3}(?:\.\d+)?)")
+STANDALONE_TEMPERATURE_PATTERN = re.compile(r"\b(10[0-9](?:\.\d+)?)\b")
 
-def extract_temperature_fahrenheit(symptom_text: str) -> float | None:
-    """Extract temperature from free text and normalize to Fahrenheit."""
-    normalized = _normalize(symptom_text)
 
-    explicit_matches = re.findall(r"(\d{2,3}(?:\.\d+)?)\s*°?\s*([fc])\b", normalized)
+def _parse_temperature_fahrenheit(normalized: str) -> float | None:
+    explicit_matches = EXPLICIT_TEMPERATURE_PATTERN.findall(normalized)
     for value_str, unit in explicit_matches:
         value = float(value_str)
         if unit == "f":
             return value
         return (value * 9 / 5) + 32
 
-    degree_match = re.search(r"(\d{2,3}(?:\.\d+)?)\s*(?:degrees?|degree|deg)", normalized)
+    degree_match = DEGREE_TEMPERATURE_PATTERN.search(normalized)
     if degree_match:
         value = float(degree_match.group(1))
         if 85 <= value <= 115:
@@ -65,7 +321,7 @@ def extract_temperature_fahrenheit(symptom_text: str) -> float | None:
         if 30 <= value <= 47:
             return (value * 9 / 5) + 32
 
-    fever_number_match = re.search(r"(?:fever|बुखार)[^0-9]{0,12}(\d{2,3}(?:\.\d+)?)", normalized)
+    fever_number_match = FEVER_NUMBER_PATTERN.search(normalized)
     if fever_number_match:
         value = float(fever_number_match.group(1))
         if 85 <= value <= 115:
@@ -73,47 +329,111 @@ def extract_temperature_fahrenheit(symptom_text: str) -> float | None:
         if 30 <= value <= 47:
             return (value * 9 / 5) + 32
 
-    standalone_match = re.search(r"\b(10[0-9](?:\.\d+)?)\b", normalized)
+    standalone_match = STANDALONE_TEMPERATURE_PATTERN.search(normalized)
     if standalone_match and ("fever" in normalized or "बुखार" in normalized):
         return float(standalone_match.group(1))
 
     return None
 
 
-def extract_symptoms(symptom_text: str) -> list[str]:
+class TriageContext:
+    """
+    Symptom text parsed once per request and shared by every triage rule.
+
+    Holds the normalized text, the phrase-hit set, the parsed temperature,
+    the detected labels and the decision-table bits for those hits, all taken
+    from one rule-set snapshot so a concurrent reload cannot mix versions.
+    """
+
+    __slots__ = (
+        "symptom_text",
+        "normalized",
+        "rules",
+        "phrase_hits",
+        "temperature_f",
+        "detected_symptoms",
+        "emergency_mask",
+        "general_risk",
+        "reason_mask",
+        "action_mask",
+    )
+
+    def __init__(
+        self,
+        symptom_text: str,
+        normalized: str | None = None,
+        rules: TriageRuleSet | None = None,
+        phrase_hits: frozenset[str] | None = None,
+    ) -> None:
+        self.symptom_text = symptom_text
+        self.normalized = _normalize(symptom_text) if normalized is None else normalized
+        self.rules = rules or _active_rules
+        self.phrase_hits = self.rules.matcher.find(self.normalized) if phrase_hits is None else phrase_hits
+        self.temperature_f = _parse_temperature_fahrenheit(self.normalized)
+
+        label_mask = emergency_mask = general_risk = reason_mask = action_mask = 0
+        phrase_flags = self.rules.phrase_flags
+        for phrase in self.phrase_hits:
+            labels, emergency, general, reasons, actions = phrase_flags[phrase]
+            label_mask |= labels
+            emergency_mask |= emergency
+            general_risk |= general
+            reason_mask |= reasons
+            action_mask |= actions
+
+        self.detected_symptoms = [
+            canonical_label
+            for index, (canonical_label, _) in enumerate(self.rules.symptom_signals)
+            if label_mask >> index & 1
+        ]
+        self.emergency_mask = emergency_mask
+        self.general_risk = bool(general_risk)
+        self.reason_mask = reason_mask
+        self.action_mask = action_mask
+
+
+def _as_context(symptom: str | TriageContext) -> TriageContext:
+    return symptom if isinstance(symptom, TriageContext) else TriageContext(symptom)
+
+
+def extract_temperature_fahrenheit(symptom_text: str | TriageContext) -> float | None:
+    """Extract temperature from free text and normalize to Fahrenheit."""
+    if isinstance(symptom_text, TriageContext):
+        return symptom_text.temperature_f
+    return _parse_temperature_fahrenheit(_normalize(symptom_text))
+
+
+def extract_symptoms(symptom_text: str | TriageContext) -> list[str]:
     """Extract matched symptom signals from free text for both English and Hindi input."""
-    normalized = _normalize(symptom_text)
-    detected: list[str] = []
-    for canonical_label, phrases in SYMPTOM_SIGNAL_MAP:
-        if _contains_any(normalized, phrases):
-            detected.append(canonical_label)
-    return detected
+    return list(_as_context(symptom_text).detected_symptoms)
 
 
-def detect_emergency(symptom_text: str) -> bool:
+def detect_emergency(symptom_text: str | TriageContext) -> bool:
     """
     Conservative emergency detection rules.
     Escalate if any emergency pattern is present.
     """
-    normalized = _normalize(symptom_text)
-    has_chest_pain = _contains_any(normalized, ["chest pain", "chest tightness", "सीने में दर्द", "सीने में जकड़न"])
-    has_sweating = _contains_any(normalized, ["sweating", "sweat", "पसीना", "ठंडा पसीना"])
-    has_breathing_issue = _contains_any(normalized, ["difficulty breathing", "breathing difficulty", "shortness of breath", "सांस लेने में तकलीफ", "सांस फूलना"])
-    has_unconscious = _contains_any(normalized, ["unconscious", "fainted", "passed out", "बेहोश", "बेहोशी"])
-    has_low_oxygen = _contains_any(normalized, ["low oxygen", "spo2", "ऑक्सीजन कम", "सैचुरेशन"])
-    temperature_f = extract_temperature_fahrenheit(symptom_text)
+    context = _as_context(symptom_text)
+    emergency_mask = context.emergency_mask
+    has_chest_pain = bool(emergency_mask & EMERGENCY_BITS["chest_pain"])
+    has_sweating = bool(emergency_mask & EMERGENCY_BITS["sweating"])
+    has_breathing_issue = bool(emergency_mask & EMERGENCY_BITS["breathing"])
+    has_unconscious = bool(emergency_mask & EMERGENCY_BITS["unconscious"])
+    has_low_oxygen = bool(emergency_mask & EMERGENCY_BITS["low_oxygen"])
+    temperature_f = context.temperature_f
     has_very_high_fever = temperature_f is not None and temperature_f >= 104.0
 
     return (has_chest_pain and has_sweating) or has_breathing_issue or has_unconscious or has_very_high_fever or has_low_oxygen
 
 
-def classify_risk(symptom_text: str, detected_symptoms: list[str], emergency_flag: bool) -> str:
+def classify_risk(symptom_text: str | TriageContext, detected_symptoms: list[str], emergency_flag: bool) -> str:
     """Classify risk as Low / Medium / High based on symptom patterns."""
     if emergency_flag:
         return "HIGH"
 
-    normalized = _normalize(symptom_text)
-    temperature_f = extract_temperature_fahrenheit(symptom_text)
+    context = _as_context(symptom_text)
+    rules = context.rules
+    temperature_f = context.temperature_f
 
     if temperature_f is not None:
         if temperature_f >= 104.0:
@@ -121,14 +441,14 @@ def classify_risk(symptom_text: str, detected_symptoms: list[str], emergency_fla
         if temperature_f >= 102.0:
             return "MEDIUM"
 
-    if any(keyword in detected_symptoms for keyword in HIGH_RISK_KEYWORDS):
+    if any(keyword in detected_symptoms for keyword in rules.high_risk_keywords):
         return "HIGH"
-    if any(keyword in detected_symptoms for keyword in MEDIUM_RISK_KEYWORDS):
+    if any(keyword in detected_symptoms for keyword in rules.medium_risk_keywords):
         return "MEDIUM"
-    if any(keyword in detected_symptoms for keyword in LOW_RISK_KEYWORDS):
+    if any(keyword in detected_symptoms for keyword in rules.low_risk_keywords):
         return "LOW"
 
-    if _contains_any(normalized, ["fever", "headache", "बुखार", "सिरदर्द", "उल्टी"]):
+    if context.general_risk:
         return "MEDIUM"
     return "LOW"
 
@@ -136,120 +456,273 @@ def classify_risk(symptom_text: str, detected_symptoms: list[str], emergency_fla
 def advisory_for_risk(
     risk_level: str,
     emergency_flag: bool,
-    symptom_text: str,
+    symptom_text: str | TriageContext,
     detected_symptoms: list[str],
     language: str = "en",
 ) -> str:
     """Generate non-diagnostic advisory text for user safety."""
-    temperature_f = extract_temperature_fahrenheit(symptom_text)
-    normalized = _normalize(symptom_text)
-    symptom_note_en = ", ".join(detected_symptoms) if detected_symptoms else "no mapped keyword symptoms"
-    symptom_note_hi = ", ".join(HINDI_SYMPTOM_LABELS.get(symptom, symptom) for symptom in detected_symptoms) if detected_symptoms else "कोई प्रमुख लक्षण मैप नहीं हुआ"
+    context = _as_context(symptom_text)
+    rules = context.rules
+    temperature_f = context.temperature_f
 
-    why_risk_points: list[str] = []
+    reason_mask = context.reason_mask
+    action_mask = context.action_mask
     if temperature_f is not None:
-        why_risk_points.append(f"reported temperature ≈ {temperature_f:.1f}°F")
+        reason_mask |= REASON_TEMPERATURE
+        action_mask |= ACTION_TEMPERATURE
         if temperature_f >= 104:
-            why_risk_points.append("very high fever threshold reached (≥104°F)")
+            reason_mask |= REASON_FEVER_104
         elif temperature_f >= 102:
-            why_risk_points.append("high fever range present (≥102°F)")
+            reason_mask |= REASON_FEVER_102
 
-    if _contains_any(normalized, ["chest pain", "सीने में दर्द", "सीने में जकड़न"]):
-        why_risk_points.append("chest pain reported")
-    if _contains_any(normalized, ["difficulty breathing", "breathing difficulty", "shortness of breath", "सांस लेने में तकलीफ", "सांस फूलना"]):
-        why_risk_points.append("breathing difficulty reported")
-    if _contains_any(normalized, ["unconscious", "fainted", "बेहोश", "बेहोशी"]):
-        why_risk_points.append("altered consciousness reported")
-    if _contains_any(normalized, ["headache", "severe headache", "सिरदर्द", "तेज सिरदर्द"]):
-        why_risk_points.append("headache reported")
-    if _contains_any(normalized, ["vomiting", "vomit", "उल्टी", "मतली"]):
-        why_risk_points.append("vomiting reported")
-
-    if not why_risk_points:
-        why_risk_points.append("risk estimated from current symptom pattern")
-
-    specific_actions: list[str] = []
-    if temperature_f is not None:
-        specific_actions.append("Recheck temperature every 4 hours and maintain hydration.")
-    if _contains_any(normalized, ["chest pain", "सीने में दर्द", "सीने में जकड़न"]):
-        specific_actions.append("Avoid exertion and keep the person seated upright while arranging urgent evaluation.")
-    if _contains_any(normalized, ["difficulty breathing", "breathing difficulty", "shortness of breath", "सांस लेने में तकलीफ", "सांस फूलना"]):
-        specific_actions.append("Keep airway clear, loosen tight clothing, and seek emergency care immediately.")
-    if _contains_any(normalized, ["headache", "severe headache", "सिरदर्द", "तेज सिरदर्द"]):
-        specific_actions.append("Rest in a quiet, dark room and monitor for neck stiffness, confusion, or repeated vomiting.")
-    if _contains_any(normalized, ["mild cold", "cold", "runny nose", "जुकाम", "नक बहना"]):
-        specific_actions.append("Use warm fluids, steam inhalation, and rest; avoid unnecessary antibiotics.")
-    if _contains_any(normalized, ["vomiting", "vomit", "उल्टी", "मतली"]):
-        specific_actions.append("Take small frequent sips of oral fluids and watch for dehydration signs such as reduced urine or dizziness.")
-
-    if not specific_actions:
-        specific_actions.append("Continue symptom tracking and avoid delayed consultation if symptoms worsen.")
-
-    action_note = " ".join(specific_actions)
-    why_note = "; ".join(why_risk_points)
-
-    if language == "hi":
-      if emergency_flag or risk_level == "HIGH":
-          return (
-              "स्थिति: आपके लक्षण इस समय उच्च जोखिम (HIGH risk) दिखाते हैं और यह गंभीर अवस्था हो सकती है। "
-              f"जोखिम का कारण: {why_note}. पहचाने गए लक्षण: {symptom_note_hi}. "
-              "अभी क्या करें (अगले 0-2 घंटे): तुरंत नजदीकी आपातकालीन विभाग जाएं। "
-              "यदि सुरक्षित रूप से जाना संभव न हो तो तुरंत इमरजेंसी सेवा को कॉल करें। "
-              f"तुरंत देखभाल के कदम: {action_note} "
-              "यदि भ्रम, सांस लेने में अधिक तकलीफ, लगातार उल्टी, छाती में दर्द, पेशाब कम होना, या अत्यधिक सुस्ती हो तो तुरंत आपातकालीन सहायता लें।"
-          )
-      if risk_level == "MEDIUM":
-          return (
-              "स्थिति: आपके लक्षण मध्यम जोखिम (MODERATE risk) दिखाते हैं और समय पर डॉक्टर की सलाह जरूरी है। "
-              f"जोखिम का कारण: {why_note}. पहचाने गए लक्षण: {symptom_note_hi}. "
-              "अभी क्या करें (अगले 12-24 घंटे): डॉक्टर से परामर्श की व्यवस्था करें और तब तक घर पर निगरानी रखें। "
-              f"घर पर देखभाल के कदम: {action_note} "
-              "यदि बुखार और बढ़े, सांस खराब हो, छाती में दर्द शुरू हो, भ्रम हो, या उल्टी जारी रहे तो तुरंत आपातकालीन देखभाल लें।"
-          )
-      return (
-          "स्थिति: इस समय उपलब्ध जानकारी के आधार पर तुरंत जोखिम अपेक्षाकृत कम (LOW risk) दिख रहा है। "
-          f"जोखिम का कारण: {why_note}. पहचाने गए लक्षण: {symptom_note_hi}. "
-          "अभी क्या करें (अगले 24-48 घंटे): आराम करें, पानी पर्याप्त लें, और लक्षणों की निगरानी जारी रखें। "
-          f"घर पर देखभाल के कदम: {action_note} "
-          "यदि 48 घंटे से अधिक लक्षण बने रहें या कोई गंभीर चेतावनी लक्षण पहले दिखे तो डॉक्टर से तुरंत मिलें।"
-      )
-
-    if emergency_flag or risk_level == "HIGH":
-        return (
-            "What is happening: your symptom pattern is currently classified as HIGH risk and may represent an acute condition. "
-            f"Why this risk: {why_note}. Detected symptoms: {symptom_note_en}. "
-            "What to do now (next 0-2 hours): go to the nearest emergency department immediately. "
-            "If safe transport is not possible, call emergency services right away. "
-            f"Immediate care steps: {action_note} "
-            "Escalate immediately if there is confusion, breathing distress, persistent vomiting, chest pain, reduced urine output, or drowsiness."
-        )
-    if risk_level == "MEDIUM":
-        return (
-            "What is happening: your symptoms suggest a MODERATE risk condition that needs timely medical review. "
-            f"Why this risk: {why_note}. Detected symptoms: {symptom_note_en}. "
-            "What to do now (next 12-24 hours): arrange a doctor consultation and continue monitoring at home meanwhile. "
-            f"Home-care steps: {action_note} "
-            "Escalate to emergency care immediately if fever rises further, breathing worsens, chest pain appears, confusion starts, or vomiting persists."
-        )
-    return (
-        "What is happening: current inputs indicate a LOWER immediate risk pattern at this moment. "
-        f"Why this risk: {why_note}. Detected symptoms: {symptom_note_en}. "
-        "What to do now (next 24-48 hours): continue rest, hydration, and symptom tracking. "
-        f"Home-care steps: {action_note} "
-        "Seek in-person care if symptoms persist beyond 48 hours or any red-flag symptom appears earlier."
-    )
+    language_key = "hi" if language == "hi" else "en"
+    tier = "HIGH" if emergency_flag or risk_level == "HIGH" else "MEDIUM" if risk_level == "MEDIUM" else "LOW"
+    template = rules.advisory_templates.get((language_key, tier, reason_mask, action_mask))
+    if template is None:
+        template = rules.advisory_template(language_key, tier, reason_mask, action_mask)
 
+    if language_key == "hi":
+        symptom_note = ", ".join(rules.hindi_symptom_labels.get(symptom, symptom) for symptom in detected_symptoms) if detected_symptoms else "कोई प्रमुख लक्षण मैप नहीं हुआ"
+    else:
+        symptom_note = ", ".join(detected_symptoms) if detected_symptoms else "no mapped keyword symptoms"
+    return template.format(temperature_f=temperature_f, symptom_note=symptom_note)
 
-async def analyze_symptoms(symptom_text: str, language: str = "en") -> dict[str, object]:
-    """Main async triage entrypoint used by API routes."""
-    detected_symptoms = extract_symptoms(symptom_text)
-    emergency_flag = detect_emergency(symptom_text)
-    risk_level = classify_risk(symptom_text, detected_symptoms, emergency_flag)
+
+# Finished triage payloads keyed by (normalized text, language). Every triage
+# rule only reads the normalized text, so two inputs with the same key always
+# produce the same payload.
+TRIAGE_CACHE = PayloadCache(max_size=int(os.getenv("TRIAGE_CACHE_SIZE", "4096")))
+
+
+def get_triage_cache_stats() -> dict[str, object]:
+    return TRIAGE_CACHE.stats()
+
+
+def activate_rule_set(rule_set: TriageRuleSet) -> None:
+    """
+    Swap in an already compiled rule set. The swap is a single reference
+    assignment, so in-flight requests finish on the snapshot they started
+    with. Cached results came from the old rules and are dropped.
+    """
+    global _active_rules
+    _active_rules = rule_set
+    TRIAGE_CACHE.clear()
+
+
+async def reload_rule_set(path: Path | None = None) -> TriageRuleSet:
+    """Compile the rule file in a worker thread, then swap it in on the event loop."""
+    global _seen_rules_mtime
+    rule_path = path or TRIAGE_RULES_PATH
+    mtime = rule_path.stat().st_mtime
+    rule_set = await asyncio.to_thread(load_rule_set, rule_path)
+    activate_rule_set(rule_set)
+    if rule_path == TRIAGE_RULES_PATH:
+        _seen_rules_mtime = mtime
+    return rule_set
+
+
+async def watch_rule_file(interval_seconds: float) -> None:
+    """
+    Poll the rule file and hot reload it when it changes. Every uvicorn
+    worker runs its own watcher, so all workers converge on the new version.
+    A broken file is reported and the previous rules stay active.
+    """
+    global _seen_rules_mtime
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            mtime = TRIAGE_RULES_PATH.stat().st_mtime
+            if mtime == _seen_rules_mtime:
+                continue
+            # Remember the attempt so a broken file is reported once, not every poll.
+            _seen_rules_mtime = mtime
+            rule_set = await reload_rule_set()
+            print(f"[triage] Loaded rule file version {rule_set.version}")
+        except Exception as exc:
+            print(f"[triage] Rule reload skipped: {exc}")
+
+
+def describe_rule_set() -> dict[str, object]:
+    rules = _active_rules
+    return {
+        "version": rules.version,
+        "source": rules.source,
+        "loaded_at": rules.loaded_at.isoformat(),
+        "phrase_count": len(rules.phrase_flags),
+        "compiled_templates": len(rules.advisory_templates),
+    }
+
+
+def classify_symptom_text(symptom_text: str) -> tuple[str, bool]:
+    """Risk level and emergency flag only, without rendering an advisory."""
+    context = TriageContext(symptom_text)
+    emergency_flag = detect_emergency(context)
+    return classify_risk(context, context.detected_symptoms, emergency_flag), emergency_flag
+
+
+def _triage_payload(context: TriageContext, language: str) -> dict[str, object]:
+    detected_symptoms = extract_symptoms(context)
+    emergency_flag = detect_emergency(context)
+    risk_level = classify_risk(context, detected_symptoms, emergency_flag)
 
     return {
         "risk_level": risk_level,
         "emergency_flag": emergency_flag,
-        "advisory_message": advisory_for_risk(risk_level, emergency_flag, symptom_text, detected_symptoms, language),
+        "advisory_message": advisory_for_risk(risk_level, emergency_flag, context, detected_symptoms, language),
         "disclaimer": HINDI_MEDICAL_DISCLAIMER if language == "hi" else MEDICAL_DISCLAIMER,
         "detected_symptoms": detected_symptoms,
     }
+
+
+async def analyze_symptoms(symptom_text: str, language: str = "en") -> dict[str, object]:
+    """Main async triage entrypoint used by API routes."""
+    started = time.perf_counter()
+    normalized = _normalize(symptom_text)
+    cache_key = (normalized, language)
+
+    cached = TRIAGE_CACHE.get(cache_key)
+    if cached is None:
+        cached = _triage_payload(TriageContext(symptom_text, normalized), language)
+        TRIAGE_CACHE.put(cache_key, cached)
+        hit = False
+    else:
+        hit = True
+
+    # Callers own the returned dict, so never hand out the cached list itself.
+    result = {**cached, "detected_symptoms": list(cached["detected_symptoms"])}
+    TRIAGE_CACHE.record_latency(hit, (time.perf_counter() - started) * 1000)
+    return result
+
+
+class StreamingTriageSession:
+    """
+    Running transcript of one streaming call, triaged incrementally.
+
+    Each chunk is normalized and fed to the phrase automaton from the state the
+    previous chunk ended in, so only the new text is matched. The accumulated
+    hit set, and therefore the triage result, equals a one-shot triage of the
+    whole transcript so far.
+    """
+
+    __slots__ = ("language", "rules", "transcript", "normalized", "emergency_reported", "_matcher_state", "_phrase_hits")
+
+    def __init__(self, language: str = "en") -> None:
+        self.language = language
+        # Pinned for the whole call: matcher states are only valid for the
+        # automaton that produced them.
+        self.rules = _active_rules
+        self.transcript = ""
+        self.normalized = ""
+        self.emergency_reported = False
+        self._matcher_state = 0
+        self._phrase_hits: set[str] = set()
+
+    def add_chunk(self, chunk_text: str) -> TriageContext | None:
+        """Append a transcript chunk; returns None when it adds no text."""
+        chunk = _normalize(chunk_text)
+        if not chunk:
+            return None
+        if self.normalized:
+            chunk = f" {chunk}"
+            self.transcript = f"{self.transcript} {chunk_text.strip()}"
+        else:
+            self.transcript = chunk_text.strip()
+
+        self._matcher_state, new_hits = self.rules.matcher.feed(chunk, self._matcher_state)
+        self.normalized += chunk
+        self._phrase_hits |= new_hits
+        return TriageContext(self.transcript, self.normalized, self.rules, frozenset(self._phrase_hits))
+
+    def raise_emergency(self, context: TriageContext) -> list[str]:
+        """
+        Return the red flags the first time the transcript turns into an
+        emergency, and an empty list otherwise, so callers escalate once.
+        """
+        if self.emergency_reported or not detect_emergency(context):
+            return []
+        self.emergency_reported = True
+        red_flags = [group for group, bit in EMERGENCY_BITS.items() if context.emergency_mask & bit]
+        if context.temperature_f is not None and context.temperature_f >= 104.0:
+            red_flags.append("very_high_fever")
+        return red_flags
+
+    def result(self, context: TriageContext) -> dict[str, object]:
+        return _triage_payload(context, self.language)
+
+
+def _rows_matching(phrase_rows: dict[str, int], phrases: list[str]) -> int:
+    rows = 0
+    for phrase in phrases:
+        rows |= phrase_rows.get(phrase, 0)
+    return rows
+
+
+async def analyze_symptoms_batch(items: list[tuple[str, str]]) -> list[dict[str, object]]:
+    """
+    Batch triage entrypoint for bulk jobs.
+
+    Builds a phrase-hit matrix stored column-wise (one row bitset per phrase)
+    and scores emergency flags and risk tiers for the whole batch with bitwise
+    column operations. Each item gets exactly what `analyze_symptoms` returns.
+    """
+    rules = _active_rules
+    contexts = [TriageContext(symptom_text, rules=rules) for symptom_text, _ in items]
+
+    phrase_rows: dict[str, int] = {}
+    fever_104_rows = 0
+    fever_102_rows = 0
+    for row, context in enumerate(contexts):
+        bit = 1 << row
+        for phrase in context.phrase_hits:
+            phrase_rows[phrase] = phrase_rows.get(phrase, 0) | bit
+        if context.temperature_f is not None:
+            if context.temperature_f >= 104.0:
+                fever_104_rows |= bit
+            if context.temperature_f >= 102.0:
+                fever_102_rows |= bit
+
+    emergency_rows = (
+        (_rows_matching(phrase_rows, rules.emergency_phrases["chest_pain"]) & _rows_matching(phrase_rows, rules.emergency_phrases["sweating"]))
+        | _rows_matching(phrase_rows, rules.emergency_phrases["breathing"])
+        | _rows_matching(phrase_rows, rules.emergency_phrases["unconscious"])
+        | _rows_matching(phrase_rows, rules.emergency_phrases["low_oxygen"])
+        | fever_104_rows
+    )
+
+    label_rows = {label: _rows_matching(phrase_rows, phrases) for label, phrases in rules.symptom_signals}
+    high_keyword_rows = _rows_matching(label_rows, rules.high_risk_keywords)
+    medium_keyword_rows = _rows_matching(label_rows, rules.medium_risk_keywords)
+    low_keyword_rows = _rows_matching(label_rows, rules.low_risk_keywords)
+
+    # Same precedence as classify_risk: each tier only claims rows that no
+    # earlier rule has decided yet.
+    high_rows = emergency_rows | fever_104_rows
+    decided_rows = high_rows
+    medium_rows = fever_102_rows & ~decided_rows
+    decided_rows |= fever_102_rows
+    high_rows |= high_keyword_rows & ~decided_rows
+    decided_rows |= high_keyword_rows
+    medium_rows |= medium_keyword_rows & ~decided_rows
+    decided_rows |= medium_keyword_rows | low_keyword_rows
+    medium_rows |= _rows_matching(phrase_rows, rules.general_risk_phrases) & ~decided_rows
+
+    results: list[dict[str, object]] = []
+    for row, (context, (_, language)) in enumerate(zip(contexts, items)):
+        emergency_flag = bool(emergency_rows >> row & 1)
+        if high_rows >> row & 1:
+            risk_level = "HIGH"
+        elif medium_rows >> row & 1:
+            risk_level = "MEDIUM"
+        else:
+            risk_level = "LOW"
+        detected_symptoms = list(context.detected_symptoms)
+        results.append(
+            {
+                "risk_level": risk_level,
+                "emergency_flag": emergency_flag,
+                "advisory_message": advisory_for_risk(risk_level, emergency_flag, context, detected_symptoms, language),
+                "disclaimer": HINDI_MEDICAL_DISCLAIMER if language == "hi" else MEDICAL_DISCLAIMER,
+                "detected_symptoms": detected_symptoms,
+            }
+        )
+    return results
@@ -1,17 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import asyncio
-import base64
-import json
+import hashlib
 import os
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+import random
+import time
+from uuid import uuid4
 
-from sqlalchemy import select
+import httpx
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.models_enterprise import WhatsAppLog
+from db.database import AsyncSessionLocal
+from db.models_enterprise import WhatsAppLog, WhatsAppOutbox
 from services import hospital_service
+from services.messaging_providers import PLIVO, TEXTBELT, TWILIO, get_provider_stats
+from services.rate_limiter import BucketSpec, TokenBucketLimiter
+from services.whatsapp_webhooks import FAILURE_STATUSES, status_callback_url
 
 
 FINAL_DELIVERY_STATUSES = {
@@ -61,263 +65,664 @@ def _plivo_configured() -> bool:
     )
 
 
-def _send_via_textbelt(phone_number: str, message_summary: str) -> tuple[str, str | None]:
+def _json_body(response: httpx.Response) -> dict[str, object]:
+    try:
+        parsed = response.json() if response.content else {}
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _retryable_http(status_code: int) -> bool:
+    # Timeouts, throttling and provider-side 5xx are worth another try;
+    # rejected numbers and other 4xx answers are not.
+    return status_code in {408, 429} or status_code >= 500
+
+
+async def _send_via_textbelt(phone_number: str, message_summary: str) -> tuple[str, str | None, bool]:
     to_phone = _normalize_phone(phone_number)
     if len(to_phone) < 10:
-        return "failed", "invalid-phone"
+        return "failed", "invalid-phone", False
 
     api_key = os.getenv("TEXTBELT_API_KEY", "").strip()
-    endpoint = "https://textbelt.com/text"
-    payload = urlencode(
-        {
-            "phone": to_phone,
-            "message": message_summary,
-            "key": api_key,
-        }
-    ).encode("utf-8")
-
-    request = Request(
-        endpoint,
-        data=payload,
-        method="POST",
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-        },
-    )
-
     try:
-        with urlopen(request, timeout=12) as response:
-            body = response.read().decode("utf-8")
-        parsed = json.loads(body) if body else {}
-        if bool(parsed.get("success")):
-            text_id = parsed.get("textId")
-            return "sms-sent", f"textbelt:{text_id}" if text_id else "textbelt:accepted"
-
-        error_message = parsed.get("error")
-        if isinstance(error_message, str) and error_message.strip():
-            return "failed", error_message.strip()
-        return "failed", "textbelt-failed"
-    except HTTPError as error:
-        return "failed", f"textbelt-http-{error.code}"
-    except Exception:
-        return "failed", "textbelt-request-failed"
-
-
-def _send_via_plivo(phone_number: str, message_summary: str) -> tuple[str, str | None]:
+        response = await TEXTBELT.request(
+            "POST",
+            "/text",
+            data={
+                "phone": to_phone,
+                "message": message_summary,
+                "key": api_key,
+            },
+            timeout=12,
+        )
+    except httpx.HTTPError:
+        return "failed", "textbelt-request-failed", True
+    if response.status_code >= 400:
+        return "failed", f"textbelt-http-{response.status_code}", _retryable_http(response.status_code)
+
+    parsed = _json_body(response)
+    if bool(parsed.get("success")):
+        text_id = parsed.get("textId")
+        return "sms-sent", f"textbelt:{text_id}" if text_id else "textbelt:accepted", False
+
+    error_message = parsed.get("error")
+    if isinstance(error_message, str) and error_message.strip():
+        return "failed", error_message.strip(), False
+    return "failed", "textbelt-failed", False
+
+
+async def _send_via_plivo(phone_number: str, message_summary: str) -> tuple[str, str | None, bool]:
     to_phone = _normalize_phone(phone_number)
     if len(to_phone) < 10:
-        return "failed", "invalid-phone"
+        return "failed", "invalid-phone", False
 
     auth_id = os.getenv("PLIVO_AUTH_ID", "").strip()
-    auth_token = os.getenv("PLIVO_AUTH_TOKEN", "").strip()
     src = os.getenv("PLIVO_SRC", "").strip()
-
-    endpoint = f"https://api.plivo.com/v1/Account/{auth_id}/Message/"
-    payload = json.dumps(
-        {
-            "src": src,
-            "dst": to_phone,
-            "text": message_summary,
-        }
-    ).encode("utf-8")
-
-    auth_raw = f"{auth_id}:{auth_token}".encode("utf-8")
-    auth_header = base64.b64encode(auth_raw).decode("utf-8")
-
-    request = Request(
-        endpoint,
-        data=payload,
-        method="POST",
-        headers={
-            "Authorization": f"Basic {auth_header}",
-            "Content-Type": "application/json",
-        },
-    )
+    fields = {
+        "src": src,
+        "dst": to_phone,
+        "text": message_summary,
+    }
+    callback_url = status_callback_url("plivo")
+    if callback_url:
+        fields.update(url=callback_url, method="POST")
 
     try:
-        with urlopen(request, timeout=12) as response:
-            body = response.read().decode("utf-8")
-        parsed = json.loads(body) if body else {}
+        response = await PLIVO.request("POST", f"/v1/Account/{auth_id}/Message/", json=fields, timeout=12)
+    except httpx.HTTPError:
+        return "failed", "plivo-request-failed", True
 
-        message_uuids = parsed.get("message_uuid")
-        if isinstance(message_uuids, list) and message_uuids:
-            return "sms-sent", f"plivo:{message_uuids[0]}"
+    parsed = _json_body(response)
+    if response.status_code >= 400:
+        detail = parsed.get("error")
+        if isinstance(detail, str) and detail.strip():
+            return "failed", detail.strip(), _retryable_http(response.status_code)
+        return "failed", f"plivo-http-{response.status_code}", _retryable_http(response.status_code)
 
-        api_id = parsed.get("api_id")
-        if isinstance(api_id, str) and api_id.strip():
-            return "sms-sent", f"plivo:{api_id.strip()}"
+    message_uuids = parsed.get("message_uuid")
+    if isinstance(message_uuids, list) and message_uuids:
+        return "sms-sent", f"plivo:{message_uuids[0]}", False
 
-        return "sms-sent", "plivo:accepted"
-    except HTTPError as error:
-        try:
-            error_body = error.read().decode("utf-8")
-            parsed_error = json.loads(error_body)
-            detail = parsed_error.get("error")
-            if isinstance(detail, str) and detail.strip():
-                return "failed", detail.strip()
-        except Exception:
-            pass
-        return "failed", f"plivo-http-{error.code}"
-    except Exception:
-        return "failed", "plivo-request-failed"
-
-
-def _send_via_twilio(phone_number: str, message_summary: str) -> tuple[str, str | None]:
+    api_id = parsed.get("api_id")
+    if isinstance(api_id, str) and api_id.strip():
+        return "sms-sent", f"plivo:{api_id.strip()}", False
+
+    return "sms-sent", "plivo:accepted", False
+
+
+async def _send_via_twilio(phone_number: str, message_summary: str) -> tuple[str, str | None, bool]:
     account_sid = os.getenv("TWILIO_ACCOUNT_SID", "")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN", "")
     whatsapp_from = os.getenv("TWILIO_WHATSAPP_FROM", "")
 
     to_phone = _normalize_phone(phone_number)
     if len(to_phone) < 10:
-        return "failed", "invalid-phone"
-
-    endpoint = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json"
-    payload = urlencode(
-        {
-            "To": f"whatsapp:{to_phone}",
-            "From": whatsapp_from,
-            "Body": message_summary,
-        }
-    ).encode("utf-8")
-
-    auth_raw = f"{account_sid}:{auth_token}".encode("utf-8")
-    auth_header = base64.b64encode(auth_raw).decode("utf-8")
-
-    request = Request(
-        endpoint,
-        data=payload,
-        method="POST",
-        headers={
-            "Authorization": f"Basic {auth_header}",
-            "Content-Type": "application/x-www-form-urlencoded",
-        },
-    )
+        return "failed", "invalid-phone", False
+
+    fields = {
+        "To": f"whatsapp:{to_phone}",
+        "From": whatsapp_from,
+        "Body": message_summary,
+    }
+    callback_url = status_callback_url("twilio")
+    if callback_url:
+        fields["StatusCallback"] = callback_url
 
     try:
-        with urlopen(request, timeout=12) as response:
-            body = response.read().decode("utf-8")
-        parsed = json.loads(body) if body else {}
-        return str(parsed.get("status") or "queued"), str(parsed.get("sid") or "")
-    except HTTPError as error:
-        try:
-            error_body = error.read().decode("utf-8")
-            parsed_error = json.loads(error_body)
-            message = parsed_error.get("message")
-            if isinstance(message, str) and message.strip():
-                return "failed", message.strip()
-        except Exception:
-            pass
-        return "failed", f"twilio-http-{error.code}"
-    except Exception:
-        return "failed", "twilio-request-failed"
-
-
-def _fetch_twilio_message_status(message_sid: str) -> tuple[str | None, str | None]:
-    account_sid = os.getenv("TWILIO_ACCOUNT_SID", "")
-    auth_token = os.getenv("TWILIO_AUTH_TOKEN", "")
-    if not account_sid or not auth_token:
-        return None, "twilio-provider-not-configured"
+        response = await TWILIO.request("POST", f"/2010-04-01/Accounts/{account_sid}/Messages.json", data=fields, timeout=12)
+    except httpx.HTTPError:
+        return "failed", "twilio-request-failed", True
+
+    parsed = _json_body(response)
+    if response.status_code >= 400:
+        message = parsed.get("message")
+        if isinstance(message, str) and message.strip():
+            return "failed", message.strip(), _retryable_http(response.status_code)
+        return "failed", f"twilio-http-{response.status_code}", _retryable_http(response.status_code)
+    return str(parsed.get("status") or "queued"), str(parsed.get("sid") or ""), False
+
+
+def _twilio_status_update(message: dict[str, object]) -> tuple[str, str | None]:
+    status = message.get("status")
+    error_code = message.get("error_code")
+    error_message = message.get("error_message")
+
+    if error_code:
+        status = str(status or "failed")
+        # Twilio can report an error code on messages it is still retrying;
+        # those keep their SID so later reconciles and webhooks still match.
+        if status not in FAILURE_STATUSES:
+            return status, None
+        if isinstance(error_message, str) and error_message.strip():
+            return status, error_message.strip()
+        return status, f"twilio-error-{error_code}"
 
-    endpoint = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages/{message_sid}.json"
-    auth_raw = f"{account_sid}:{auth_token}".encode("utf-8")
-    auth_header = base64.b64encode(auth_raw).decode("utf-8")
+    return str(status or "queued"), None
 
-    request = Request(
-        endpoint,
-        method="GET",
-        headers={
-            "Authorization": f"Basic {auth_header}",
-        },
-    )
+
+async def _fetch_twilio_message_status(message_sid: str) -> tuple[str | None, str | None]:
+    account_sid, auth_token = TWILIO.credentials()
+    if not account_sid or not auth_token:
+        return None, "twilio-provider-not-configured"
 
     try:
-        with urlopen(request, timeout=12) as response:
-            body = response.read().decode("utf-8")
-        parsed = json.loads(body) if body else {}
-
-        status = parsed.get("status")
-        error_code = parsed.get("error_code")
-        error_message = parsed.get("error_message")
-
-        if error_code:
-            if isinstance(error_message, str) and error_message.strip():
-                return str(status or "failed"), error_message.strip()
-            return str(status or "failed"), f"twilio-error-{error_code}"
-
-        return str(status or "queued"), None
-    except HTTPError as error:
-        return None, f"twilio-http-{error.code}"
-    except Exception:
+        response = await TWILIO.request("GET", f"/2010-04-01/Accounts/{account_sid}/Messages/{message_sid}.json", timeout=12)
+    except httpx.HTTPError:
         return None, "twilio-request-failed"
+    if response.status_code >= 400:
+        return None, f"twilio-http-{response.status_code}"
+    try:
+        parsed = response.json() if response.content else {}
+    except ValueError:
+        return None, "twilio-request-failed"
+    return _twilio_status_update(parsed)
+
+
+async def _list_twilio_messages(date_sent: date, max_pages: int) -> dict[str, dict[str, object]]:
+    """Messages sent on one UTC day from our sender, keyed by SID (one list call per 1000 messages)."""
+    account_sid, _ = TWILIO.credentials()
+    path = f"/2010-04-01/Accounts/{account_sid}/Messages.json"
+    params: dict[str, object] | None = {"DateSent": date_sent.isoformat(), "PageSize": 1000}
+    whatsapp_from = os.getenv("TWILIO_WHATSAPP_FROM", "").strip()
+    if whatsapp_from:
+        params["From"] = whatsapp_from
+
+    messages: dict[str, dict[str, object]] = {}
+    for _ in range(max_pages):
+        response = await TWILIO.request("GET", path, params=params, timeout=20)
+        response.raise_for_status()
+        payload = response.json()
+        for message in payload.get("messages") or []:
+            messages[str(message.get("sid"))] = message
+        next_page_uri = payload.get("next_page_uri")
+        if not next_page_uri:
+            break
+        path, params = str(next_page_uri), None
+    return messages
+
+
+def _active_provider() -> str | None:
+    if _twilio_configured():
+        return "twilio"
+    if _plivo_configured():
+        return "plivo"
+    if _textbelt_configured():
+        return "textbelt"
+    return None
+
+
+# Default sends per second per sender; override with <PROVIDER>_SEND_RATE_PER_SECOND,
+# <PROVIDER>_SEND_BURST and <PROVIDER>_SEND_DAILY_LIMIT (0 = no daily cap).
+PROVIDER_DEFAULT_RATES = {"twilio": 10.0, "plivo": 5.0, "textbelt": 1.0}
+
+SEND_RATE_LIMITER = TokenBucketLimiter(
+    "ratelimit:send",
+    store=os.getenv("SEND_RATE_LIMIT_STORE", "redis").strip().lower(),
+    local_share=int(os.getenv("WEB_CONCURRENCY", "1")),
+)
+
+
+def _provider_sender(provider: str) -> str:
+    if provider == "twilio":
+        return os.getenv("TWILIO_WHATSAPP_FROM", "").strip()
+    if provider == "plivo":
+        return os.getenv("PLIVO_SRC", "").strip()
+    # Textbelt limits by API key; keep the key itself out of the store.
+    api_key = os.getenv("TEXTBELT_API_KEY", "").strip()
+    return "key-" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def _provider_send_limits(provider: str) -> tuple[BucketSpec, ...]:
+    prefix = provider.upper()
+    per_second = float(os.getenv(f"{prefix}_SEND_RATE_PER_SECOND", str(PROVIDER_DEFAULT_RATES[provider])))
+    burst = float(os.getenv(f"{prefix}_SEND_BURST", str(max(1.0, per_second))))
+    daily = float(os.getenv(f"{prefix}_SEND_DAILY_LIMIT", "0"))
+    specs = []
+    if per_second > 0:
+        specs.append(BucketSpec("second", per_second, max(1.0, burst)))
+    if daily > 0:
+        specs.append(BucketSpec("day", daily / 86400, daily))
+    return tuple(specs)
+
+
+async def get_rate_limit_levels() -> dict[str, object]:
+    return {**SEND_RATE_LIMITER.stats(), "buckets": await SEND_RATE_LIMITER.levels()}
+
+
+async def _deliver(phone_number: str, message_summary: str) -> tuple[str, str | None, bool]:
+    """
+    Send through the first configured provider; returns (delivery_status,
+    provider_reference, retryable). `retryable` marks failures worth another
+    attempt (transport errors, 408/429/5xx), whatever text the provider sent.
+    """
+    provider = _active_provider()
+    if provider == "twilio":
+        return await _send_via_twilio(phone_number, message_summary)
+    if provider == "plivo":
+        return await _send_via_plivo(phone_number, message_summary)
+    if provider == "textbelt":
+        return await _send_via_textbelt(phone_number, message_summary)
+
+    mock_enabled = os.getenv("WHATSAPP_ENABLE_MOCK", "false").strip().lower() == "true"
+    if mock_enabled:
+        delivery_status = "mock-delivered" if len(_normalize_phone(phone_number)) >= 10 else "failed"
+        return delivery_status, f"mock-wa-{int(datetime.utcnow().timestamp())}", False
+    return "normal-message", "normal-message-fallback", False
 
 
 async def send_summary(db: AsyncSession, *, user_id: int | None, phone_number: str, message_summary: str) -> WhatsAppLog:
-    normalized_phone = phone_number.strip()
-    delivery_status = "failed"
-    provider_reference: str | None = None
-
-    if _twilio_configured():
-        twilio_status, twilio_reference = await asyncio.to_thread(_send_via_twilio, normalized_phone, message_summary)
-        delivery_status = twilio_status
-        provider_reference = twilio_reference
-    elif _plivo_configured():
-        plivo_status, plivo_reference = await asyncio.to_thread(_send_via_plivo, normalized_phone, message_summary)
-        delivery_status = plivo_status
-        provider_reference = plivo_reference
-    elif _textbelt_configured():
-        sms_status, sms_reference = await asyncio.to_thread(_send_via_textbelt, normalized_phone, message_summary)
-        delivery_status = sms_status
-        provider_reference = sms_reference
-    else:
-        mock_enabled = os.getenv("WHATSAPP_ENABLE_MOCK", "false").strip().lower() == "true"
-        if mock_enabled:
-            delivery_status = "mock-delivered" if len(_normalize_phone(normalized_phone)) >= 10 else "failed"
-            provider_reference = f"mock-wa-{int(datetime.utcnow().timestamp())}"
-        else:
-            delivery_status = "normal-message"
-            provider_reference = "normal-message-fallback"
+    """
+    Queue a message for delivery and return its log row (status `queued`).
 
+    The log and its outbox row are written in one transaction; the outbox
+    workers send it and update the log with the provider's answer.
+    """
     log = WhatsAppLog(
         user_id=user_id,
-        phone_number=normalized_phone,
+        phone_number=phone_number.strip(),
         message_summary=message_summary,
-        delivery_status=delivery_status,
-        provider_reference=provider_reference,
+        delivery_status="queued",
+        provider_reference=None,
     )
     db.add(log)
+    await db.flush()
+    db.add(WhatsAppOutbox(log_id=log.id))
     await db.commit()
     await db.refresh(log)
+    if _outbox_pool is not None:
+        _outbox_pool.wake()
     return log
 
 
+# Outbox rows in these states are done; anything else is still to be sent.
+OUTBOX_FINAL_STATUSES = {"sent", "failed"}
+
+
+class OutboxWorkerPool:
+    """
+    Async workers draining the whatsapp_outbox table.
+
+    A dispatcher claims due rows (status `queued`, `next_attempt_at` reached)
+    by stamping them `sending` with a claim token, so several processes can
+    share one outbox without sending a row twice. It never claims more rows
+    than there are free workers. Transient provider failures are retried
+    with exponential backoff and jitter up to `max_attempts`.
+
+    Before each provider call the worker takes a token from the provider's
+    per-sender buckets (SEND_RATE_LIMITER). Short waits are absorbed in
+    place; when the next token is further off than `rate_limit_max_wait`
+    (e.g. a daily cap is spent) the row is deferred until then, without
+    counting as an attempt.
+
+    Crash recovery: a row left `sending` for longer than `lease_seconds`
+    (its worker died mid-send) is queued again. Delivery is therefore
+    at-least-once; a provider that accepted the message just before the
+    crash may receive it twice.
+    """
+
+    def __init__(
+        self,
+        worker_count: int,
+        poll_seconds: float = 2.0,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 5.0,
+        retry_max_seconds: float = 300.0,
+        lease_seconds: float = 300.0,
+        rate_limit_max_wait: float = 5.0,
+    ) -> None:
+        self.worker_count = max(1, worker_count)
+        self.poll_seconds = poll_seconds
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.lease_seconds = lease_seconds
+        self.rate_limit_max_wait = rate_limit_max_wait
+        self._queue: asyncio.Queue[tuple[int, int, int, str, str]] = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._busy = 0
+        self._last_recovery = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+        self.deferred = 0
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        global _outbox_pool
+        await self.recover_expired_leases()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+        _outbox_pool = self
+        print(f"[startup] WhatsApp outbox started with {self.worker_count} workers")
+
+    async def stop(self) -> None:
+        global _outbox_pool
+        if _outbox_pool is self:
+            _outbox_pool = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Claimed rows no worker picked up yet go straight back to the queue;
+        # rows that were mid-send are left to lease recovery.
+        unsent = [self._queue.get_nowait()[0] for _ in range(self._queue.qsize())]
+        if unsent:
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    await session.execute(
+                        update(WhatsAppOutbox)
+                        .where(WhatsAppOutbox.id.in_(unsent), WhatsAppOutbox.status == "sending")
+                        .values(status="queued", claim_token=None, locked_at=None)
+                    )
+
+    async def recover_expired_leases(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(WhatsAppOutbox)
+                    .where(WhatsAppOutbox.status == "sending", WhatsAppOutbox.locked_at < cutoff)
+                    .values(status="queued", claim_token=None, locked_at=None, updated_at=datetime.utcnow())
+                )
+        self._last_recovery = time.monotonic()
+        if result.rowcount:
+            self.recovered += result.rowcount
+            print(f"[whatsapp] Re-queued {result.rowcount} outbox messages with expired leases")
+        return result.rowcount
+
+    async def _claim(self, limit: int) -> list[tuple[int, int, int, str, str]]:
+        token = uuid4().hex
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                due = (
+                    await session.scalars(
+                        select(WhatsAppOutbox.id)
+                        .where(WhatsAppOutbox.status == "queued", WhatsAppOutbox.next_attempt_at <= now)
+                        .order_by(WhatsAppOutbox.next_attempt_at, WhatsAppOutbox.id)
+                        .limit(limit)
+                    )
+                ).all()
+                if not due:
+                    return []
+                # Another process may have claimed some of these in between;
+                # the status check makes the claim exclusive.
+                await session.execute(
+                    update(WhatsAppOutbox)
+                    .where(WhatsAppOutbox.id.in_(due), WhatsAppOutbox.status == "queued")
+                    .values(status="sending", claim_token=token, locked_at=now, updated_at=now)
+                )
+            rows = await session.execute(
+                select(
+                    WhatsAppOutbox.id,
+                    WhatsAppOutbox.attempts,
+                    WhatsAppLog.id,
+                    WhatsAppLog.phone_number,
+                    WhatsAppLog.message_summary,
+                )
+                .join(WhatsAppLog, WhatsAppOutbox.log_id == WhatsAppLog.id)
+                .where(WhatsAppOutbox.claim_token == token)
+                .order_by(WhatsAppOutbox.id)
+            )
+            return [tuple(row) for row in rows]
+
+    async def _dispatch(self) -> None:
+        while True:
+            # Cleared before polling so a wake-up arriving mid-claim is not lost.
+            self._wakeup.clear()
+            claimed: list[tuple[int, int, int, str, str]] = []
+            free = self.worker_count - self._busy - self._queue.qsize()
+            try:
+                if time.monotonic() - self._last_recovery >= self.lease_seconds / 2:
+                    await self.recover_expired_leases()
+                if free > 0:
+                    claimed = await self._claim(min(free, self.batch_size))
+            except Exception as exc:
+                print(f"[whatsapp] Outbox poll failed: {exc}")
+            for item in claimed:
+                self._queue.put_nowait(item)
+            if len(claimed) == self.batch_size and free > self.batch_size:
+                continue  # more rows are probably due and workers are free
+            # Woken by new messages and by workers finishing; the timeout picks
+            # up retries coming due and rows queued by other processes.
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except TimeoutError:
+                pass
+
+    async def _work(self) -> None:
+        while True:
+            item = await self._queue.get()
+            self._busy += 1
+            try:
+                await self._send(*item)
+            except Exception as exc:
+                # The row stays `sending` and is retried once its lease expires.
+                print(f"[whatsapp] Outbox message {item[0]} not recorded: {exc}")
+            finally:
+                self._busy -= 1
+                self._queue.task_done()
+                self.wake()
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _defer(self, outbox_id: int, delay_seconds: float) -> None:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await session.execute(
+                    update(WhatsAppOutbox)
+                    .where(WhatsAppOutbox.id == outbox_id)
+                    .values(
+                        status="queued",
+                        next_attempt_at=now + timedelta(seconds=delay_seconds),
+                        claim_token=None,
+                        locked_at=None,
+                        last_error="rate-limited",
+                        updated_at=now,
+                    )
+                )
+        self.deferred += 1
+
+    async def _send(self, outbox_id: int, attempts: int, log_id: int, phone_number: str, message_summary: str) -> None:
+        provider = _active_provider()
+        if provider is not None:
+            wait = await SEND_RATE_LIMITER.acquire(
+                f"{provider}:{_provider_sender(provider)}",
+                _provider_send_limits(provider),
+                self.rate_limit_max_wait,
+            )
+            if wait > 0:
+                await self._defer(outbox_id, wait)
+                return
+
+        delivery_status, provider_reference, retryable = await _deliver(phone_number, message_summary)
+        attempts += 1
+        now = datetime.utcnow()
+        retry = delivery_status == "failed" and retryable and attempts < self.max_attempts
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                outbox = await session.get(WhatsAppOutbox, outbox_id)
+                if outbox is None:
+                    return
+                outbox.attempts = attempts
+                outbox.claim_token = None
+                outbox.locked_at = None
+                outbox.updated_at = now
+                if retry:
+                    outbox.status = "queued"
+                    outbox.next_attempt_at = now + timedelta(seconds=self._retry_delay(attempts))
+                    outbox.last_error = (provider_reference or "failed")[:200]
+                else:
+                    outbox.status = "failed" if delivery_status == "failed" else "sent"
+                    outbox.last_error = (provider_reference or "failed")[:200] if delivery_status == "failed" else None
+                    log = await session.get(WhatsAppLog, log_id)
+                    if log is not None:
+                        log.delivery_status = delivery_status
+                        log.provider_reference = provider_reference
+
+        if retry:
+            self.retried += 1
+        elif delivery_status == "failed":
+            self.failed += 1
+        else:
+            self.sent += 1
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "workers": self.worker_count,
+            "busy": self._busy,
+            "claimed_waiting": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "recovered": self.recovered,
+            "deferred": self.deferred,
+        }
+
+
+# The running pool, if this process drains the outbox; send_summary wakes it.
+_outbox_pool: OutboxWorkerPool | None = None
+
+
+async def get_outbox_stats(db: AsyncSession) -> dict[str, object]:
+    rows = await db.execute(select(WhatsAppOutbox.status, func.count()).group_by(WhatsAppOutbox.status))
+    statuses = {status: count for status, count in rows}
+    return {
+        "statuses": statuses,
+        "backlog": sum(count for status, count in statuses.items() if status not in OUTBOX_FINAL_STATUSES),
+        "pool": _outbox_pool.stats() if _outbox_pool is not None else None,
+        "reconciler": dict(_reconciler_stats),
+        "providers": get_provider_stats(),
+    }
+
+
 async def get_message_history(db: AsyncSession, limit: int = 50) -> list[WhatsAppLog]:
     rows = await db.scalars(select(WhatsAppLog).order_by(WhatsAppLog.created_at.desc()).limit(limit))
     return list(rows)
 
 
-async def refresh_delivery_status(db: AsyncSession, *, log_id: int) -> WhatsAppLog | None:
-    log = await db.get(WhatsAppLog, log_id)
-    if log is None:
-        return None
+async def get_delivery_status(db: AsyncSession, *, log_id: int) -> WhatsAppLog | None:
+    # Provider statuses are written back by the reconciler; this is a plain read.
+    return await db.get(WhatsAppLog, log_id)
 
-    current_status = (log.delivery_status or "").strip().lower()
-    if current_status in FINAL_DELIVERY_STATUSES:
-        return log
 
-    provider_reference = (log.provider_reference or "").strip()
-    is_twilio_message = provider_reference.startswith("SM") and _twilio_configured()
-    if not is_twilio_message:
-        return log
+_reconciler_stats: dict[str, object] = {
+    "runs": 0,
+    "last_run_at": None,
+    "pending": 0,
+    "list_calls": 0,
+    "single_lookups": 0,
+    "updated": 0,
+    "errors": 0,
+}
 
-    updated_status, provider_error = await asyncio.to_thread(_fetch_twilio_message_status, provider_reference)
-    if updated_status:
-        log.delivery_status = updated_status
-    if provider_error:
-        log.provider_reference = provider_error
 
-    await db.commit()
-    await db.refresh(log)
-    return log
+async def reconcile_delivery_statuses(
+    concurrency: int = 4,
+    max_age_hours: float = 72.0,
+    max_pages: int = 10,
+    max_single_lookups: int = 50,
+) -> int:
+    """
+    Bring every non-final Twilio message up to date; returns the rows changed.
+
+    Pending messages are looked up with one list call per UTC send date
+    (1000 messages a page), at most `concurrency` calls at a time. Messages
+    the lists do not cover (still queued, so no send date yet) are fetched
+    one by one, at most `max_single_lookups` per run. All changes are
+    written back in one batched UPDATE.
+    """
+    if not _twilio_configured():
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    async with AsyncSessionLocal() as session:
+        rows = (
+            await session.execute(
+                select(WhatsAppLog.id, WhatsAppLog.delivery_status, WhatsAppLog.provider_reference, WhatsAppLog.created_at).where(
+                    WhatsAppLog.delivery_status.not_in(FINAL_DELIVERY_STATUSES),
+                    WhatsAppLog.provider_reference.like("SM%"),
+                    WhatsAppLog.created_at >= cutoff,
+                )
+            )
+        ).all()
+    pending = {
+        row.provider_reference.strip(): row
+        for row in rows
+        if (row.delivery_status or "").strip().lower() not in FINAL_DELIVERY_STATUSES
+    }
+    _reconciler_stats["pending"] = len(pending)
+    if not pending:
+        return 0
+
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def list_day(day: date) -> dict[str, dict[str, object]]:
+        async with slots:
+            _reconciler_stats["list_calls"] += 1
+            try:
+                return await _list_twilio_messages(day, max_pages)
+            except Exception as exc:
+                _reconciler_stats["errors"] += 1
+                print(f"[whatsapp] Twilio list for {day} failed: {exc}")
+                return {}
+
+    statuses: dict[str, tuple[str, str | None]] = {}
+    days = sorted({row.created_at.date() for row in pending.values()})
+    for listed in await asyncio.gather(*(list_day(day) for day in days)):
+        for sid, message in listed.items():
+            if sid in pending:
+                statuses[sid] = _twilio_status_update(message)
+
+    async def lookup(sid: str) -> tuple[str, tuple[str | None, str | None]]:
+        async with slots:
+            _reconciler_stats["single_lookups"] += 1
+            return sid, await _fetch_twilio_message_status(sid)
+
+    unlisted = [sid for sid in pending if sid not in statuses][: max(0, max_single_lookups)]
+    for sid, (status, error) in await asyncio.gather(*(lookup(sid) for sid in unlisted)):
+        if status is None:
+            _reconciler_stats["errors"] += 1
+            continue
+        statuses[sid] = (status, error)
+
+    # `error` is only set for terminal failures, which leave the reconcile scan anyway.
+    changes = [
+        {"id": pending[sid].id, "delivery_status": status[:20], "provider_reference": error or sid}
+        for sid, (status, error) in statuses.items()
+        if status != pending[sid].delivery_status or error
+    ]
+    if changes:
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                # Bulk UPDATE by primary key: one executemany round trip.
+                await session.execute(update(WhatsAppLog), changes)
+    _reconciler_stats["updated"] += len(changes)
+    return len(changes)
+
+
+async def run_delivery_reconciler(interval_seconds: float, concurrency: int, max_age_hours: float) -> None:
+    while True:
+        try:
+            changed = await reconcile_delivery_statuses(concurrency=concurrency, max_age_hours=max_age_hours)
+            if changed:
+                print(f"[whatsapp] Reconciled {changed} delivery statuses")
+        except Exception as exc:
+            _reconciler_stats["errors"] += 1
+            print(f"[whatsapp] Delivery status reconcile skipped: {exc}")
+        _reconciler_stats["runs"] += 1
+        _reconciler_stats["last_run_at"] = datetime.utcnow().isoformat()
+        await asyncio.sleep(interval_seconds)
 
 
 async def send_conversation_summary(
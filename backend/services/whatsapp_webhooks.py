@@ -0,0 +1,317 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qsl
+
+from sqlalchemy import select, update
+
+from db.database import AsyncSessionLocal, engine
+from db.models_enterprise import WhatsAppLog
+
+
+WEBHOOK_PROVIDERS = ("twilio", "plivo", "textbelt")
+
+# Textbelt callbacks older than this are rejected as replays.
+TEXTBELT_MAX_SKEW_SECONDS = 15 * 60
+
+# Later callbacks can arrive first; a status never moves back down this order.
+# Terminal failures share the top rank with "read" so nothing overrides them;
+# "unknown" (Textbelt) is accepted but never applied.
+STATUS_RANK = {
+    "unknown": -1,
+    "queued": 0,
+    "accepted": 0,
+    "scheduled": 0,
+    "sending": 1,
+    "sent": 2,
+    "sms-sent": 2,
+    "delivered": 3,
+    "read": 4,
+    "failed": 4,
+    "undelivered": 4,
+    "canceled": 4,
+}
+
+
+# Only these keep the provider's error text, in place of the message reference.
+FAILURE_STATUSES = {"failed", "undelivered"}
+
+
+@dataclass
+class StatusUpdate:
+    provider_reference: str
+    delivery_status: str
+    error: str | None = None
+    first_seen: float = 0.0
+
+
+def webhook_base_url() -> str:
+    return os.getenv("WHATSAPP_WEBHOOK_BASE_URL", "").strip().rstrip("/")
+
+
+def status_callback_url(provider: str) -> str | None:
+    """Public callback URL to hand to the provider on send; None when webhooks are not configured."""
+    base_url = webhook_base_url()
+    return f"{base_url}/whatsapp/webhook/{provider}" if base_url else None
+
+
+def _signed_url(request_url: str, path: str, query: str) -> str:
+    # Providers sign the URL they called. Behind a proxy that is the public
+    # base URL, not the one the app sees.
+    base_url = webhook_base_url()
+    if not base_url:
+        return request_url
+    return f"{base_url}{path}" + (f"?{query}" if query else "")
+
+
+def _secret(name: str) -> bytes:
+    secret = os.getenv(name, "").strip()
+    if not secret:
+        raise LookupError("provider is not configured")
+    return secret.encode("utf-8")
+
+
+def _verify_twilio(url: str, headers: dict[str, str], params: list[tuple[str, str]]) -> None:
+    # HMAC-SHA1 over the URL followed by every POST parameter as name+value, sorted by name.
+    payload = url + "".join(name + value for name, value in sorted(params))
+    digest = hmac.new(_secret("TWILIO_AUTH_TOKEN"), payload.encode("utf-8"), hashlib.sha1).digest()
+    expected = base64.b64encode(digest).decode("ascii")
+    if not hmac.compare_digest(expected, headers.get("x-twilio-signature", "")):
+        raise PermissionError("invalid Twilio signature")
+
+
+def _verify_plivo(url: str, headers: dict[str, str]) -> None:
+    # Signature V2: HMAC-SHA256 over the URL without query string plus the nonce.
+    nonce = headers.get("x-plivo-signature-v2-nonce", "")
+    if not nonce:
+        raise PermissionError("missing Plivo signature nonce")
+    payload = url.split("?", 1)[0] + nonce
+    digest = hmac.new(_secret("PLIVO_AUTH_TOKEN"), payload.encode("utf-8"), hashlib.sha256).digest()
+    expected = base64.b64encode(digest).decode("ascii")
+    if not hmac.compare_digest(expected, headers.get("x-plivo-signature-v2", "")):
+        raise PermissionError("invalid Plivo signature")
+
+
+def _verify_textbelt(headers: dict[str, str], body: bytes) -> None:
+    # HMAC-SHA256 (hex) over the timestamp header followed by the raw body, keyed by the API key.
+    timestamp = headers.get("x-textbelt-timestamp", "")
+    try:
+        skew = abs(time.time() - float(timestamp))
+    except ValueError as exc:
+        raise PermissionError("missing Textbelt timestamp") from exc
+    if skew > TEXTBELT_MAX_SKEW_SECONDS:
+        raise PermissionError("stale Textbelt callback")
+    expected = hmac.new(_secret("TEXTBELT_API_KEY"), timestamp.encode("utf-8") + body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, headers.get("x-textbelt-signature", "")):
+        raise PermissionError("invalid Textbelt signature")
+
+
+def _form_or_json(body: bytes, content_type: str) -> dict[str, object]:
+    if "json" in content_type:
+        try:
+            parsed = json.loads(body or b"{}")
+        except ValueError as exc:
+            raise ValueError("callback body is not valid JSON") from exc
+        if not isinstance(parsed, dict):
+            raise ValueError("callback body must be a JSON object")
+        return parsed
+    return dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+
+
+def _error_text(provider: str, code: object, message: object) -> str | None:
+    if isinstance(message, str) and message.strip():
+        return message.strip()
+    if code not in (None, "", "0", 0):
+        return f"{provider}-error-{code}"
+    return None
+
+
+def parse_status_callback(
+    provider: str,
+    *,
+    request_url: str,
+    path: str,
+    query: str,
+    headers: dict[str, str],
+    body: bytes,
+) -> StatusUpdate:
+    """
+    Verify a provider status callback and map it onto the provider_reference
+    format stored by the send functions ("SM…", "plivo:…", "textbelt:…").
+
+    Raises LookupError for unknown or unconfigured providers, PermissionError
+    for a bad signature and ValueError for an unusable payload.
+    """
+    headers = {name.lower(): value for name, value in headers.items()}
+    content_type = headers.get("content-type", "")
+    url = _signed_url(request_url, path, query)
+
+    if provider == "twilio":
+        if "json" in content_type:
+            raise ValueError("Twilio callbacks are form encoded")
+        params = parse_qsl(body.decode("utf-8"), keep_blank_values=True)
+        _verify_twilio(url, headers, params)
+        fields = dict(params)
+        reference = str(fields.get("MessageSid") or fields.get("SmsSid") or "")
+        status = fields.get("MessageStatus") or fields.get("SmsStatus")
+        error = _error_text("twilio", fields.get("ErrorCode"), fields.get("ErrorMessage"))
+    elif provider == "plivo":
+        _verify_plivo(url, headers)
+        fields = _form_or_json(body, content_type)
+        uuid = str(fields.get("MessageUUID") or "")
+        reference = f"plivo:{uuid}" if uuid else ""
+        status = fields.get("Status")
+        error = _error_text("plivo", fields.get("ErrorCode"), None)
+    elif provider == "textbelt":
+        _verify_textbelt(headers, body)
+        fields = _form_or_json(body, content_type)
+        text_id = str(fields.get("textId") or "")
+        reference = f"textbelt:{text_id}" if text_id else ""
+        status = fields.get("status")
+        error = _error_text("textbelt", None, fields.get("error"))
+    else:
+        raise LookupError(f"unknown provider: {provider}")
+
+    delivery_status = str(status or "").strip().lower()
+    if not reference or delivery_status not in STATUS_RANK:
+        raise ValueError("callback has no message reference or an unknown status")
+    return StatusUpdate(reference, delivery_status, error if delivery_status in FAILURE_STATUSES else None)
+
+
+def _create_missing_log_indexes(sync_conn) -> None:
+    # create_all() does not add indexes to existing tables; databases created
+    # before provider_reference was indexed get the index here.
+    for index in WhatsAppLog.__table__.indexes:
+        index.create(sync_conn, checkfirst=True)
+
+
+async def ensure_log_indexes() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(_create_missing_log_indexes)
+
+
+class DeliveryStatusBuffer:
+    """
+    Coalescing write buffer for webhook status updates.
+
+    Callbacks only touch memory; every `flush_interval` seconds the buffered
+    updates (the highest-ranked one per message) are matched to WhatsAppLog
+    rows through the provider_reference index and written in one batched
+    UPDATE. A callback can beat the outbox worker that records the message's
+    reference, so unmatched updates are kept for `unmatched_ttl` seconds
+    before they are dropped.
+    """
+
+    def __init__(self, flush_interval: float = 0.25, max_pending: int = 5000, unmatched_ttl: float = 30.0) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.unmatched_ttl = unmatched_ttl
+        self._pending: dict[str, StatusUpdate] = {}
+        self._full = asyncio.Event()
+        self.received = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.applied = 0
+        self.ignored = 0
+        self.dropped = 0
+
+    def add(self, status_update: StatusUpdate) -> None:
+        self.received += 1
+        status_update.first_seen = status_update.first_seen or time.monotonic()
+        current = self._pending.get(status_update.provider_reference)
+        if current is not None:
+            self.coalesced += 1
+            if STATUS_RANK[status_update.delivery_status] < STATUS_RANK[current.delivery_status]:
+                return
+            status_update.first_seen = current.first_seen
+        self._pending[status_update.provider_reference] = status_update
+        if len(self._pending) >= self.max_pending:
+            self._full.set()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        self._full.clear()
+        try:
+            changes = await self._apply(batch)
+        except Exception:
+            # Keep the batch for the next flush; newer callbacks win.
+            for reference, status_update in batch.items():
+                self._pending.setdefault(reference, status_update)
+            raise
+
+        now = time.monotonic()
+        for reference, status_update in batch.items():
+            if now - status_update.first_seen < self.unmatched_ttl:
+                self._pending.setdefault(reference, status_update)
+            else:
+                self.dropped += 1
+        self.flushes += 1
+        self.applied += changes
+        return changes
+
+    async def _apply(self, batch: dict[str, StatusUpdate]) -> int:
+        """Write matched updates in one batched UPDATE; matched entries are removed from `batch`."""
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                rows = (
+                    await session.execute(
+                        select(WhatsAppLog.id, WhatsAppLog.provider_reference, WhatsAppLog.delivery_status).where(
+                            WhatsAppLog.provider_reference.in_(list(batch))
+                        )
+                    )
+                ).all()
+                changes = []
+                for row in rows:
+                    status_update = batch.pop(row.provider_reference)
+                    if status_update.delivery_status == row.delivery_status:
+                        continue
+                    current_rank = STATUS_RANK.get((row.delivery_status or "").strip().lower(), -1)
+                    if STATUS_RANK[status_update.delivery_status] <= current_rank:
+                        self.ignored += 1
+                        continue
+                    changes.append(
+                        {
+                            "id": row.id,
+                            "delivery_status": status_update.delivery_status,
+                            # Failures keep the provider's reason, as the send path does.
+                            "provider_reference": status_update.error or row.provider_reference,
+                        }
+                    )
+                if changes:
+                    await session.execute(update(WhatsAppLog), changes)
+        return len(changes)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as exc:
+                print(f"[whatsapp] Delivery status flush failed: {exc}")
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "pending": len(self._pending),
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "applied": self.applied,
+            "ignored_out_of_order": self.ignored,
+            "dropped_unmatched": self.dropped,
+        }
+
+
+STATUS_BUFFER = DeliveryStatusBuffer(
+    flush_interval=float(os.getenv("WHATSAPP_WEBHOOK_FLUSH_MS", "250")) / 1000,
+    max_pending=int(os.getenv("WHATSAPP_WEBHOOK_MAX_PENDING", "5000")),
+)
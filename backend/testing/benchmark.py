@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from models.schemas import EligibilityRequest  # noqa: E402
+from services import eligibility_service, hospital_service, triage_service  # noqa: E402
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+# Fixed corpora so numbers are comparable between runs and rewrites.
+TRIAGE_CORPUS: dict[str, list[str]] = {
+    "en": [
+        "fever and cough",
+        "chest pain and sweating since morning",
+        "difficulty breathing and low oxygen, spo2 is 88",
+        "mild cold and runny nose",
+        "high fever 102.5 F with severe headache",
+        "fever for 3 days, temperature 39 c",
+        "vomiting and nausea after lunch",
+        "sore throat and tired",
+        "my father fainted and is unconscious",
+        "I have a headache",
+        "temperature 101 degrees with body ache",
+        "nothing specific, just feeling off",
+    ],
+    "hi": [
+        "बुखार",
+        "सीने में दर्द और ठंडा पसीना",
+        "सांस लेने में तकलीफ",
+        "तेज बुखार और सिरदर्द",
+        "उल्टी और मतली",
+        "जुकाम और गले में दर्द",
+        "बेहोश हो गए",
+        "ऑक्सीजन कम है",
+        "खांसी और कमजोरी",
+        "बुखार 103",
+    ],
+    "mixed": [
+        "fever 104 f aur सिरदर्द",
+        "chest pain और पसीना",
+        "बुखार since 3 days, cough bhi hai",
+        "spo2 low, सांस फूलना",
+        "vomiting और कमजोरी",
+        "cold, जुकाम, runny nose",
+        "बच्चे को fever 38.5 c",
+        "headache और उल्टी",
+    ],
+}
+
+ELIGIBILITY_CORPUS: list[dict[str, object]] = [
+    {"income": 180000, "age": 62, "bpl_card": True, "state": "Karnataka", "rural_resident": True},
+    {"income": 950000, "age": 35, "state": "Maharashtra"},
+    {"income": 450000, "age": 28, "state": "Tamil Nadu", "is_pregnant": True, "family_size": 4},
+    {"income": 700000, "age": 74, "state": "UP", "has_chronic_illness": True, "annual_hospital_visits": 4},
+    {"income": 300000, "age": 12, "state": "Kerala", "family_size": 6},
+    {"income": 520000, "age": 45, "state": "AP", "has_disability": True, "has_government_id": False},
+    {"income": 120000, "age": 66, "bpl_card": True, "state": "Odisha", "rural_resident": True},
+    {"income": 820000, "age": 30, "state": "Delhi", "is_pregnant": True},
+]
+
+HOSPITAL_CITIES = ["Bengaluru", "Mumbai", "Delhi", "Nagpur", "Pune", "Hyderabad", "Indore", "Patna"]
+CITY_CENTRES: dict[str, tuple[float, float]] = {
+    "Bengaluru": (12.9716, 77.5946),
+    "Mumbai": (19.0760, 72.8777),
+    "Delhi": (28.6139, 77.2090),
+    "Nagpur": (21.1458, 79.0882),
+    "Pune": (18.5204, 73.8567),
+    "Hyderabad": (17.3850, 78.4867),
+    "Indore": (22.7196, 75.8577),
+    "Patna": (25.5941, 85.1376),
+}
+# Query points a few km off each centre, as a caller on the edge of town would send.
+NEAREST_QUERIES = [(latitude + 0.03, longitude - 0.02) for latitude, longitude in CITY_CENTRES.values()]
+
+
+async def _stub_fetch_hospitals_from_osm(query_text: str, government: bool, scheme_supported: bool) -> list[dict[str, object]]:
+    # Network stub: a fixed, realistic-size payload so only our own code is timed.
+    city = query_text.rsplit(" in ", 1)[-1]
+    kind = "Government" if government else "Private"
+    latitude, longitude = CITY_CENTRES.get(city, (20.0, 78.0))
+    offset = 0.0 if government else 0.005
+    return [
+        {
+            "hospital_name": f"{kind} Hospital {index}, {city}",
+            "government": government,
+            "scheme_supported": scheme_supported,
+            "contact_number": "Not listed",
+            "latitude": round(latitude + offset + 0.01 * index, 6),
+            "longitude": round(longitude - offset - 0.008 * index, 6),
+        }
+        for index in range(8)
+    ]
+
+
+def _summarize(name: str, round_seconds: list[float], calls_per_round: int) -> dict[str, object]:
+    per_call_us = [seconds / calls_per_round * 1_000_000 for seconds in round_seconds]
+    return {
+        "name": name,
+        "rounds": len(round_seconds),
+        "calls_per_round": calls_per_round,
+        "min_us": round(min(per_call_us), 3),
+        "median_us": round(statistics.median(per_call_us), 3),
+        "mean_us": round(statistics.fmean(per_call_us), 3),
+        "stddev_us": round(statistics.pstdev(per_call_us), 3),
+        "ops_per_second": round(1_000_000 / statistics.median(per_call_us), 1),
+    }
+
+
+def bench_sync(name: str, func: Callable[[object], object], inputs: list[object], rounds: int) -> dict[str, object]:
+    for item in inputs:
+        func(item)
+
+    round_seconds: list[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item in inputs:
+            func(item)
+        round_seconds.append(time.perf_counter() - started)
+    return _summarize(name, round_seconds, len(inputs))
+
+
+def bench_async(name: str, func: Callable[[object], Awaitable[object]], inputs: list[object], rounds: int) -> dict[str, object]:
+    async def run() -> list[float]:
+        for item in inputs:
+            await func(item)
+
+        round_seconds: list[float] = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for item in inputs:
+                await func(item)
+            round_seconds.append(time.perf_counter() - started)
+        return round_seconds
+
+    return _summarize(name, asyncio.run(run()), len(inputs))
+
+
+def run_benchmarks(rounds: int) -> list[dict[str, object]]:
+    hospital_service._fetch_hospitals_from_osm = _stub_fetch_hospitals_from_osm
+
+    results: list[dict[str, object]] = []
+
+    # Rule engine cost: keep the result cache out of the way.
+    cache_size = triage_service.TRIAGE_CACHE.max_size
+    triage_service.TRIAGE_CACHE.max_size = 0
+    triage_service.TRIAGE_CACHE.clear()
+    try:
+        for corpus_name, texts in TRIAGE_CORPUS.items():
+            language = "hi" if corpus_name == "hi" else "en"
+            results.append(
+                bench_async(
+                    f"triage.analyze_symptoms[{corpus_name}]",
+                    lambda text, language=language: triage_service.analyze_symptoms(text, language),
+                    texts,
+                    rounds,
+                )
+            )
+            results.append(
+                bench_sync(
+                    f"triage.extract_temperature_fahrenheit[{corpus_name}]",
+                    triage_service.extract_temperature_fahrenheit,
+                    texts,
+                    rounds,
+                )
+            )
+    finally:
+        triage_service.TRIAGE_CACHE.max_size = cache_size
+        triage_service.TRIAGE_CACHE.clear()
+
+    all_texts = [text for texts in TRIAGE_CORPUS.values() for text in texts]
+    results.append(bench_async("triage.analyze_symptoms[cached]", triage_service.analyze_symptoms, all_texts, rounds))
+
+    requests = [EligibilityRequest(**profile) for profile in ELIGIBILITY_CORPUS]
+    cache_size = eligibility_service.ELIGIBILITY_CACHE.max_size
+    eligibility_service.ELIGIBILITY_CACHE.max_size = 0
+    eligibility_service.ELIGIBILITY_CACHE.clear()
+    try:
+        results.append(bench_async("eligibility.check_scheme_eligibility", eligibility_service.check_scheme_eligibility, requests, rounds))
+    finally:
+        eligibility_service.ELIGIBILITY_CACHE.max_size = cache_size
+        eligibility_service.ELIGIBILITY_CACHE.clear()
+    results.append(
+        bench_async("eligibility.check_scheme_eligibility[cached]", eligibility_service.check_scheme_eligibility, requests, rounds)
+    )
+
+    osm_cache_size = hospital_service.OSM_CITY_CACHE.max_entries
+    hospital_service.OSM_CITY_CACHE.max_entries = 0
+    hospital_service.OSM_CITY_CACHE.clear()
+    try:
+        results.append(bench_async("hospital.suggest_hospitals[stubbed]", hospital_service.suggest_hospitals, HOSPITAL_CITIES, rounds))
+    finally:
+        hospital_service.OSM_CITY_CACHE.max_entries = osm_cache_size
+    results.append(bench_async("hospital.suggest_hospitals[osm-cached]", hospital_service.suggest_hospitals, HOSPITAL_CITIES, rounds))
+
+    # Same cities served from the in-memory index (no database needed here).
+    async def stub_rows() -> list[tuple[str, dict[str, object]]]:
+        return [
+            (city, entry)
+            for city in HOSPITAL_CITIES
+            for entry in [
+                *await _stub_fetch_hospitals_from_osm(f"government hospital in {city}", True, True),
+                *await _stub_fetch_hospitals_from_osm(f"private hospital in {city}", False, False),
+            ]
+        ]
+
+    hospital_service.HOSPITAL_INDEX.replace(asyncio.run(stub_rows()))
+    results.append(bench_async("hospital.suggest_hospitals[indexed]", hospital_service.suggest_hospitals, HOSPITAL_CITIES, rounds))
+    results.append(
+        bench_async(
+            "hospital.nearest_hospitals[indexed]",
+            lambda point: hospital_service.nearest_hospitals(point[0], point[1], radius_km=10.0, k=5),
+            NEAREST_QUERIES,
+            rounds,
+        )
+    )
+    return results
+
+
+def compare_with_baseline(results: list[dict[str, object]], baseline: dict[str, object], tolerance: float) -> int:
+    baseline_by_name = {entry["name"]: entry for entry in baseline.get("results", [])}
+    regressions = 0
+
+    print(f"\n{'benchmark':55} {'baseline us':>12} {'current us':>12} {'change':>9}")
+    for entry in results:
+        previous = baseline_by_name.get(entry["name"])
+        if previous is None:
+            print(f"{entry['name']:55} {'-':>12} {entry['median_us']:>12.3f} {'new':>9}")
+            continue
+        change = (entry["median_us"] - previous["median_us"]) / previous["median_us"]
+        marker = ""
+        if change > tolerance:
+            regressions += 1
+            marker = "  [REGRESSION]"
+        print(f"{entry['name']:55} {previous['median_us']:>12.3f} {entry['median_us']:>12.3f} {change:>+8.1%}{marker}")
+
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the triage, eligibility and hospital services.")
+    parser.add_argument("--rounds", type=int, default=200, help="timed rounds per benchmark (default: 200)")
+    parser.add_argument("--output", type=Path, help="write results JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed median slowdown before failing (default: 0.10)")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rounds": args.rounds,
+        "results": run_benchmarks(args.rounds),
+    }
+
+    rendered = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    else:
+        print(rendered)
+
+    if args.save_baseline:
+        args.baseline.write_text(rendered + "\n", encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        return compare_with_baseline(report["results"], baseline, args.tolerance)
+
+    print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_provider_server import FakeProviderServer  # noqa: E402
+from services import http_client, messaging_providers, whatsapp_service  # noqa: E402
+
+
+SENDERS = {
+    "twilio": whatsapp_service._send_via_twilio,
+    "plivo": whatsapp_service._send_via_plivo,
+    "textbelt": whatsapp_service._send_via_textbelt,
+}
+
+FAKE_CREDENTIALS = {
+    "TWILIO_ACCOUNT_SID": "ACfake",
+    "TWILIO_AUTH_TOKEN": "fake-token",
+    "TWILIO_WHATSAPP_FROM": "whatsapp:+14155238886",
+    "PLIVO_AUTH_ID": "MAfake",
+    "PLIVO_AUTH_TOKEN": "fake-token",
+    "PLIVO_SRC": "+14155238886",
+    "TEXTBELT_API_KEY": "fake-key",
+}
+
+
+async def bench_provider(provider: str, messages: int, concurrency: int) -> dict[str, object]:
+    send = SENDERS[provider]
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failures = 0
+
+    async def one(index: int) -> None:
+        nonlocal failures
+        async with slots:
+            started = time.perf_counter()
+            status, _, _ = await send("9876543210", f"Benchmark message {index}")
+            latencies.append(time.perf_counter() - started)
+            if status == "failed":
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(messages)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "provider": provider,
+        "messages": messages,
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "messages_per_second": round(messages / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "pool": messaging_providers.PROVIDER_CLIENTS[provider].stats(),
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, object]]:
+    if args.fresh_connections:
+        # Old behaviour: no idle connections are kept, so every send connects again.
+        http_client.HTTP_MAX_KEEPALIVE_CONNECTIONS = 0
+    server = FakeProviderServer(latency_ms=args.latency_ms)
+    await server.start()
+    os.environ.update(FAKE_CREDENTIALS)
+    for name in SENDERS:
+        os.environ[f"{name.upper()}_API_BASE"] = server.base_url
+
+    results = []
+    try:
+        for provider in SENDERS if args.provider == "all" else [args.provider]:
+            before = server.stats()
+            result = await bench_provider(provider, args.messages, args.concurrency)
+            after = server.stats()
+            result["server_connections"] = after["connections"] - before["connections"]
+            results.append(result)
+    finally:
+        await http_client.close_http_client()
+        await server.stop()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline send throughput of the messaging provider clients against a local fake API.")
+    parser.add_argument("--provider", choices=[*SENDERS, "all"], default="all")
+    parser.add_argument("--messages", type=int, default=2000, help="messages per provider (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="sends in flight (default: 32)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake provider response latency (default: 20)")
+    parser.add_argument("--fresh-connections", action="store_true", help="keep no idle connections, for comparison")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+    return 1 if any(result["failures"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+
+# Minimal HTTP/1.1 keep-alive server imitating the Twilio, Plivo and Textbelt
+# endpoints the backend calls, so provider throughput can be measured offline.
+# Point the backend at it with TWILIO_API_BASE / PLIVO_API_BASE / TEXTBELT_API_BASE.
+
+
+class FakeProviderServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0) -> None:
+        self.host = host
+        self.port = port
+        self.latency_seconds = latency_ms / 1000
+        self.connections = 0
+        self.requests = 0
+        self.unauthorized = 0
+        self.messages: dict[str, dict[str, object]] = {}
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stats(self) -> dict[str, object]:
+        return {"connections": self.connections, "requests": self.requests, "unauthorized": self.unauthorized}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+                self.requests += 1
+                if self.latency_seconds:
+                    await asyncio.sleep(self.latency_seconds)
+                status, payload = self._route(method, target, headers, body)
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _authorized(self, headers: dict[str, str]) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme != "Basic":
+            return False
+        try:
+            user, _, secret = base64.b64decode(token).decode("utf-8").partition(":")
+        except ValueError:
+            return False
+        return bool(user and secret)
+
+    def _route(self, method: str, target: str, headers: dict[str, str], body: bytes) -> tuple[int, dict[str, object]]:
+        parts = urlsplit(target)
+        path = parts.path
+        now = datetime.now(timezone.utc)
+
+        if path == "/text" and method == "POST":
+            fields = dict(parse_qsl(body.decode("utf-8")))
+            if not fields.get("key"):
+                return 200, {"success": False, "error": "Missing key"}
+            return 200, {"success": True, "textId": uuid.uuid4().hex[:12], "quotaRemaining": 100}
+
+        if path.startswith("/2010-04-01/Accounts/"):
+            if not self._authorized(headers):
+                self.unauthorized += 1
+                return 401, {"code": 20003, "message": "Authenticate", "status": 401}
+            if path.endswith("/Messages.json") and method == "POST":
+                fields = dict(parse_qsl(body.decode("utf-8")))
+                sid = "SM" + uuid.uuid4().hex
+                message = {"sid": sid, "status": "queued", "to": fields.get("To"), "date_sent": now.date().isoformat()}
+                self.messages[sid] = message
+                return 201, message
+            if path.endswith("/Messages.json") and method == "GET":
+                listed = [{**message, "status": "delivered"} for message in self.messages.values()]
+                return 200, {"messages": listed, "next_page_uri": None}
+            if "/Messages/" in path and method == "GET":
+                sid = path.rsplit("/", 1)[-1].removesuffix(".json")
+                if sid not in self.messages:
+                    return 404, {"code": 20404, "message": "Not found", "status": 404}
+                return 200, {**self.messages[sid], "status": "delivered"}
+
+        if path.startswith("/v1/Account/") and path.endswith("/Message/") and method == "POST":
+            if not self._authorized(headers):
+                self.unauthorized += 1
+                return 401, {"error": "authentication failed"}
+            return 202, {"api_id": uuid.uuid4().hex, "message": "message(s) queued", "message_uuid": [str(uuid.uuid4())]}
+
+        return 404, {"error": f"no fake route for {method} {path}"}
+
+
+async def serve(host: str, port: int, latency_ms: float) -> None:
+    server = FakeProviderServer(host, port, latency_ms)
+    await server.start()
+    print(f"Fake provider server on {server.base_url} (latency {latency_ms:.0f} ms)")
+    print(f"  export TWILIO_API_BASE={server.base_url} PLIVO_API_BASE={server.base_url} TEXTBELT_API_BASE={server.base_url}")
+    try:
+        while True:
+            await asyncio.sleep(30)
+            print(f"  {server.stats()}")
+    finally:
+        await server.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local fake Twilio/Plivo/Textbelt API for offline throughput tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.latency_ms))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,35 @@
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Tests run against a throwaway SQLite file, never the bundled healthcare_voice.db.
+# This must be set before anything imports db.database.
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{(Path(tempfile.mkdtemp(prefix='backend-tests-')) / 'test.db').as_posix()}"
+
+from db import models, models_crm, models_enterprise, models_logging  # noqa: E402,F401  (registers every table)
+from db.database import Base, engine  # noqa: E402
+
+
+def run(coro):
+    """Run a coroutine on a fresh event loop; pooled DB connections are dropped afterwards."""
+
+    async def main():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def fresh_db() -> None:
+    async def reset() -> None:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+
+    run(reset())
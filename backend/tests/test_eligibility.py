@@ -0,0 +1,171 @@
+import random
+
+import pytest
+
+from conftest import run
+from models.schemas import EligibilityRequest, EligibilitySweepRequest, SweepRange
+from services import eligibility_service
+from services.eligibility_service import check_scheme_eligibility, screen_household_columns, sweep_eligibility
+
+PMJAY = "Ayushman Bharat - PM-JAY"
+ABHA = "ABHA Health ID (Ayushman Bharat Digital Mission)"
+NPHCE = "National Programme for Health Care of Elderly (NPHCE)"
+VAYOSHRI = "Rashtriya Vayoshri Yojana (assistive support for senior citizens)"
+JSSK = "Janani Shishu Suraksha Karyakram (JSSK)"
+RBSK = "Rashtriya Bal Swasthya Karyakram (RBSK)"
+
+# Expected scheme lists and scores were recorded from the original if/else
+# implementation, before the feature-mask encoding and the payload cache.
+PROFILES = [
+    (
+        {"income": 120000, "age": 34, "bpl_card": True, "state": "Uttar Pradesh", "family_size": 6, "rural_resident": True, "annual_hospital_visits": 4},
+        95,
+        [PMJAY, ABHA, "Ayushman Bharat / State Health Assurance (Uttar Pradesh family schemes)"],
+    ),
+    (
+        {"income": 450000, "age": 72, "state": "Kerala", "family_size": 2, "has_chronic_illness": True},
+        80,
+        [
+            PMJAY,
+            ABHA,
+            NPHCE,
+            VAYOSHRI,
+            "Chronic Disease Support Programmes (state/NHM clinics)",
+            "National AIDS Control Programme (NACP) - free HIV services",
+            "Karunya Arogya Suraksha Padhathi (Kerala)",
+        ],
+    ),
+    (
+        {"income": 650000, "age": 29, "state": "Maharashtra", "family_size": 3, "is_pregnant": True},
+        40,
+        [ABHA, "Pradhan Mantri Matru Vandana Yojana (PMMVY)", JSSK],
+    ),
+    ({"income": 650000, "age": 45, "state": "Delhi", "family_size": 4}, 20, [ABHA]),
+    (
+        {"income": 1500000, "age": 40, "state": "Karnataka", "family_size": 2, "has_disability": True},
+        20,
+        [ABHA, "Disability Health Support (state/central disability-linked benefits)"],
+    ),
+    (
+        {"income": 300000, "age": 4, "state": "Tamil Nadu", "family_size": 4, "rural_resident": True, "has_government_id": False},
+        40,
+        [PMJAY, JSSK, RBSK, "Chief Minister's Comprehensive Health Insurance Scheme (Tamil Nadu)"],
+    ),
+    (
+        {"income": 200000, "age": 15, "state": "Rajasthan", "family_size": 5, "bpl_card": True},
+        85,
+        [PMJAY, ABHA, RBSK, "Rashtriya Kishor Swasthya Karyakram (RKSK)", "Mukhyamantri Chiranjeevi Health Insurance (Rajasthan)"],
+    ),
+    (
+        {"income": 900000, "age": 80, "state": "West Bengal", "family_size": 3, "annual_hospital_visits": 3},
+        30,
+        [ABHA, NPHCE],
+    ),
+    (
+        {"income": 400000, "age": 62, "state": "Odisha", "family_size": 1, "rural_resident": True},
+        40,
+        [PMJAY, ABHA, NPHCE, VAYOSHRI, "Biju Swasthya Kalyan Yojana (Odisha)"],
+    ),
+    ({"income": 500000, "age": 30, "state": "Goa", "family_size": 1}, 40, [PMJAY, ABHA]),
+    ({"income": 1500000, "age": 40, "state": "Delhi", "family_size": 2, "has_government_id": False}, 0, []),
+]
+
+STATES = ["Uttar Pradesh", "up", "Kerala", "Tamil Nadu", "Maharashtra", "Rajasthan", "Odisha", "West Bengal", "Lucknow", "Atlantis"]
+TOGGLES = ["bpl_card", "has_chronic_illness", "has_disability", "is_pregnant", "rural_resident", "has_government_id"]
+
+
+@pytest.fixture(autouse=True)
+def empty_eligibility_cache() -> None:
+    eligibility_service.ELIGIBILITY_CACHE.clear()
+
+
+def eligible_schemes(result: dict) -> list[str]:
+    return [decision["scheme_name"] for decision in result["scheme_decisions"] if decision["eligible"]]
+
+
+def random_profiles(count: int, seed: int = 7) -> list[EligibilityRequest]:
+    rng = random.Random(seed)
+    # Values sit on both sides of every income and age threshold the rules use.
+    return [
+        EligibilityRequest(
+            income=rng.choice([0, 250000, 500000, 500001, 800000, 800001, 2000000]),
+            age=rng.choice([0, 5, 6, 10, 18, 19, 20, 59, 60, 69, 70, 90]),
+            state=rng.choice(STATES),
+            family_size=rng.choice([1, 3, 4, 5, 9]),
+            annual_hospital_visits=rng.choice([0, 2, 3]),
+            **{toggle: rng.random() < 0.4 for toggle in TOGGLES},
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("profile, score, schemes", PROFILES)
+def test_profile_table(profile: dict, score: int, schemes: list[str]) -> None:
+    result = run(check_scheme_eligibility(EligibilityRequest(**profile)))
+
+    assert result["score"] == score
+    assert result["eligible"] is bool(schemes)
+    assert eligible_schemes(result) == schemes
+    assert result["benefits"]["scheme_name"] == (schemes[0] if schemes else eligibility_service.NO_SCHEME_MATCHED)
+
+
+def test_screen_household_columns_matches_scalar_rows() -> None:
+    profiles = random_profiles(400)
+    columns = {name: [getattr(profile, name) for profile in profiles] for name in EligibilityRequest.model_fields}
+
+    async def scalar() -> list[dict]:
+        return [await check_scheme_eligibility(profile) for profile in profiles]
+
+    assert screen_household_columns(columns) == run(scalar())
+
+
+@pytest.mark.parametrize("base", random_profiles(6, seed=11), ids=lambda base: f"{base.state}-{base.age}")
+def test_sweep_grid_matches_scalar_points(base: EligibilityRequest) -> None:
+    request = EligibilitySweepRequest(
+        base=base,
+        income=SweepRange(start=400000, stop=900000, step=100000),
+        age=SweepRange(start=0, stop=80, step=10),
+        toggles=["bpl_card", "is_pregnant", "rural_resident"],
+        include_grid=True,
+    )
+
+    sweep = sweep_eligibility(request)
+
+    async def scalar() -> list[dict]:
+        return [await check_scheme_eligibility(base.model_copy(update=point["values"])) for point in sweep["grid"]]
+
+    expected = run(scalar())
+    assert len(sweep["grid"]) == sweep["grid_size"]
+    for point, result in zip(sweep["grid"], expected):
+        assert (point["eligible"], point["score"], point["eligible_schemes"]) == (
+            result["eligible"],
+            result["score"],
+            eligible_schemes(result),
+        ), point["values"]
+
+    at_base = run(check_scheme_eligibility(base))
+    assert (sweep["eligible_at_base"], sweep["score_at_base"]) == (at_base["eligible"], at_base["score"])
+    assert [scheme["eligible_at_base"] for scheme in sweep["schemes"]] == [
+        decision["eligible"] for decision in at_base["scheme_decisions"]
+    ]
+
+
+def test_cache_hit_is_not_affected_by_caller_mutation() -> None:
+    profile = EligibilityRequest(**PROFILES[0][0])
+    hits = eligibility_service.ELIGIBILITY_CACHE.hits
+
+    async def scenario() -> tuple[dict, dict]:
+        first = await check_scheme_eligibility(profile)
+        first["matched_rules"].append("edited")
+        first["scheme_decisions"][0]["eligible"] = False
+        first["benefits"]["state"] = "edited"
+        first["next_steps"].clear()
+        return first, await check_scheme_eligibility(profile)
+
+    first, second = run(scenario())
+
+    assert eligibility_service.ELIGIBILITY_CACHE.hits == hits + 1
+    assert "edited" not in second["matched_rules"]
+    assert second["scheme_decisions"][0]["eligible"] is True
+    assert second["benefits"]["state"] == "Uttar Pradesh"
+    assert second["next_steps"] and second != first
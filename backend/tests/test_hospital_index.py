@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import run
+from services import hospital_service
+from services.hospital_service import HospitalIndex
+
+LIVE_HOSPITAL = {
+    "hospital_name": "Lucknow Test General Hospital",
+    "government": True,
+    "scheme_supported": True,
+    "contact_number": "0522-000000",
+    "latitude": 26.85,
+    "longitude": 80.95,
+}
+
+
+@pytest.fixture
+def live_osm(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    lookups: list[str] = []
+
+    async def osm_city_hospitals(display_name: str, force: bool = False) -> list[dict[str, object]]:
+        lookups.append(display_name)
+        return [dict(LIVE_HOSPITAL)]
+
+    monkeypatch.setattr(hospital_service, "osm_city_hospitals", osm_city_hospitals)
+    monkeypatch.setattr(hospital_service, "HOSPITAL_INDEX", HospitalIndex())
+    return lookups
+
+
+def names(result: dict) -> list[str]:
+    return [entry["hospital_name"] for entry in result["hospitals"]]
+
+
+def test_known_city_missing_from_index_is_fetched_without_the_refresher(fresh_db: None, live_osm: list[str]) -> None:
+    # No refresh_hospital_index task runs, as with HOSPITAL_INDEX_REFRESH_SECONDS=0.
+    async def scenario() -> tuple[dict, dict, list[str]]:
+        await hospital_service.initialize_hospital_index()
+        assert hospital_service.HOSPITAL_INDEX.lookup("lucknow") == []
+        first = await hospital_service.suggest_hospitals("Lucknow")
+        pending = list(hospital_service._pending_city_refreshes)
+        for task in list(hospital_service._pending_city_refreshes.values()):
+            await task
+        return first, await hospital_service.suggest_hospitals("Lucknow"), pending
+
+    first, second, pending = run(scenario())
+
+    assert pending == ["lucknow"]
+    assert LIVE_HOSPITAL["hospital_name"] not in names(first)
+    assert names(second)[0] == LIVE_HOSPITAL["hospital_name"]
+    assert live_osm == ["Lucknow"]
+
+
+def test_unknown_city_uses_live_lookup_without_storing(fresh_db: None, live_osm: list[str]) -> None:
+    async def scenario() -> tuple[dict, list[str]]:
+        await hospital_service.initialize_hospital_index()
+        result = await hospital_service.suggest_hospitals("Some Village")
+        return result, hospital_service.HOSPITAL_INDEX.cities()
+
+    result, cities = run(scenario())
+
+    assert names(result)[0] == LIVE_HOSPITAL["hospital_name"]
+    assert "some village" not in cities
+    assert hospital_service._pending_city_refreshes == {}
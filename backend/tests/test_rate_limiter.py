@@ -0,0 +1,118 @@
+import pytest
+
+from conftest import run
+from services import rate_limiter
+from services.rate_limiter import BucketSpec, TokenBucketLimiter
+
+PER_SECOND = BucketSpec("second", rate_per_second=2.0, capacity=4.0)
+PER_DAY = BucketSpec("day", rate_per_second=6 / 86400, capacity=6.0)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+def take(limiter: TokenBucketLimiter, specs: tuple[BucketSpec, ...], count: int) -> list[float]:
+    async def scenario() -> list[float]:
+        return [await limiter.try_acquire("twilio:+1", specs) for _ in range(count)]
+
+    return run(scenario())
+
+
+def test_burst_then_wait_then_refill(clock: list[float]) -> None:
+    limiter = TokenBucketLimiter("test", store="local")
+
+    assert take(limiter, (PER_SECOND,), 4) == [0.0, 0.0, 0.0, 0.0]
+    [wait] = take(limiter, (PER_SECOND,), 1)
+    assert wait == pytest.approx(0.5)
+
+    clock[0] += 0.5
+    assert take(limiter, (PER_SECOND,), 2) == [0.0, pytest.approx(0.5)]
+
+    # A long pause refills only up to capacity.
+    clock[0] += 60
+    waits = take(limiter, (PER_SECOND,), 5)
+    assert waits[:4] == [0.0, 0.0, 0.0, 0.0] and waits[4] > 0
+
+
+def test_daily_bucket_blocks_while_per_second_has_tokens(clock: list[float]) -> None:
+    limiter = TokenBucketLimiter("test", store="local")
+    specs = (PER_SECOND, PER_DAY)
+
+    sent = 0
+    for _ in range(10):
+        clock[0] += 1  # the per-second bucket is always refilled
+        if take(limiter, specs, 1) == [0.0]:
+            sent += 1
+    assert sent == 6
+
+    clock[0] += 1
+    [wait] = take(limiter, specs, 1)
+    # Rejected sends took nothing from the per-second bucket.
+    levels = run(limiter.levels())
+    assert wait == pytest.approx(1 / PER_DAY.rate_per_second, rel=0.01)
+    assert [bucket["tokens"] for bucket in levels] == [pytest.approx(4.0), pytest.approx(0.0, abs=0.01)]
+
+
+def test_levels_do_not_consume_tokens(clock: list[float]) -> None:
+    limiter = TokenBucketLimiter("test", store="local")
+    take(limiter, (PER_SECOND,), 3)
+
+    for _ in range(5):
+        levels = run(limiter.levels())
+    assert [(bucket["window"], bucket["tokens"]) for bucket in levels] == [("second", 1.0)]
+    assert take(limiter, (PER_SECOND,), 2) == [0.0, pytest.approx(0.5)]
+
+
+def test_local_buckets_are_scaled_by_share(clock: list[float]) -> None:
+    limiter = TokenBucketLimiter("test", store="local", local_share=2)
+
+    waits = take(limiter, (PER_SECOND,), 3)
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(1.0)  # half the rate: one token a second
+    assert run(limiter.levels())[0]["capacity"] == 2.0
+
+
+def test_falls_back_to_local_buckets_while_redis_is_down(clock: list[float], monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts = []
+
+    async def unavailable() -> None:
+        attempts.append(clock[0])
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(rate_limiter, "get_redis_client", unavailable)
+    limiter = TokenBucketLimiter("test", store="redis")
+
+    assert take(limiter, (PER_SECOND,), 2) == [0.0, 0.0]
+    assert limiter.backend == "local" and limiter.redis_errors == 1
+    assert len(attempts) == 1
+
+    clock[0] += rate_limiter.REDIS_RETRY_SECONDS
+    assert limiter.backend == "redis"
+    take(limiter, (PER_SECOND,), 1)
+    assert len(attempts) == 2 and limiter.redis_errors == 2
+
+
+def test_acquire_waits_briefly_or_returns_the_wait(clock: list[float], monkeypatch: pytest.MonkeyPatch) -> None:
+    slept: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        slept.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+    limiter = TokenBucketLimiter("test", store="local")
+    take(limiter, (PER_SECOND,), 4)
+
+    assert run(limiter.acquire("twilio:+1", (PER_SECOND,), max_wait_seconds=1)) == 0.0
+    assert slept == [pytest.approx(0.5)]
+
+    # A spent daily cap is far beyond max_wait: no sleeping, the wait is returned.
+    daily = TokenBucketLimiter("test", store="local")
+    take(daily, (PER_DAY,), 6)
+    slept.clear()
+    assert run(daily.acquire("twilio:+1", (PER_DAY,), max_wait_seconds=1)) == pytest.approx(14400, rel=0.01)
+    assert slept == []
@@ -0,0 +1,48 @@
+import random
+import time
+
+import pytest
+
+from services.spatial_index import GeoGrid, haversine_km
+
+
+def _india_points(count: int) -> list[tuple[float, float, int, int]]:
+    rng = random.Random(7)
+    return [(rng.uniform(8.0, 35.0), rng.uniform(68.0, 97.0), index % 50, index) for index in range(count)]
+
+
+def _brute_force(points, latitude: float, longitude: float, k: int, radius_km: float) -> list[int]:
+    ranked = sorted((haversine_km(latitude, longitude, point[0], point[1]), point[3]) for point in points)
+    return [payload for distance, payload in ranked if distance <= radius_km][:k]
+
+
+@pytest.mark.parametrize("latitude", [60.0, 70.0, 80.0, 89.9, 90.0, -90.0])
+def test_nearest_far_from_indexed_area_returns_quickly(latitude: float) -> None:
+    grid = GeoGrid(_india_points(60_000))
+
+    started = time.perf_counter()
+    result = grid.nearest(latitude, 80.0, k=10, radius_km=250)
+
+    assert result == []
+    assert time.perf_counter() - started < 0.5
+
+
+def test_nearest_at_high_latitude_matches_brute_force() -> None:
+    rng = random.Random(11)
+    points = [(rng.uniform(60.0, 85.0), rng.uniform(-30.0, 60.0), 0, index) for index in range(5_000)]
+    grid = GeoGrid(points)
+
+    for latitude in (70.0, 80.0, 84.0):
+        started = time.perf_counter()
+        result = grid.nearest(latitude, 15.0, k=10, radius_km=250)
+        assert time.perf_counter() - started < 0.5
+        assert [payload for _, payload in result] == _brute_force(points, latitude, 15.0, 10, 250)
+
+
+def test_nearest_matches_brute_force() -> None:
+    points = _india_points(5_000)
+    grid = GeoGrid(points)
+
+    for latitude, longitude, radius_km in ((19.07, 72.88, 25), (28.6, 77.2, 250), (21.1, 79.1, 1000)):
+        result = grid.nearest(latitude, longitude, k=5, radius_km=radius_km)
+        assert [payload for _, payload in result] == _brute_force(points, latitude, longitude, 5, radius_km)
@@ -0,0 +1,62 @@
+import pytest
+
+from services.state_index import resolve_state_code, state_for_city
+
+
+@pytest.mark.parametrize(
+    "text, code",
+    [
+        ("Kerala", "KL"),
+        ("  TAMIL   nadu ", "TN"),
+        ("उत्तर प्रदेश", "UP"),
+        ("UP", "UP"),
+        ("ts", "TG"),
+        ("Pune, Maharashtra", "MH"),
+        ("Tamil Nadu, India", "TN"),
+        ("Dadra and Nagar Haveli and Daman and Diu", "DH"),
+        ("West Bengal", "WB"),
+    ],
+)
+def test_names_codes_and_phrases(text: str, code: str) -> None:
+    assert resolve_state_code(text) == code
+
+
+@pytest.mark.parametrize(
+    "text, code",
+    [
+        ("telanganastate", "TG"),
+        ("statekerala", "KL"),
+        ("uttarpradeshindia", "UP"),
+        ("maharashtrastate pune", "MH"),
+        ("pune maharashtrastate", "MH"),
+        ("punemaharashtra", "MH"),
+        ("westbengalcity", "WB"),
+    ],
+)
+def test_run_together_state_names(text: str, code: str) -> None:
+    assert resolve_state_code(text) == code
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "bengalurucity",  # Bengaluru, not Bengal
+        "bengaluru",
+        "pune",
+        "up north",  # short codes only count as the whole input
+        "or something",
+        "goals",
+        "xkeralax",  # a state name inside a word is not a match
+        "atlantis",
+        "",
+    ],
+)
+def test_unresolved_text(text: str) -> None:
+    assert resolve_state_code(text) is None
+
+
+def test_state_for_city_prefers_known_cities() -> None:
+    assert state_for_city("Bengaluru") == "KA"
+    assert state_for_city("Secunderabad") == "TG"
+    assert state_for_city("bengalurucity") is None
+    assert state_for_city("Some Town, Kerala") == "KL"
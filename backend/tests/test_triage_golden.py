@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import run
+from db.models import User
+from services import triage_service
+from services.auth_service import get_current_user
+from services.triage_service import StreamingTriageSession
+
+# Expected payloads were recorded from the original keyword-scan triage, before
+# the rule file, automaton, cache and batch paths were introduced.
+GOLDEN_CASES = json.loads((Path(__file__).parent / "data" / "triage_golden.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def empty_triage_cache() -> None:
+    triage_service.TRIAGE_CACHE.clear()
+
+
+@pytest.mark.parametrize("case", GOLDEN_CASES, ids=lambda case: f"{case['language']}:{case['symptom_text'][:30]}")
+def test_analyze_symptoms_matches_golden(case: dict) -> None:
+    async def twice() -> tuple[dict, dict]:
+        miss = await triage_service.analyze_symptoms(case["symptom_text"], case["language"])
+        hit = await triage_service.analyze_symptoms(case["symptom_text"], case["language"])
+        return miss, hit
+
+    miss, hit = run(twice())
+
+    assert miss == case["expected"]
+    assert hit == case["expected"]
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ["I have chest", "pain and sweating"],
+        ["difficulty", "breathing since morning"],
+        ["he passed", "out"],
+        ["shortness of", "breath at night"],
+        ["severe", "headache and vomit"],
+        ["सीने में", "दर्द और पसीना"],
+        ["सांस लेने में", "तकलीफ"],
+        ["तेज", "बुखार"],
+    ],
+)
+def test_phrase_split_across_chunks_matches_one_shot(chunks: list[str]) -> None:
+    session = StreamingTriageSession(language="en")
+    contexts = [session.add_chunk(chunk) for chunk in chunks]
+
+    one_shot = run(triage_service.analyze_symptoms(" ".join(chunks), "en"))
+
+    assert session.result(contexts[-1]) == one_shot
+    # The phrase only exists once both halves have arrived.
+    assert session.result(contexts[0]) != one_shot
+
+
+def test_streaming_raises_emergency_once_when_phrase_completes() -> None:
+    session = StreamingTriageSession(language="hi")
+
+    first = session.add_chunk("मुझे सांस लेने")
+    assert session.raise_emergency(first) == []
+    second = session.add_chunk("में तकलीफ हो रही है")
+    assert session.raise_emergency(second) == ["breathing"]
+    third = session.add_chunk("और सीने में दर्द")
+    assert session.raise_emergency(third) == []
+    assert session.add_chunk("   ") is None
+
+
+def test_batch_matches_single_calls() -> None:
+    items = [(case["symptom_text"], case["language"]) for case in GOLDEN_CASES]
+
+    batch = run(triage_service.analyze_symptoms_batch(items))
+
+    assert batch == [case["expected"] for case in GOLDEN_CASES]
+
+
+def test_batch_route_matches_single_route(fresh_db: None) -> None:
+    from main import app
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, full_name="Test", email="test@example.org", phone="9876543210")
+    try:
+        client = TestClient(app)
+        items = [{"symptom_text": case["symptom_text"], "language": case["language"]} for case in GOLDEN_CASES[:12]]
+        batch = client.post("/triage/batch", json={"items": items})
+        singles = [client.post("/triage", json=item) for item in items]
+    finally:
+        app.dependency_overrides.clear()
+
+    assert batch.status_code == 200
+    assert batch.json()["results"] == [response.json() for response in singles]
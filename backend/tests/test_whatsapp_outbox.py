@@ -0,0 +1,211 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select, update
+
+from conftest import run
+from db.database import AsyncSessionLocal
+from db.models_enterprise import WhatsAppLog, WhatsAppOutbox
+from services import whatsapp_service
+
+
+@pytest.fixture(autouse=True)
+def no_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    # No configured provider: sends skip the rate limiter and go to the stubbed _deliver.
+    for name in ("TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_WHATSAPP_FROM", "SMS_PROVIDER"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def stub_deliver(monkeypatch: pytest.MonkeyPatch, result: tuple[str, str | None, bool]) -> list[str]:
+    calls: list[str] = []
+
+    async def deliver(phone_number: str, message_summary: str) -> tuple[str, str | None, bool]:
+        calls.append(message_summary)
+        return result
+
+    monkeypatch.setattr(whatsapp_service, "_deliver", deliver)
+    return calls
+
+
+async def enqueue(count: int) -> list[int]:
+    log_ids = []
+    async with AsyncSessionLocal() as session:
+        for index in range(count):
+            log = await whatsapp_service.send_summary(
+                session, user_id=None, phone_number="9876543210", message_summary=f"message {index}"
+            )
+            log_ids.append(log.id)
+    return log_ids
+
+
+async def outbox_row(log_id: int) -> WhatsAppOutbox:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(WhatsAppOutbox).where(WhatsAppOutbox.log_id == log_id))
+
+
+async def log_row(log_id: int) -> WhatsAppLog:
+    async with AsyncSessionLocal() as session:
+        return await session.get(WhatsAppLog, log_id)
+
+
+async def make_due(log_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(
+                update(WhatsAppOutbox)
+                .where(WhatsAppOutbox.log_id == log_id)
+                .values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+
+
+def test_claimed_rows_are_not_claimed_again(fresh_db: None) -> None:
+    async def scenario() -> tuple[list, list, list, list]:
+        await enqueue(6)
+        first = whatsapp_service.OutboxWorkerPool(worker_count=2)
+        second = whatsapp_service.OutboxWorkerPool(worker_count=2)
+        # Both may select the same due rows; the status check lets only one win each.
+        claimed_a, claimed_b = await asyncio.gather(first._claim(4), second._claim(4))
+        rest = await second._claim(10)
+        return claimed_a, claimed_b, rest, await first._claim(10)
+
+    claimed_a, claimed_b, rest, again = run(scenario())
+
+    claimed = [row[0] for row in [*claimed_a, *claimed_b, *rest]]
+    assert len(claimed) == len(set(claimed)) == 6
+    assert again == []
+
+
+def test_expired_lease_is_reclaimed(fresh_db: None) -> None:
+    async def scenario() -> tuple[int, int, list]:
+        [log_id] = await enqueue(1)
+        pool = whatsapp_service.OutboxWorkerPool(worker_count=1, lease_seconds=60)
+        await pool._claim(1)
+        fresh_lease = await pool.recover_expired_leases()
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await session.execute(
+                    update(WhatsAppOutbox)
+                    .where(WhatsAppOutbox.log_id == log_id)
+                    .values(locked_at=datetime.utcnow() - timedelta(seconds=120))
+                )
+        expired_lease = await pool.recover_expired_leases()
+        return fresh_lease, expired_lease, await pool._claim(1)
+
+    fresh_lease, expired_lease, reclaimed = run(scenario())
+
+    assert fresh_lease == 0
+    assert expired_lease == 1
+    assert len(reclaimed) == 1
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        ("failed", "Too Many Requests", True),
+        ("failed", "twilio-http-503", True),
+        ("failed", "twilio-request-failed", True),
+    ],
+)
+def test_retryable_failures_back_off_until_max_attempts(
+    fresh_db: None, monkeypatch: pytest.MonkeyPatch, result: tuple[str, str, bool]
+) -> None:
+    calls = stub_deliver(monkeypatch, result)
+    pool = whatsapp_service.OutboxWorkerPool(worker_count=1, max_attempts=3, retry_base_seconds=10, retry_max_seconds=300)
+
+    async def scenario() -> tuple[list[tuple[str, int, float]], WhatsAppOutbox, WhatsAppLog]:
+        [log_id] = await enqueue(1)
+        history = []
+        for _ in range(3):
+            await make_due(log_id)
+            [item] = await pool._claim(1)
+            before = datetime.utcnow()
+            await pool._send(*item)
+            row = await outbox_row(log_id)
+            history.append((row.status, row.attempts, (row.next_attempt_at - before).total_seconds()))
+        return history, await outbox_row(log_id), await log_row(log_id)
+
+    history, outbox, log = run(scenario())
+
+    assert len(calls) == 3
+    # Exponential backoff with jitter: base * 2^(attempt-1) * [0.5, 1.0].
+    assert history[0][:2] == ("queued", 1) and 5 - 1 <= history[0][2] <= 10 + 1
+    assert history[1][:2] == ("queued", 2) and 10 - 1 <= history[1][2] <= 20 + 1
+    assert history[2][:2] == ("failed", 3)
+    assert outbox.last_error == result[1]
+    assert log.delivery_status == "failed"
+    assert log.provider_reference == result[1]
+    assert pool.retried == 2 and pool.failed == 1
+
+
+def test_rejected_send_fails_without_retry(fresh_db: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = stub_deliver(monkeypatch, ("failed", "Invalid 'To' Phone Number", False))
+    pool = whatsapp_service.OutboxWorkerPool(worker_count=1, max_attempts=5)
+
+    async def scenario() -> tuple[WhatsAppOutbox, WhatsAppLog, list]:
+        [log_id] = await enqueue(1)
+        [item] = await pool._claim(1)
+        await pool._send(*item)
+        await make_due(log_id)
+        return await outbox_row(log_id), await log_row(log_id), await pool._claim(1)
+
+    outbox, log, claimable = run(scenario())
+
+    assert len(calls) == 1
+    assert (outbox.status, outbox.attempts, outbox.claim_token) == ("failed", 1, None)
+    assert (log.delivery_status, log.provider_reference) == ("failed", "Invalid 'To' Phone Number")
+    assert claimable == []
+
+
+def test_successful_send_updates_log(fresh_db: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    stub_deliver(monkeypatch, ("queued", "SM123", False))
+    pool = whatsapp_service.OutboxWorkerPool(worker_count=1)
+
+    async def scenario() -> tuple[WhatsAppOutbox, WhatsAppLog, dict]:
+        [log_id] = await enqueue(1)
+        [item] = await pool._claim(1)
+        await pool._send(*item)
+        async with AsyncSessionLocal() as session:
+            stats = await whatsapp_service.get_outbox_stats(session)
+        return await outbox_row(log_id), await log_row(log_id), stats
+
+    outbox, log, stats = run(scenario())
+
+    assert outbox.status == "sent"
+    assert (log.delivery_status, log.provider_reference) == ("queued", "SM123")
+    assert stats["statuses"] == {"sent": 1} and stats["backlog"] == 0
+
+
+@pytest.mark.parametrize(
+    "status_code, body, retryable",
+    [
+        (429, {"code": 20429, "message": "Too Many Requests"}, True),
+        (503, {"code": 20503, "message": "Service Unavailable"}, True),
+        (500, None, True),
+        (400, {"code": 21211, "message": "Invalid 'To' Phone Number"}, False),
+        (401, {"code": 20003, "message": "Authenticate"}, False),
+    ],
+)
+def test_twilio_errors_are_classified_by_status_code(
+    monkeypatch: pytest.MonkeyPatch, status_code: int, body: dict | None, retryable: bool
+) -> None:
+    async def request(method: str, path: str, **kwargs: object) -> httpx.Response:
+        return httpx.Response(status_code, json=body) if body else httpx.Response(status_code)
+
+    monkeypatch.setattr(whatsapp_service.TWILIO, "request", request)
+
+    status, reference, is_retryable = run(whatsapp_service._send_via_twilio("9876543210", "hello"))
+
+    assert status == "failed"
+    assert is_retryable is retryable
+    assert reference == (body["message"] if body else f"twilio-http-{status_code}")
+
+
+def test_transport_error_is_retryable(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def request(method: str, path: str, **kwargs: object) -> httpx.Response:
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(whatsapp_service.PLIVO, "request", request)
+
+    assert run(whatsapp_service._send_via_plivo("9876543210", "hello")) == ("failed", "plivo-request-failed", True)
@@ -0,0 +1,233 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+from sqlalchemy import select
+
+from conftest import run
+from db.database import AsyncSessionLocal
+from db.models_enterprise import WhatsAppLog
+from services import whatsapp_webhooks
+from services.whatsapp_webhooks import DeliveryStatusBuffer, StatusUpdate, parse_status_callback
+
+TWILIO_TOKEN = "twilio-secret"
+PLIVO_TOKEN = "plivo-secret"
+TEXTBELT_KEY = "textbelt-key"
+REQUEST_URL = "http://internal:8000/whatsapp/webhook/{provider}"
+
+
+@pytest.fixture(autouse=True)
+def provider_secrets(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TWILIO_AUTH_TOKEN", TWILIO_TOKEN)
+    monkeypatch.setenv("PLIVO_AUTH_TOKEN", PLIVO_TOKEN)
+    monkeypatch.setenv("TEXTBELT_API_KEY", TEXTBELT_KEY)
+    monkeypatch.delenv("WHATSAPP_WEBHOOK_BASE_URL", raising=False)
+
+
+def parse(provider: str, headers: dict[str, str], body: bytes) -> StatusUpdate:
+    return parse_status_callback(
+        provider,
+        request_url=REQUEST_URL.format(provider=provider),
+        path=f"/whatsapp/webhook/{provider}",
+        query="",
+        headers=headers,
+        body=body,
+    )
+
+
+def twilio_signature(url: str, params: dict[str, str], token: str = TWILIO_TOKEN) -> str:
+    payload = url + "".join(name + value for name, value in sorted(params.items()))
+    return base64.b64encode(hmac.new(token.encode(), payload.encode(), hashlib.sha1).digest()).decode()
+
+
+def plivo_signature(url: str, nonce: str, token: str = PLIVO_TOKEN) -> str:
+    return base64.b64encode(hmac.new(token.encode(), (url + nonce).encode(), hashlib.sha256).digest()).decode()
+
+
+def textbelt_headers(body: bytes, timestamp: float | None = None, key: str = TEXTBELT_KEY) -> dict[str, str]:
+    stamp = str(int(timestamp if timestamp is not None else time.time()))
+    signature = hmac.new(key.encode(), stamp.encode() + body, hashlib.sha256).hexdigest()
+    return {"X-Textbelt-Timestamp": stamp, "X-Textbelt-Signature": signature, "Content-Type": "application/json"}
+
+
+TWILIO_PARAMS = {"MessageSid": "SM1", "MessageStatus": "undelivered", "ErrorCode": "63016"}
+
+
+def test_twilio_valid_signature() -> None:
+    url = REQUEST_URL.format(provider="twilio")
+    headers = {"X-Twilio-Signature": twilio_signature(url, TWILIO_PARAMS), "Content-Type": "application/x-www-form-urlencoded"}
+
+    update = parse("twilio", headers, urlencode(TWILIO_PARAMS).encode())
+
+    assert (update.provider_reference, update.delivery_status, update.error) == ("SM1", "undelivered", "twilio-error-63016")
+
+
+@pytest.mark.parametrize("tamper", ["body", "signature", "secret"])
+def test_twilio_tampered_signature(tamper: str) -> None:
+    url = REQUEST_URL.format(provider="twilio")
+    signature = twilio_signature(url, TWILIO_PARAMS, token="other" if tamper == "secret" else TWILIO_TOKEN)
+    if tamper == "signature":
+        signature = signature[:-2] + "AA"
+    params = {**TWILIO_PARAMS, "MessageStatus": "delivered"} if tamper == "body" else TWILIO_PARAMS
+
+    with pytest.raises(PermissionError):
+        parse("twilio", {"X-Twilio-Signature": signature}, urlencode(params).encode())
+
+
+def test_plivo_valid_and_tampered_signature() -> None:
+    url = REQUEST_URL.format(provider="plivo")
+    body = urlencode({"MessageUUID": "u1", "Status": "delivered"}).encode()
+    headers = {"X-Plivo-Signature-V2": plivo_signature(url, "nonce-1"), "X-Plivo-Signature-V2-Nonce": "nonce-1"}
+
+    update = parse("plivo", headers, body)
+    assert (update.provider_reference, update.delivery_status) == ("plivo:u1", "delivered")
+
+    with pytest.raises(PermissionError):
+        parse("plivo", {**headers, "X-Plivo-Signature-V2-Nonce": "nonce-2"}, body)
+    with pytest.raises(PermissionError):
+        parse("plivo", {"X-Plivo-Signature-V2": plivo_signature(url, "nonce-1")}, body)
+
+
+def test_textbelt_valid_and_tampered_signature() -> None:
+    body = json.dumps({"textId": "t1", "status": "DELIVERED"}).encode()
+    headers = textbelt_headers(body)
+
+    update = parse("textbelt", headers, body)
+    assert (update.provider_reference, update.delivery_status) == ("textbelt:t1", "delivered")
+
+    with pytest.raises(PermissionError):
+        parse("textbelt", headers, body.replace(b"DELIVERED", b"FAILED"))
+    with pytest.raises(PermissionError):
+        parse("textbelt", textbelt_headers(body, key="other"), body)
+
+
+def test_textbelt_rejects_stale_timestamp() -> None:
+    body = json.dumps({"textId": "t1", "status": "DELIVERED"}).encode()
+    stale = time.time() - whatsapp_webhooks.TEXTBELT_MAX_SKEW_SECONDS - 60
+
+    with pytest.raises(PermissionError, match="stale"):
+        parse("textbelt", textbelt_headers(body, timestamp=stale), body)
+
+
+def test_unconfigured_and_unknown_providers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TWILIO_AUTH_TOKEN")
+    with pytest.raises(LookupError):
+        parse("twilio", {"X-Twilio-Signature": "x"}, b"MessageSid=SM1&MessageStatus=sent")
+    with pytest.raises(LookupError):
+        parse("sinch", {}, b"")
+
+
+def test_signed_url_uses_public_base_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    request_url = "http://10.0.0.5:8000/whatsapp/webhook/twilio?x=1"
+    assert whatsapp_webhooks._signed_url(request_url, "/whatsapp/webhook/twilio", "x=1") == request_url
+
+    monkeypatch.setenv("WHATSAPP_WEBHOOK_BASE_URL", "https://api.example.org/")
+    assert whatsapp_webhooks._signed_url(request_url, "/whatsapp/webhook/twilio", "x=1") == (
+        "https://api.example.org/whatsapp/webhook/twilio?x=1"
+    )
+    assert whatsapp_webhooks._signed_url(request_url, "/whatsapp/webhook/twilio", "") == (
+        "https://api.example.org/whatsapp/webhook/twilio"
+    )
+
+    # A proxied callback verifies against the public URL Twilio signed, not the internal one.
+    public_url = "https://api.example.org/whatsapp/webhook/twilio"
+    headers = {"X-Twilio-Signature": twilio_signature(public_url, TWILIO_PARAMS)}
+    assert parse("twilio", headers, urlencode(TWILIO_PARAMS).encode()).provider_reference == "SM1"
+
+
+async def add_logs(*rows: tuple[str, str]) -> None:
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            session.add_all(
+                [
+                    WhatsAppLog(phone_number="+919876543210", message_summary="m", delivery_status=status, provider_reference=reference)
+                    for reference, status in rows
+                ]
+            )
+
+
+async def log_statuses() -> dict[str, str]:
+    async with AsyncSessionLocal() as session:
+        rows = await session.execute(select(WhatsAppLog.provider_reference, WhatsAppLog.delivery_status))
+        return dict(rows.all())
+
+
+def test_buffer_keeps_the_highest_ranked_status() -> None:
+    buffer = DeliveryStatusBuffer()
+    buffer.add(StatusUpdate("SM1", "sent"))
+    buffer.add(StatusUpdate("SM1", "read"))
+    buffer.add(StatusUpdate("SM1", "delivered"))
+
+    assert buffer._pending["SM1"].delivery_status == "read"
+    assert buffer.stats()["coalesced"] == 2
+
+
+def test_buffer_apply_ignores_out_of_order_status(fresh_db: None) -> None:
+    buffer = DeliveryStatusBuffer()
+
+    async def scenario() -> tuple[int, dict[str, str]]:
+        await add_logs(("SM1", "delivered"), ("SM2", "queued"), ("SM3", "sent"))
+        buffer.add(StatusUpdate("SM1", "sent"))
+        buffer.add(StatusUpdate("SM2", "delivered"))
+        buffer.add(StatusUpdate("SM3", "undelivered", error="twilio-error-63016"))
+        return await buffer.flush(), await log_statuses()
+
+    changes, statuses = run(scenario())
+
+    assert changes == 2
+    assert statuses == {"SM1": "delivered", "SM2": "delivered", "twilio-error-63016": "undelivered"}
+    assert buffer.stats()["ignored_out_of_order"] == 1
+    assert buffer.stats()["pending"] == 0
+
+
+def test_buffer_keeps_unmatched_updates_until_ttl(fresh_db: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    buffer = DeliveryStatusBuffer(unmatched_ttl=30)
+    clock = [1000.0]
+    monkeypatch.setattr(whatsapp_webhooks.time, "monotonic", lambda: clock[0])
+
+    async def scenario() -> list[tuple[int, int, int]]:
+        buffer.add(StatusUpdate("SMlate", "delivered"))
+        progress = []
+        await buffer.flush()
+        progress.append((len(buffer._pending), buffer.dropped, buffer.applied))
+        # The outbox worker records the reference after the callback arrived.
+        await add_logs(("SMlate", "queued"))
+        await buffer.flush()
+        progress.append((len(buffer._pending), buffer.dropped, buffer.applied))
+
+        buffer.add(StatusUpdate("SMnever", "delivered"))
+        clock[0] += 29
+        await buffer.flush()
+        progress.append((len(buffer._pending), buffer.dropped, buffer.applied))
+        clock[0] += 2
+        await buffer.flush()
+        progress.append((len(buffer._pending), buffer.dropped, buffer.applied))
+        return progress
+
+    assert run(scenario()) == [(1, 0, 0), (0, 0, 1), (1, 0, 1), (0, 1, 1)]
+
+
+def test_failed_flush_requeues_the_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    buffer = DeliveryStatusBuffer()
+    buffer.add(StatusUpdate("SM1", "sent"))
+    buffer.add(StatusUpdate("SM2", "delivered"))
+
+    async def broken_apply(batch: dict[str, StatusUpdate]) -> int:
+        # A newer callback lands while the write is in flight.
+        buffer.add(StatusUpdate("SM1", "delivered"))
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(buffer, "_apply", broken_apply)
+
+    with pytest.raises(RuntimeError):
+        run(buffer.flush())
+
+    assert {reference: update.delivery_status for reference, update in buffer._pending.items()} == {
+        "SM1": "delivered",
+        "SM2": "delivered",
+    }
+    assert buffer.flushes == 0